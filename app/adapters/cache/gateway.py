@@ -0,0 +1,195 @@
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from typing import Optional, AsyncIterator, Sequence, Callable, Awaitable
+
+from app.application.models import TaskCreate, Task, TaskTitleUpdate, TaskUpdate, ReorderRequest, TaskCursor, \
+    TaskPatch, TaskFilter, TaskStats, TaskRow
+from app.application.protocols.cache import TaskListCache
+from app.application.protocols.database import DatabaseGateway, DatabaseGatewayFactory
+
+
+class CachedGateway(DatabaseGateway):
+    """
+    Serves task list reads from a cache, keyed by the list version read before the tasks.
+
+    A list cached while a write is not committed yet is stored under the version before
+    the write, so it never answers reads of the new version. Writes made through this gateway
+    still drop the cached lists of the user to free memory, and later reads of that user
+    through this gateway skip the cache, as they may see writes that are not committed yet.
+    """
+
+    def __init__(self, database: DatabaseGateway, cache: TaskListCache):
+        self.database = database
+        self.cache = cache
+        self._versions: dict[int, int] = {}
+        self._written: set[int] = set()
+
+    async def _mark_written(self, user_id: int) -> None:
+        self._written.add(user_id)
+        self._versions.pop(user_id, None)
+        await self.cache.invalidate(user_id)
+
+    async def _cached_tasks(
+            self, user_id: int, key: tuple, read: Callable[[], Awaitable[list[TaskRow]]],
+    ) -> list[TaskRow]:
+        if user_id in self._written:
+            return await read()
+        version = self._versions.get(user_id)
+        if version is None:
+            version = await self.get_list_version(user_id)
+        key = (version, *key)
+        tasks = await self.cache.get(user_id, key)
+        if tasks is None:
+            tasks = await read()
+            await self.cache.set(user_id, key, tasks)
+        return tasks
+
+    async def add_task(self, user_id: int, task: TaskCreate) -> Task:
+        new_task = await self.database.add_task(user_id, task)
+        await self._mark_written(user_id)
+        return new_task
+
+    async def add_tasks(self, user_id: int, tasks: list[TaskCreate]) -> list[Task]:
+        new_tasks = await self.database.add_tasks(user_id, tasks)
+        await self._mark_written(user_id)
+        return new_tasks
+
+    async def delete_task_by_id(self, user_id: int, task_id: int) -> Optional[int]:
+        deleted_task_id = await self.database.delete_task_by_id(user_id, task_id)
+        await self._mark_written(user_id)
+        return deleted_task_id
+
+    async def delete_tasks(self, user_id: int, task_ids: list[int]) -> list[int]:
+        deleted_task_ids = await self.database.delete_tasks(user_id, task_ids)
+        await self._mark_written(user_id)
+        return deleted_task_ids
+
+    async def restore_task_by_id(self, user_id: int, task_id: int) -> Optional[Task]:
+        restored_task = await self.database.restore_task_by_id(user_id, task_id)
+        await self._mark_written(user_id)
+        return restored_task
+
+    async def purge_deleted_tasks(self, deleted_before: datetime, limit: int) -> list[int]:
+        # tombstones are not in cached lists
+        return await self.database.purge_deleted_tasks(deleted_before, limit)
+
+    async def get_tasks(
+            self,
+            user_id: int,
+            skip: int,
+            limit: int,
+            fields: Optional[Sequence[str]] = None,
+            filters: Optional[TaskFilter] = None,
+    ) -> list[TaskRow]:
+        return await self._cached_tasks(
+            user_id,
+            ("offset", skip, limit, fields, filters),
+            lambda: self.database.get_tasks(user_id, skip, limit, fields, filters),
+        )
+
+    async def get_tasks_after(
+            self,
+            user_id: int,
+            after: Optional[TaskCursor],
+            limit: int,
+            fields: Optional[Sequence[str]] = None,
+            filters: Optional[TaskFilter] = None,
+    ) -> list[TaskRow]:
+        return await self._cached_tasks(
+            user_id,
+            ("after", after.position if after else None, after.id if after else None, limit, fields, filters),
+            lambda: self.database.get_tasks_after(user_id, after, limit, fields, filters),
+        )
+
+    async def get_task(self, user_id: int, task_id: int) -> Optional[Task]:
+        return await self.database.get_task(user_id, task_id)
+
+    def stream_tasks(self, user_id: int, fields: Sequence[str]) -> AsyncIterator[Sequence[tuple]]:
+        return self.database.stream_tasks(user_id, fields)
+
+    async def update_task_title_by_id(
+            self, user_id: int, task_id: int, task_update: TaskTitleUpdate,
+            expected_versions: Optional[list[int]] = None,
+    ) -> Optional[Task]:
+        updated_task = await self.database.update_task_title_by_id(user_id, task_id, task_update, expected_versions)
+        await self._mark_written(user_id)
+        return updated_task
+
+    async def update_task_by_id(
+            self, user_id: int, task_id: int, task_update: TaskUpdate,
+            expected_versions: Optional[list[int]] = None,
+    ) -> Optional[Task]:
+        updated_task = await self.database.update_task_by_id(user_id, task_id, task_update, expected_versions)
+        await self._mark_written(user_id)
+        return updated_task
+
+    async def update_tasks(self, user_id: int, patches: list[TaskPatch]) -> dict[int, Task]:
+        updated_tasks = await self.database.update_tasks(user_id, patches)
+        await self._mark_written(user_id)
+        return updated_tasks
+
+    async def reorder_tasks(self, user_id: int, reorder_data: ReorderRequest) -> None:
+        await self.database.reorder_tasks(user_id, reorder_data)
+        await self._mark_written(user_id)
+
+    async def get_task_cursors(self, user_id: int, task_ids: list[int]) -> dict[int, TaskCursor]:
+        return await self.database.get_task_cursors(user_id, task_ids)
+
+    async def get_next_position(
+            self, user_id: int, after: Optional[TaskCursor], exclude_task_id: int,
+    ) -> Optional[int]:
+        return await self.database.get_next_position(user_id, after, exclude_task_id)
+
+    async def get_previous_position(
+            self, user_id: int, before: Optional[TaskCursor], exclude_task_id: int,
+    ) -> Optional[int]:
+        return await self.database.get_previous_position(user_id, before, exclude_task_id)
+
+    async def set_task_position(self, user_id: int, task_id: int, position: int) -> Optional[Task]:
+        task = await self.database.set_task_position(user_id, task_id, position)
+        await self._mark_written(user_id)
+        return task
+
+    async def rebalance_positions(self, user_id: int) -> None:
+        await self.database.rebalance_positions(user_id)
+        await self._mark_written(user_id)
+
+    async def has_crowded_positions(self, user_id: int) -> bool:
+        return await self.database.has_crowded_positions(user_id)
+
+    async def get_position_range(self, user_id: int) -> tuple[int, Optional[int], Optional[int]]:
+        return await self.database.get_position_range(user_id)
+
+    async def spread_positions(self, user_id: int, bound: int, limit: int, descending: bool = False) -> list[int]:
+        positions = await self.database.spread_positions(user_id, bound, limit, descending)
+        await self._mark_written(user_id)
+        return positions
+
+    async def get_list_version(self, user_id: int) -> int:
+        version = await self.database.get_list_version(user_id)
+        if user_id not in self._written:
+            self._versions[user_id] = version
+        return version
+
+    async def bump_list_version(self, user_id: int, by: int = 1) -> int:
+        return await self.database.bump_list_version(user_id, by)
+
+    async def get_task_stats(self, user_id: int, since: date) -> TaskStats:
+        return await self.database.get_task_stats(user_id, since)
+
+    async def get_user_ids(self, after: int, limit: int) -> list[int]:
+        return await self.database.get_user_ids(after, limit)
+
+    async def reconcile_task_stats(self, user_ids: list[int]) -> list[int]:
+        return await self.database.reconcile_task_stats(user_ids)
+
+
+class CachedGatewayFactory(DatabaseGatewayFactory):
+    def __init__(self, gateway_factory: DatabaseGatewayFactory, cache: TaskListCache):
+        self.gateway_factory = gateway_factory
+        self.cache = cache
+
+    @asynccontextmanager
+    async def __call__(self) -> AsyncIterator[CachedGateway]:
+        async with self.gateway_factory() as database:
+            yield CachedGateway(database, self.cache)
@@ -0,0 +1,62 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Hashable
+
+from app.application.models import TaskRow, CacheStats
+from app.application.protocols.cache import TaskListCache
+
+
+class LRUTaskListCache(TaskListCache):
+    """
+    In-process cache of task lists with a time to live.
+
+    Least recently used lists are evicted when either the number of entries
+    or the total number of cached tasks exceeds its limit.
+    """
+
+    def __init__(self, max_entries: int, max_tasks: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_tasks = max_tasks
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[int, Hashable], tuple[float, list[TaskRow]]] = OrderedDict()
+        self._keys_by_user: dict[int, set[Hashable]] = {}
+        self._stats = CacheStats()
+
+    async def get(self, user_id: int, key: Hashable) -> Optional[list[TaskRow]]:
+        entry = self._entries.get((user_id, key))
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._remove(user_id, key)
+            self._stats.misses += 1
+            return None
+        self._entries.move_to_end((user_id, key))
+        self._stats.hits += 1
+        return entry[1]
+
+    async def set(self, user_id: int, key: Hashable, tasks: list[TaskRow]) -> None:
+        if len(tasks) > self.max_tasks:
+            return
+        if (user_id, key) in self._entries:
+            self._remove(user_id, key)
+        self._entries[(user_id, key)] = (time.monotonic() + self.ttl_seconds, tasks)
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+        self._stats.cached_tasks += len(tasks)
+        while len(self._entries) > self.max_entries or self._stats.cached_tasks > self.max_tasks:
+            (evicted_user_id, evicted_key), _ = next(iter(self._entries.items()))
+            self._remove(evicted_user_id, evicted_key)
+            self._stats.evictions += 1
+
+    async def invalidate(self, user_id: int) -> None:
+        for key in list(self._keys_by_user.get(user_id, ())):
+            self._remove(user_id, key)
+
+    def stats(self) -> CacheStats:
+        return self._stats.model_copy(update={"entries": len(self._entries)})
+
+    def _remove(self, user_id: int, key: Hashable) -> None:
+        _, tasks = self._entries.pop((user_id, key))
+        self._stats.cached_tasks -= len(tasks)
+        user_keys = self._keys_by_user[user_id]
+        user_keys.discard(key)
+        if not user_keys:
+            del self._keys_by_user[user_id]
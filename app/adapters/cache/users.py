@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Hashable
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.adapters.sqlalchemy_db.models import User
+from app.application.models import CacheStats
+from app.application.protocols.cache import UserCache
+
+
+class LRUUserCache(UserCache):
+    """
+    In-process cache of token subjects and user rows with a time to live.
+
+    Users are stored as column values and every hit builds a new detached
+    `User`, so requests never share an ORM instance.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._tokens: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._users: OrderedDict[int, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._stats = CacheStats()
+
+    async def get_token_subject(self, token: str) -> Optional[str]:
+        return self._get(self._tokens, token)
+
+    async def set_token_subject(self, token: str, subject: str, expires_at: Optional[float]) -> None:
+        ttl_seconds = self.ttl_seconds
+        if expires_at is not None:
+            ttl_seconds = min(ttl_seconds, expires_at - time.time())
+        if ttl_seconds > 0:
+            self._set(self._tokens, token, subject, ttl_seconds)
+
+    async def get_user(self, user_id: int) -> Optional[User]:
+        values = self._get(self._users, user_id)
+        if values is None:
+            return None
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    async def set_user(self, user: User) -> None:
+        values = {column.key: getattr(user, column.key) for column in User.__table__.columns}
+        self._set(self._users, user.id, values, self.ttl_seconds)
+
+    async def invalidate_user(self, user_id: int) -> None:
+        self._users.pop(user_id, None)
+
+    def stats(self) -> CacheStats:
+        return self._stats.model_copy(update={"entries": len(self._tokens) + len(self._users)})
+
+    def _get(self, entries: OrderedDict, key: Hashable) -> Optional[Any]:
+        entry = entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del entries[key]
+            self._stats.misses += 1
+            return None
+        entries.move_to_end(key)
+        self._stats.hits += 1
+        return entry[1]
+
+    def _set(self, entries: OrderedDict, key: Hashable, value: Any, ttl_seconds: float) -> None:
+        entries[key] = (time.monotonic() + ttl_seconds, value)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self._stats.evictions += 1
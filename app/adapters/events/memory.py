@@ -0,0 +1,95 @@
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Optional, AsyncIterator
+
+from app.application.exceptions import TaskEventsOverflowError
+from app.application.models import TaskEvent
+from app.application.protocols.events import TaskEventBroker, TaskEventSubscription
+
+
+class _History:
+    def __init__(self, size: int, first_id: int):
+        self.events: deque[TaskEvent] = deque(maxlen=size)
+        # every event with a greater id published by this process is kept
+        self.complete_after = first_id - 1
+
+    def append(self, event: TaskEvent) -> None:
+        if len(self.events) == self.events.maxlen:
+            self.complete_after = max(self.complete_after, self.events[0].id)
+        self.events.append(event)
+
+
+class _Subscription(TaskEventSubscription):
+    def __init__(self, broker: "InMemoryTaskEventBroker", user_id: int):
+        self.broker = broker
+        self.user_id = user_id
+        self._queue: asyncio.Queue[TaskEvent] = asyncio.Queue(maxsize=broker.queue_size)
+        self._overflowed = False
+
+    def put(self, event: TaskEvent) -> None:
+        if self._overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._overflowed = True
+
+    async def next_event(self, timeout: float) -> Optional[TaskEvent]:
+        if self._overflowed:
+            raise TaskEventsOverflowError(self.user_id)
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def replay(self, after: int) -> Optional[list[TaskEvent]]:
+        return self.broker.replay(self.user_id, after)
+
+
+class InMemoryTaskEventBroker(TaskEventBroker):
+    """
+    Delivers task events between the requests of one process through asyncio queues.
+
+    Every subscriber has a queue of `queue_size` events, a subscriber that falls further
+    behind loses its events instead of slowing down publishers. The last `history_size`
+    events of up to `max_users` recently active users are kept for replays.
+    With several workers, each one only sees the events published by itself.
+    """
+
+    def __init__(self, queue_size: int, history_size: int, max_users: int):
+        self.queue_size = queue_size
+        self.history_size = history_size
+        self.max_users = max_users
+        self._subscriptions: dict[int, set[_Subscription]] = {}
+        self._histories: OrderedDict[int, _History] = OrderedDict()
+
+    async def publish(self, user_id: int, event: TaskEvent) -> None:
+        history = self._histories.get(user_id)
+        if history is None:
+            history = self._histories[user_id] = _History(self.history_size, event.id)
+            if len(self._histories) > self.max_users:
+                self._histories.popitem(last=False)
+        else:
+            self._histories.move_to_end(user_id)
+        history.append(event)
+        for subscription in self._subscriptions.get(user_id, ()):
+            subscription.put(event)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[TaskEventSubscription]:
+        subscription = _Subscription(self, user_id)
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscriptions = self._subscriptions[user_id]
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[user_id]
+
+    def replay(self, user_id: int, after: int) -> Optional[list[TaskEvent]]:
+        history = self._histories.get(user_id)
+        if history is None or after < history.complete_after:
+            return None
+        return sorted((event for event in history.events if event.id > after), key=lambda event: event.id)
@@ -1,103 +1,602 @@
-from datetime import datetime
-from typing import Optional
+from contextlib import asynccontextmanager
+from datetime import datetime, date
+from typing import Optional, AsyncIterator, Any, Sequence
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import select, func, tuple_, delete, update, case, insert, Row, Select, Date, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.adapters.sqlalchemy_db import models
-from app.application.exceptions import TaskNotFoundError, MissingTasksError, DataConflictError
-from app.application.models import TaskCreate, Task, TaskTitleUpdate, TaskUpdate, ReorderRequest
-from app.application.protocols.database import DatabaseGateway, UserDataBaseGateway
+from app.adapters.sqlalchemy_db.routing import ReadStickiness
+from app.adapters.sqlalchemy_db.search import task_search_condition
+from app.application.exceptions import MissingTasksError, TaskVersionConflictError, DataConflictError
+from app.application.models import TaskCreate, Task, TaskTitleUpdate, TaskUpdate, ReorderRequest, \
+    TaskCursor, TaskPatch, TaskFilter, TaskSort, TaskStats, DailyTaskCount, TaskRow
+from app.application.positions import POSITION_STEP
+from app.application.protocols.database import DatabaseGateway, UserDataBaseGateway, DatabaseGatewayFactory
+
+UPDATE_CHUNK_SIZE = 1000
+STREAM_BATCH_SIZE = 1000
+
+
+def _task_columns(fields: Optional[Sequence[str]]) -> list[Any]:
+    """
+    Columns to select for a task list read: all fields of `TaskRow`, or the requested fields
+    plus `id` and `position`, which the cursor of the next page is built from.
+    """
+    if fields is None:
+        return [models.Task.__table__.c[name] for name in TaskRow.__annotations__]
+    names = dict.fromkeys(("id", "position", *fields))
+    return [models.Task.__table__.c[name] for name in names]
+
+
+def _task_row(row: Row) -> TaskRow:
+    # Values come straight from typed columns, they are not validated again
+    return TaskRow(**row._mapping)
+
+
+def _filter_tasks(query: Select, session: AsyncSession, user_id: int, filters: Optional[TaskFilter]) -> Select:
+    if filters is None:
+        return query
+    if filters.completed is not None:
+        query = query.where(models.Task.completed == filters.completed)
+    if filters.created_after is not None:
+        query = query.where(models.Task.createdAt > filters.created_after)
+    if filters.created_before is not None:
+        query = query.where(models.Task.createdAt < filters.created_before)
+    if filters.q is not None and filters.q.strip():
+        query = query.where(task_search_condition(session.bind.dialect.name, user_id, filters.q))
+    return query
+
+
+def _task_order(filters: Optional[TaskFilter]) -> tuple[Any, ...]:
+    sort = filters.sort if filters is not None else TaskSort.POSITION
+    if sort == TaskSort.CREATED_AT:
+        return models.Task.createdAt, models.Task.id
+    if sort == TaskSort.CREATED_AT_DESC:
+        return models.Task.createdAt.desc(), models.Task.id.desc()
+    return models.Task.position, models.Task.id
 
 
 class SqlaGateway(DatabaseGateway):
-    def __init__(self, session: AsyncSession):
+    """
+    Writes go to `session`. List and single task reads go to `read_session`,
+    unless this gateway or, with `stickiness`, the same user wrote recently.
+    """
+
+    def __init__(
+            self,
+            session: AsyncSession,
+            read_session: Optional[AsyncSession] = None,
+            stickiness: Optional[ReadStickiness] = None,
+    ):
         self.session = session
+        self.read_session = read_session or session
+        self.stickiness = stickiness
+        self._written = False
+
+    def _reader(self, user_id: int) -> AsyncSession:
+        if self._written or (self.stickiness is not None and self.stickiness.is_sticky(user_id)):
+            return self.session
+        return self.read_session
 
     async def add_task(self, user_id: int, task: TaskCreate) -> Task:
-        new_task = models.Task(
-            title=task.title,
-            completed=task.completed,
-            createdAt=datetime.utcnow(),
-            description=task.description,
-            user_id=user_id
-        )
-        self.session.add(new_task)
-        await self.session.commit()
-        await self.session.refresh(new_task)
-        return Task.model_validate(new_task)
-
-    async def get_tasks(self, user_id: int, skip: int, limit: int) -> list[Task]:
+        next_position = (
+            select(func.coalesce(func.max(models.Task.position) + POSITION_STEP, 0))
+            .where(models.Task.user_id == user_id, models.Task.deleted_at.is_(None))
+            .scalar_subquery()
+        )
         query = (
-            select(models.Task)
-            .where(models.Task.user_id == user_id)
-            .order_by(models.Task.position)
-            .offset(skip)
-            .limit(limit)
+            insert(models.Task)
+            .values(
+                title=task.title,
+                completed=task.completed,
+                createdAt=datetime.utcnow(),
+                position=next_position,
+                description=task.description,
+                user_id=user_id,
+            )
+            .returning(*models.Task.__table__.c)
         )
         result = await self.session.execute(query)
-        tasks = [Task.model_validate(task) for task in result.scalars().all()]
-        return tasks
+        return Task.model_validate(result.one())
+
+    async def add_tasks(self, user_id: int, tasks: list[TaskCreate]) -> list[Task]:
+        if not tasks:
+            return []
+        query = select(func.max(models.Task.position)).where(
+            models.Task.user_id == user_id, models.Task.deleted_at.is_(None),
+        )
+        last_position = (await self.session.execute(query)).scalar()
+        if last_position is None:
+            last_position = -POSITION_STEP
+        created_at = datetime.utcnow()
+        rows = [
+            {
+                "title": task.title,
+                "completed": task.completed,
+                "createdAt": created_at,
+                "position": last_position + POSITION_STEP * index,
+                "description": task.description,
+                "user_id": user_id,
+            }
+            for index, task in enumerate(tasks, start=1)
+        ]
+        query = insert(models.Task).returning(*models.Task.__table__.c)
+        result = await self.session.execute(query, rows)
+        # RETURNING order of a multi-row INSERT is not guaranteed, positions follow the input order
+        return sorted((Task.model_validate(row) for row in result), key=lambda task: task.position)
+
+    async def get_tasks(
+            self,
+            user_id: int,
+            skip: int,
+            limit: int,
+            fields: Optional[Sequence[str]] = None,
+            filters: Optional[TaskFilter] = None,
+    ) -> list[TaskRow]:
+        session = self._reader(user_id)
+        query = select(*_task_columns(fields)).where(models.Task.user_id == user_id, models.Task.deleted_at.is_(None))
+        query = _filter_tasks(query, session, user_id, filters)
+        query = query.order_by(*_task_order(filters)).offset(skip).limit(limit)
+        result = await session.execute(query)
+        return [_task_row(row) for row in result]
+
+    async def get_tasks_after(
+            self,
+            user_id: int,
+            after: Optional[TaskCursor],
+            limit: int,
+            fields: Optional[Sequence[str]] = None,
+            filters: Optional[TaskFilter] = None,
+    ) -> list[TaskRow]:
+        session = self._reader(user_id)
+        query = select(*_task_columns(fields)).where(models.Task.user_id == user_id, models.Task.deleted_at.is_(None))
+        query = _filter_tasks(query, session, user_id, filters)
+        if after is not None:
+            query = query.where(tuple_(models.Task.position, models.Task.id) > tuple_(after.position, after.id))
+        query = query.order_by(models.Task.position, models.Task.id).limit(limit)
+        result = await session.execute(query)
+        return [_task_row(row) for row in result]
 
     async def delete_task_by_id(self, user_id: int, task_id: int) -> Optional[int]:
-        query = select(models.Task).where(models.Task.id == task_id, models.Task.user_id == user_id)
+        query = (
+            update(models.Task)
+            .where(models.Task.id == task_id, models.Task.user_id == user_id, models.Task.deleted_at.is_(None))
+            .values(deleted_at=datetime.utcnow())
+            .returning(models.Task.id)
+            .execution_options(synchronize_session=False)
+        )
         result = await self.session.execute(query)
-        task = result.scalars().first()
-        if not task:
-            return None
-        await self.session.delete(task)
-        await self.session.commit()
-        return task.id
+        return result.scalar_one_or_none()
 
-    async def change_tasks_position(self,  user_id: int,) -> None:
-        query = select(models.Task).where(models.Task.user_id == user_id).order_by(models.Task.position)
-        result = await self.session.execute(query)
-        tasks = result.scalars().all()
-        for index, task in enumerate(tasks):
-            task.position = index
-        await self.session.commit()
+    async def delete_tasks(self, user_id: int, task_ids: list[int]) -> list[int]:
+        deleted_task_ids = []
+        deleted_at = datetime.utcnow()
+        for start in range(0, len(task_ids), UPDATE_CHUNK_SIZE):
+            query = (
+                update(models.Task)
+                .where(
+                    models.Task.id.in_(task_ids[start:start + UPDATE_CHUNK_SIZE]),
+                    models.Task.user_id == user_id,
+                    models.Task.deleted_at.is_(None),
+                )
+                .values(deleted_at=deleted_at)
+                .returning(models.Task.id)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(query)
+            deleted_task_ids.extend(result.scalars().all())
+        return deleted_task_ids
 
-    async def update_task_title_by_id(self, user_id: int, task_id: int, task_update: TaskTitleUpdate) -> Optional[Task]:
-        query = select(models.Task).where(models.Task.id == task_id, models.Task.user_id == user_id)
+    async def restore_task_by_id(self, user_id: int, task_id: int) -> Optional[Task]:
+        query = (
+            update(models.Task)
+            .where(models.Task.id == task_id, models.Task.user_id == user_id, models.Task.deleted_at.is_not(None))
+            .values(deleted_at=None, version=models.Task.version + 1)
+            .returning(*models.Task.__table__.c)
+            .execution_options(synchronize_session=False)
+        )
         result = await self.session.execute(query)
-        task = result.scalars().first()
-        if not task:
+        row = result.first()
+        if row is None:
             return None
-        task.title = task_update.title
-        return Task.model_validate(task)
+        return Task.model_validate(row)
 
-    async def update_task_by_id(self, user_id: int, task_id: int, task_update: TaskUpdate) -> Optional[Task]:
-        query = select(models.Task).where(models.Task.id == task_id, models.Task.user_id == user_id)
+    async def purge_deleted_tasks(self, deleted_before: datetime, limit: int) -> list[int]:
+        oldest = (
+            select(models.Task.id)
+            .where(models.Task.deleted_at.is_not(None), models.Task.deleted_at < deleted_before)
+            .order_by(models.Task.deleted_at, models.Task.id)
+            .limit(limit)
+        )
+        query = (
+            delete(models.Task)
+            .where(models.Task.id.in_(oldest))
+            .returning(models.Task.user_id)
+            .execution_options(synchronize_session=False)
+        )
         result = await self.session.execute(query)
-        task = result.scalars().first()
-        if not task:
+        return list(result.scalars().all())
+
+    async def get_task(self, user_id: int, task_id: int) -> Optional[Task]:
+        query = select(*models.Task.__table__.c).where(
+            models.Task.id == task_id, models.Task.user_id == user_id, models.Task.deleted_at.is_(None),
+        )
+        result = await self._reader(user_id).execute(query)
+        row = result.first()
+        if row is None:
             return None
-        task.completed = task_update.completed
-        task.title = task_update.title
-        return Task.model_validate(task)
+        return Task.model_validate(row)
+
+    async def stream_tasks(self, user_id: int, fields: Sequence[str]) -> AsyncIterator[Sequence[tuple]]:
+        query = (
+            select(*(getattr(models.Task, field) for field in fields))
+            .where(models.Task.user_id == user_id, models.Task.deleted_at.is_(None))
+            .order_by(models.Task.position, models.Task.id)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        result = await self._reader(user_id).stream(query)
+        async for rows in result.partitions():
+            yield [tuple(row) for row in rows]
+
+    async def update_task_title_by_id(
+            self, user_id: int, task_id: int, task_update: TaskTitleUpdate,
+            expected_versions: Optional[list[int]] = None,
+    ) -> Optional[Task]:
+        return await self._update_task(user_id, task_id, {"title": task_update.title}, expected_versions)
+
+    async def update_task_by_id(
+            self, user_id: int, task_id: int, task_update: TaskUpdate,
+            expected_versions: Optional[list[int]] = None,
+    ) -> Optional[Task]:
+        values = {"title": task_update.title, "completed": task_update.completed}
+        return await self._update_task(user_id, task_id, values, expected_versions)
+
+    async def update_tasks(self, user_id: int, patches: list[TaskPatch]) -> dict[int, Task]:
+        values = {patch.id: patch.model_dump(exclude={"id"}, exclude_none=True) for patch in patches}
+        rows = await self._update_by_id(user_id, values, *models.Task.__table__.c, bump_version=True)
+        return {row.id: Task.model_validate(row) for row in rows}
 
     async def reorder_tasks(self, user_id: int, reorder_data: ReorderRequest) -> None:
         task_ids = [task.id for task in reorder_data.tasks]
-        query = select(models.Task).where(models.Task.id.in_(task_ids), models.Task.user_id == user_id)
+        positions = {task.id: {"position": task.position} for task in reorder_data.tasks}
+        rows = await self._update_by_id(user_id, positions, models.Task.id)
+        updated_task_ids = {row.id for row in rows}
+
+        if len(updated_task_ids) != len(task_ids):
+            raise MissingTasksError(set(task_ids) - updated_task_ids)
+
+    async def get_task_cursors(self, user_id: int, task_ids: list[int]) -> dict[int, TaskCursor]:
+        query = (
+            select(models.Task.id, models.Task.position)
+            .where(models.Task.id.in_(task_ids), models.Task.user_id == user_id, models.Task.deleted_at.is_(None))
+        )
         result = await self.session.execute(query)
-        tasks = result.scalars().all()
-
-        if len(tasks) != len(task_ids):
-            found_task_ids = {task.id for task in tasks}
-            missing_task_ids = set(task_ids) - found_task_ids
-            raise MissingTasksError(missing_task_ids)
-
-        for task_data in reorder_data.tasks:
-            task = next((task for task in tasks if task.id == task_data.id), None)
-            if not task:
-                raise TaskNotFoundError(task_data.id)
-            task.position = task_data.position
-        try:
-            await self.session.commit()
-        except StaleDataError as e:
-            await self.session.rollback()
-            raise DataConflictError(f"Data conflict error: {str(e)}")
+        return {task_id: TaskCursor(position=position, id=task_id) for task_id, position in result}
+
+    async def get_next_position(
+            self, user_id: int, after: Optional[TaskCursor], exclude_task_id: int,
+    ) -> Optional[int]:
+        query = select(models.Task.position).where(
+            models.Task.user_id == user_id,
+            models.Task.deleted_at.is_(None),
+            models.Task.id != exclude_task_id,
+        )
+        if after is not None:
+            query = query.where(tuple_(models.Task.position, models.Task.id) > tuple_(after.position, after.id))
+        query = query.order_by(models.Task.position, models.Task.id).limit(1)
+        result = await self.session.execute(query)
+        return result.scalar()
+
+    async def get_previous_position(
+            self, user_id: int, before: Optional[TaskCursor], exclude_task_id: int,
+    ) -> Optional[int]:
+        query = select(models.Task.position).where(
+            models.Task.user_id == user_id,
+            models.Task.deleted_at.is_(None),
+            models.Task.id != exclude_task_id,
+        )
+        if before is not None:
+            query = query.where(tuple_(models.Task.position, models.Task.id) < tuple_(before.position, before.id))
+        query = query.order_by(models.Task.position.desc(), models.Task.id.desc()).limit(1)
+        result = await self.session.execute(query)
+        return result.scalar()
+
+    async def set_task_position(self, user_id: int, task_id: int, position: int) -> Optional[Task]:
+        query = (
+            update(models.Task)
+            .where(models.Task.id == task_id, models.Task.user_id == user_id, models.Task.deleted_at.is_(None))
+            .values(position=position)
+            .returning(*models.Task.__table__.c)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        row = result.first()
+        if row is None:
+            return None
+        return Task.model_validate(row)
+
+    async def rebalance_positions(self, user_id: int) -> None:
+        ranked = (
+            select(
+                models.Task.id,
+                func.row_number().over(order_by=(models.Task.position, models.Task.id)).label("rank"),
+            )
+            .where(models.Task.user_id == user_id, models.Task.deleted_at.is_(None))
+            .subquery()
+        )
+        query = (
+            update(models.Task)
+            .where(models.Task.id == ranked.c.id)
+            .values(position=(ranked.c.rank - 1) * POSITION_STEP)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(query)
+
+    async def has_crowded_positions(self, user_id: int) -> bool:
+        gaps = (
+            select(
+                (
+                    models.Task.position
+                    - func.lag(models.Task.position).over(order_by=(models.Task.position, models.Task.id))
+                ).label("gap"),
+            )
+            .where(models.Task.user_id == user_id, models.Task.deleted_at.is_(None))
+            .subquery()
+        )
+        query = select(gaps.c.gap).where(gaps.c.gap < 2).limit(1)
+        result = await self.session.execute(query)
+        return result.first() is not None
+
+    async def get_position_range(self, user_id: int) -> tuple[int, Optional[int], Optional[int]]:
+        query = (
+            select(func.count(), func.min(models.Task.position), func.max(models.Task.position))
+            .where(models.Task.user_id == user_id, models.Task.deleted_at.is_(None))
+        )
+        count, lowest, highest = (await self.session.execute(query)).one()
+        return count, lowest, highest
+
+    async def spread_positions(self, user_id: int, bound: int, limit: int, descending: bool = False) -> list[int]:
+        query = select(models.Task.id, models.Task.position).where(
+            models.Task.user_id == user_id, models.Task.deleted_at.is_(None),
+        )
+        if descending:
+            query = query.where(models.Task.position < bound)
+            query = query.order_by(models.Task.position.desc(), models.Task.id.desc())
+        else:
+            query = query.where(models.Task.position > bound)
+            query = query.order_by(models.Task.position, models.Task.id)
+        rows = (await self.session.execute(query.limit(limit + 1))).all()
+        moved = rows[:limit]
+        if not moved:
+            return []
+        step = POSITION_STEP
+        if len(rows) > limit:
+            # tasks moved or inserted next to the bound meanwhile take some of the room
+            step = min(step, abs(rows[limit].position - bound) // (len(moved) + 1))
+            if step < 1:
+                raise DataConflictError("No room to spread out the task positions, the list is being changed")
+        if descending:
+            step = -step
+        positions = {task_id: bound + step * rank for rank, (task_id, _) in enumerate(moved, start=1)}
+        values = {task_id: {"position": position} for task_id, position in positions.items()}
+        await self._update_by_id(user_id, values, models.Task.id)
+        return list(positions.values())
+
+    async def get_list_version(self, user_id: int) -> int:
+        query = select(models.TaskListVersion.version).where(models.TaskListVersion.user_id == user_id)
+        result = await self._reader(user_id).execute(query)
+        return result.scalar() or 0
+
+    def mark_written(self, user_id: int) -> None:
+        """
+        Switches the reads of this gateway, and with `stickiness` the user's reads, to the primary.
+        """
+        self._written = True
+        if self.stickiness is not None:
+            self.stickiness.mark(user_id)
+
+    async def bump_list_version(self, user_id: int, by: int = 1) -> int:
+        # every write path bumps the list version, so the user's reads are switched to the primary here
+        self.mark_written(user_id)
+        query = (
+            update(models.TaskListVersion)
+            .where(models.TaskListVersion.user_id == user_id)
+            .values(version=models.TaskListVersion.version + by)
+            .returning(models.TaskListVersion.version)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        version = result.scalar()
+        if version is None:
+            version = by
+            await self.session.execute(insert(models.TaskListVersion).values(user_id=user_id, version=version))
+        return version
+
+    async def get_task_stats(self, user_id: int, since: date) -> TaskStats:
+        session = self._reader(user_id)
+        query = select(models.TaskSummary.total, models.TaskSummary.completed).where(
+            models.TaskSummary.user_id == user_id,
+        )
+        summary = (await session.execute(query)).first()
+        query = (
+            select(models.TaskDailySummary.day, models.TaskDailySummary.created)
+            .where(
+                models.TaskDailySummary.user_id == user_id,
+                models.TaskDailySummary.day >= since,
+                models.TaskDailySummary.created > 0,
+            )
+            .order_by(models.TaskDailySummary.day)
+        )
+        days = (await session.execute(query)).all()
+        return TaskStats(
+            total=summary.total if summary else 0,
+            completed=summary.completed if summary else 0,
+            created_per_day=[DailyTaskCount(day=day, created=created) for day, created in days],
+        )
+
+    async def get_user_ids(self, after: int, limit: int) -> list[int]:
+        query = select(models.User.id).where(models.User.id > after).order_by(models.User.id).limit(limit)
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def reconcile_task_stats(self, user_ids: list[int]) -> list[int]:
+        # The summary rows are written before counting: that takes the write lock of the database on SQLite
+        # and locks the rows on Postgres, so triggers of concurrent task writes wait for the recount to commit
+        # instead of being overwritten by it. Every trigger updates task_summaries first, which also guards
+        # the daily summaries. Users without a summary row are not locked on Postgres, a concurrent first
+        # task of such a user fails the transaction and the batch is recounted next time.
+        query = (
+            update(models.TaskSummary)
+            .where(models.TaskSummary.user_id.in_(user_ids))
+            .values(total=models.TaskSummary.total)
+            .returning(models.TaskSummary.user_id, models.TaskSummary.total, models.TaskSummary.completed)
+            .execution_options(synchronize_session=False)
+        )
+        stored = {user_id: (total, completed) for user_id, total, completed in await self.session.execute(query)}
+        query = (
+            select(
+                models.Task.user_id,
+                func.count(),
+                func.coalesce(func.sum(case((models.Task.completed, 1), else_=0)), 0),
+            )
+            .where(models.Task.user_id.in_(user_ids), models.Task.deleted_at.is_(None))
+            .group_by(models.Task.user_id)
+        )
+        actual = {user_id: (total, completed) for user_id, total, completed in await self.session.execute(query)}
+        day = type_coerce(func.date(models.Task.createdAt), Date)
+        query = (
+            select(models.Task.user_id, day, func.count())
+            .where(models.Task.user_id.in_(user_ids), models.Task.deleted_at.is_(None))
+            .group_by(models.Task.user_id, day)
+        )
+        actual_days: dict[int, dict[date, int]] = {}
+        for user_id, created_on, created in await self.session.execute(query):
+            actual_days.setdefault(user_id, {})[created_on] = created
+        query = select(
+            models.TaskDailySummary.user_id, models.TaskDailySummary.day, models.TaskDailySummary.created,
+        ).where(models.TaskDailySummary.user_id.in_(user_ids), models.TaskDailySummary.created != 0)
+        stored_days: dict[int, dict[date, int]] = {}
+        for user_id, created_on, created in await self.session.execute(query):
+            stored_days.setdefault(user_id, {})[created_on] = created
+
+        drifted = [
+            user_id for user_id in user_ids
+            if stored.get(user_id, (0, 0)) != actual.get(user_id, (0, 0))
+            or stored_days.get(user_id, {}) != actual_days.get(user_id, {})
+        ]
+        if not drifted:
+            return []
+        # locked rows are updated in place, a trigger waiting for one applies its change on top of the recount
+        locked = [user_id for user_id in drifted if user_id in stored]
+        if locked:
+            await self.session.execute(
+                update(models.TaskSummary)
+                .where(models.TaskSummary.user_id.in_(locked))
+                .values(
+                    total=case(
+                        {user_id: actual.get(user_id, (0, 0))[0] for user_id in locked},
+                        value=models.TaskSummary.user_id,
+                    ),
+                    completed=case(
+                        {user_id: actual.get(user_id, (0, 0))[1] for user_id in locked},
+                        value=models.TaskSummary.user_id,
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+        missing = [user_id for user_id in drifted if user_id not in stored]
+        if missing:
+            await self.session.execute(insert(models.TaskSummary), [
+                {"user_id": user_id, "total": actual.get(user_id, (0, 0))[0],
+                 "completed": actual.get(user_id, (0, 0))[1]}
+                for user_id in missing
+            ])
+        await self.session.execute(
+            delete(models.TaskDailySummary).where(models.TaskDailySummary.user_id.in_(drifted)),
+        )
+        daily_rows = [
+            {"user_id": user_id, "day": created_on, "created": created}
+            for user_id in drifted
+            for created_on, created in actual_days.get(user_id, {}).items()
+        ]
+        if daily_rows:
+            await self.session.execute(insert(models.TaskDailySummary), daily_rows)
+        return drifted
+
+    async def _update_task(
+            self, user_id: int, task_id: int, values: dict[str, Any], expected_versions: Optional[list[int]],
+    ) -> Optional[Task]:
+        query = (
+            update(models.Task)
+            .where(models.Task.id == task_id, models.Task.user_id == user_id, models.Task.deleted_at.is_(None))
+            .values(**values, version=models.Task.version + 1)
+            .returning(*models.Task.__table__.c)
+            .execution_options(synchronize_session=False)
+        )
+        if expected_versions is not None:
+            query = query.where(models.Task.version.in_(expected_versions))
+        result = await self.session.execute(query)
+        row = result.first()
+        if row is not None:
+            return Task.model_validate(row)
+        if expected_versions is not None and await self.get_task_cursors(user_id, [task_id]):
+            raise TaskVersionConflictError(task_id)
+        return None
+
+    async def _update_by_id(
+            self, user_id: int, values: dict[int, dict[str, Any]], *returning: Any, bump_version: bool = False,
+    ) -> Sequence[Row]:
+        """
+        Applies per-task column values with one `UPDATE ... SET column = CASE id WHEN ...`
+        statement per chunk of tasks and returns the `returning` columns of updated rows.
+        """
+        rows = []
+        task_ids = list(values)
+        for start in range(0, len(task_ids), UPDATE_CHUNK_SIZE):
+            chunk = task_ids[start:start + UPDATE_CHUNK_SIZE]
+            columns = {column for task_id in chunk for column in values[task_id]}
+            assignments = {
+                column: case(
+                    {task_id: values[task_id][column] for task_id in chunk if column in values[task_id]},
+                    value=models.Task.id,
+                    else_=getattr(models.Task, column),
+                )
+                for column in columns
+            }
+            if bump_version:
+                assignments["version"] = models.Task.version + 1
+            query = (
+                update(models.Task)
+                .where(models.Task.id.in_(chunk), models.Task.user_id == user_id, models.Task.deleted_at.is_(None))
+                .values(assignments or {"id": models.Task.id})
+                .returning(*returning)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(query)
+            rows.extend(result.all())
+        return rows
+
+
+class SqlaGatewayFactory(DatabaseGatewayFactory):
+    def __init__(
+            self,
+            session_maker: async_sessionmaker[AsyncSession],
+            read_session_maker: Optional[async_sessionmaker[AsyncSession]] = None,
+            stickiness: Optional[ReadStickiness] = None,
+    ):
+        self.session_maker = session_maker
+        self.read_session_maker = read_session_maker
+        self.stickiness = stickiness
+
+    @asynccontextmanager
+    async def __call__(self) -> AsyncIterator[SqlaGateway]:
+        async with self.session_maker.begin() as session:
+            if self.read_session_maker is None:
+                yield SqlaGateway(session)
+                return
+            async with self.read_session_maker() as read_session:
+                yield SqlaGateway(session, read_session, self.stickiness)
 
 
 class UserSqlaGateway(UserDataBaseGateway):
@@ -0,0 +1,370 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional, AsyncIterator, Sequence, Callable, Awaitable, Any, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncConnection, AsyncSession
+
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway
+from app.adapters.sqlalchemy_db.routing import ReadStickiness
+from app.application.exceptions import DatabaseError
+from app.application.models import TaskCreate, Task, TaskTitleUpdate, TaskUpdate, ReorderRequest, TaskCursor, \
+    TaskPatch, TaskFilter, TaskStats, GroupCommitStats, TaskRow
+from app.application.protocols.database import DatabaseGateway
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RECONNECT_SECONDS = 1
+
+
+@dataclass
+class _Write:
+    user_id: int
+    future: asyncio.Future
+    run: Optional[Callable[[SqlaGateway], Awaitable[Any]]] = None
+    # inserts of a transaction are merged into one statement per user
+    task: Optional[TaskCreate] = None
+
+
+class GroupCommitWriter:
+    """
+    Applies writes of concurrent requests on a dedicated connection, many writes per transaction.
+
+    Writes submitted while a transaction is being applied, or within `window_seconds`
+    after the first write of a transaction, join it, up to `max_batch` writes.
+    The writer waits for the window only while the previous transaction was shared,
+    so a single client does not pay for it on every write.
+    Inserts of a user are applied with one statement, and the list version of a user
+    is advanced once per transaction, while every write still gets a version of its own.
+
+    Errors of the application (`DatabaseError`) fail only their own write, they are raised
+    before anything is written. When a transaction fails otherwise, its writes are retried
+    one transaction each, so only the write that caused the failure fails.
+
+    When the connection is lost or cannot be opened, the writer connects again every
+    `reconnect_seconds`; queued writes wait for it and `available` is false meanwhile.
+    """
+
+    def __init__(
+            self,
+            engine: AsyncEngine,
+            window_seconds: float,
+            max_batch: int,
+            stickiness: Optional[ReadStickiness] = None,
+            reconnect_seconds: float = RECONNECT_SECONDS,
+    ):
+        self.engine = engine
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.stickiness = stickiness
+        self.reconnect_seconds = reconnect_seconds
+        self._queue: asyncio.Queue[Optional[_Write]] = asyncio.Queue()
+        self._running = False
+        self._connected = False
+        self._last_batch_size = 0
+        self._stats = GroupCommitStats()
+
+    @property
+    def available(self) -> bool:
+        """
+        Tells whether writes are applied right now, not while the writer is stopped or reconnecting.
+        """
+        return self._running and self._connected
+
+    async def add_task(self, user_id: int, task: TaskCreate) -> tuple[Task, int]:
+        """
+        Returns the created task and the list version of its insert.
+        """
+        return await self._submit(_Write(user_id, self._new_future(), task=task))
+
+    async def submit(self, user_id: int, run: Callable[[SqlaGateway], Awaitable[T]]) -> tuple[T, Optional[int]]:
+        """
+        Returns the result of `run` and, when the result is not empty, the list version of the write.
+        """
+        return await self._submit(_Write(user_id, self._new_future(), run=run))
+
+    async def run(self) -> None:
+        """
+        Applies submitted writes until `stop` is called. Writes submitted before that are applied.
+        """
+        self._running = True
+        try:
+            while True:
+                stopped = False
+                try:
+                    async with self.engine.connect() as connection:
+                        self._connected = True
+                        stopped = await self._apply_queued(connection)
+                except Exception:
+                    logger.exception("Group commit connection failed")
+                finally:
+                    self._connected = False
+                if stopped or not self._running:
+                    break
+                self._stats.reconnects += 1
+                logger.warning("Group commit writer reconnects in %.1f seconds", self.reconnect_seconds)
+                await asyncio.sleep(self.reconnect_seconds)
+        finally:
+            self._running = False
+            while not self._queue.empty():
+                write = self._queue.get_nowait()
+                if write is not None and not write.future.done():
+                    write.future.set_exception(RuntimeError("Group commit writer stopped"))
+
+    async def stop(self) -> None:
+        self._running = False
+        self._queue.put_nowait(None)
+
+    def stats(self) -> GroupCommitStats:
+        return self._stats.model_copy()
+
+    async def _apply_queued(self, connection: AsyncConnection) -> bool:
+        """
+        Applies queued writes on `connection`. Returns True when the writer is stopped,
+        False when the connection was lost.
+        """
+        while True:
+            write = await self._queue.get()
+            if write is None:
+                return True
+            batch = [write]
+            stopped = await self._collect(batch)
+            self._last_batch_size = len(batch)
+            await self._apply(connection, batch)
+            if stopped:
+                return True
+            if connection.invalidated:
+                return False
+
+    def _new_future(self) -> asyncio.Future:
+        return asyncio.get_running_loop().create_future()
+
+    async def _submit(self, write: _Write) -> Any:
+        if not self._running:
+            raise RuntimeError("Group commit writer is not running")
+        self._queue.put_nowait(write)
+        return await write.future
+
+    async def _collect(self, batch: list[_Write]) -> bool:
+        loop = asyncio.get_running_loop()
+        window = self.window_seconds if self._last_batch_size > 1 else 0
+        deadline = loop.time() + window
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            try:
+                if timeout > 0:
+                    write = await asyncio.wait_for(self._queue.get(), timeout)
+                else:
+                    write = self._queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                return False
+            if write is None:
+                return True
+            batch.append(write)
+        return False
+
+    async def _apply(self, connection: AsyncConnection, batch: list[_Write]) -> None:
+        try:
+            outcomes = await self._transaction(connection, batch)
+        except Exception as e:
+            self._stats.failed_transactions += 1
+            if len(batch) == 1:
+                outcomes = [e]
+            else:
+                for write in batch:
+                    await self._apply(connection, [write])
+                return
+        for write, outcome in zip(batch, outcomes):
+            if write.future.done():
+                continue
+            if isinstance(outcome, Exception):
+                write.future.set_exception(outcome)
+            else:
+                write.future.set_result(outcome)
+
+    async def _transaction(self, connection: AsyncConnection, batch: list[_Write]) -> list[Any]:
+        results: list[Any] = [None] * len(batch)
+        versions: list[Optional[int]] = [None] * len(batch)
+        inserts: dict[int, list[int]] = {}
+        async with AsyncSession(bind=connection, autoflush=False, expire_on_commit=False) as session:
+            database = SqlaGateway(session, stickiness=self.stickiness)
+            for index, write in enumerate(batch):
+                if write.task is not None:
+                    inserts.setdefault(write.user_id, []).append(index)
+                    continue
+                try:
+                    results[index] = await write.run(database)
+                except DatabaseError as e:
+                    results[index] = e
+            for user_id, indexes in inserts.items():
+                if len(indexes) == 1:
+                    results[indexes[0]] = await database.add_task(user_id, batch[indexes[0]].task)
+                    continue
+                new_tasks = await database.add_tasks(user_id, [batch[index].task for index in indexes])
+                for index, new_task in zip(indexes, new_tasks):
+                    results[index] = new_task
+
+            written: dict[int, list[int]] = {}
+            for index, (write, result) in enumerate(zip(batch, results)):
+                if result and not isinstance(result, Exception):
+                    written.setdefault(write.user_id, []).append(index)
+            for user_id, indexes in written.items():
+                last_version = await database.bump_list_version(user_id, by=len(indexes))
+                for version, index in enumerate(indexes, start=last_version - len(indexes) + 1):
+                    versions[index] = version
+            await session.commit()
+        self._stats.transactions += 1
+        self._stats.writes += len(batch)
+        return [
+            result if isinstance(result, Exception) else (result, version)
+            for result, version in zip(results, versions)
+        ]
+
+
+class GroupCommitGateway(DatabaseGateway):
+    """
+    Sends inserts and updates of tasks to a `GroupCommitWriter`, everything else,
+    including deletes and restores, to `database`. While the writer is not available,
+    inserts and updates go to `database` as well.
+
+    Every write path bumps the list version after writing, so a grouped write bumps it
+    in its own transaction, and the following `bump_list_version` call of the request
+    returns that version instead of writing it again. After a grouped write, reads of
+    `database` go to the primary, as after a write of its own.
+    """
+
+    def __init__(self, database: SqlaGateway, writer: GroupCommitWriter):
+        self.database = database
+        self.writer = writer
+        self._versions: dict[int, int] = {}
+
+    async def _write(self, user_id: int, run: Callable[[SqlaGateway], Awaitable[T]]) -> T:
+        if not self.writer.available:
+            return await run(self.database)
+        result, version = await self.writer.submit(user_id, run)
+        if version is not None:
+            self._versions[user_id] = version
+            self.database.mark_written(user_id)
+        return result
+
+    async def add_task(self, user_id: int, task: TaskCreate) -> Task:
+        if not self.writer.available:
+            return await self.database.add_task(user_id, task)
+        new_task, self._versions[user_id] = await self.writer.add_task(user_id, task)
+        self.database.mark_written(user_id)
+        return new_task
+
+    async def add_tasks(self, user_id: int, tasks: list[TaskCreate]) -> list[Task]:
+        return await self._write(user_id, lambda database: database.add_tasks(user_id, tasks))
+
+    async def delete_task_by_id(self, user_id: int, task_id: int) -> Optional[int]:
+        return await self.database.delete_task_by_id(user_id, task_id)
+
+    async def delete_tasks(self, user_id: int, task_ids: list[int]) -> list[int]:
+        return await self.database.delete_tasks(user_id, task_ids)
+
+    async def restore_task_by_id(self, user_id: int, task_id: int) -> Optional[Task]:
+        return await self.database.restore_task_by_id(user_id, task_id)
+
+    async def purge_deleted_tasks(self, deleted_before: datetime, limit: int) -> list[int]:
+        return await self.database.purge_deleted_tasks(deleted_before, limit)
+
+    async def get_tasks(
+            self,
+            user_id: int,
+            skip: int,
+            limit: int,
+            fields: Optional[Sequence[str]] = None,
+            filters: Optional[TaskFilter] = None,
+    ) -> list[TaskRow]:
+        return await self.database.get_tasks(user_id, skip, limit, fields, filters)
+
+    async def get_tasks_after(
+            self,
+            user_id: int,
+            after: Optional[TaskCursor],
+            limit: int,
+            fields: Optional[Sequence[str]] = None,
+            filters: Optional[TaskFilter] = None,
+    ) -> list[TaskRow]:
+        return await self.database.get_tasks_after(user_id, after, limit, fields, filters)
+
+    async def get_task(self, user_id: int, task_id: int) -> Optional[Task]:
+        return await self.database.get_task(user_id, task_id)
+
+    def stream_tasks(self, user_id: int, fields: Sequence[str]) -> AsyncIterator[Sequence[tuple]]:
+        return self.database.stream_tasks(user_id, fields)
+
+    async def update_task_title_by_id(
+            self, user_id: int, task_id: int, task_update: TaskTitleUpdate,
+            expected_versions: Optional[list[int]] = None,
+    ) -> Optional[Task]:
+        return await self._write(user_id, lambda database: database.update_task_title_by_id(
+            user_id, task_id, task_update, expected_versions,
+        ))
+
+    async def update_task_by_id(
+            self, user_id: int, task_id: int, task_update: TaskUpdate,
+            expected_versions: Optional[list[int]] = None,
+    ) -> Optional[Task]:
+        return await self._write(user_id, lambda database: database.update_task_by_id(
+            user_id, task_id, task_update, expected_versions,
+        ))
+
+    async def update_tasks(self, user_id: int, patches: list[TaskPatch]) -> dict[int, Task]:
+        return await self._write(user_id, lambda database: database.update_tasks(user_id, patches))
+
+    async def reorder_tasks(self, user_id: int, reorder_data: ReorderRequest) -> None:
+        await self.database.reorder_tasks(user_id, reorder_data)
+
+    async def get_task_cursors(self, user_id: int, task_ids: list[int]) -> dict[int, TaskCursor]:
+        return await self.database.get_task_cursors(user_id, task_ids)
+
+    async def get_next_position(
+            self, user_id: int, after: Optional[TaskCursor], exclude_task_id: int,
+    ) -> Optional[int]:
+        return await self.database.get_next_position(user_id, after, exclude_task_id)
+
+    async def get_previous_position(
+            self, user_id: int, before: Optional[TaskCursor], exclude_task_id: int,
+    ) -> Optional[int]:
+        return await self.database.get_previous_position(user_id, before, exclude_task_id)
+
+    async def set_task_position(self, user_id: int, task_id: int, position: int) -> Optional[Task]:
+        return await self.database.set_task_position(user_id, task_id, position)
+
+    async def rebalance_positions(self, user_id: int) -> None:
+        await self.database.rebalance_positions(user_id)
+
+    async def has_crowded_positions(self, user_id: int) -> bool:
+        return await self.database.has_crowded_positions(user_id)
+
+    async def get_position_range(self, user_id: int) -> tuple[int, Optional[int], Optional[int]]:
+        return await self.database.get_position_range(user_id)
+
+    async def spread_positions(self, user_id: int, bound: int, limit: int, descending: bool = False) -> list[int]:
+        return await self.database.spread_positions(user_id, bound, limit, descending)
+
+    async def get_list_version(self, user_id: int) -> int:
+        return await self.database.get_list_version(user_id)
+
+    async def bump_list_version(self, user_id: int, by: int = 1) -> int:
+        version = self._versions.pop(user_id, None)
+        if version is None:
+            return await self.database.bump_list_version(user_id, by)
+        if by > 1:
+            # the grouped write advanced the version for one of the writes already
+            return await self.database.bump_list_version(user_id, by - 1)
+        return version
+
+    async def get_task_stats(self, user_id: int, since: date) -> TaskStats:
+        return await self.database.get_task_stats(user_id, since)
+
+    async def get_user_ids(self, after: int, limit: int) -> list[int]:
+        return await self.database.get_user_ids(after, limit)
+
+    async def reconcile_task_stats(self, user_ids: list[int]) -> list[int]:
+        return await self.database.reconcile_task_stats(user_ids)
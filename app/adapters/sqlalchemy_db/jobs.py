@@ -0,0 +1,89 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import select, update, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters.sqlalchemy_db import models
+from app.application.models import Job
+from app.application.protocols.jobs import JobQueue, JobStore
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+FAILED = "failed"
+
+
+class SqlaJobQueue(JobQueue):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def enqueue(self, name: str, payload: dict[str, Any], delay_seconds: float = 0, unique: bool = False) -> None:
+        if unique:
+            # a claimed job may have read its data already, only jobs that have not run yet are shared;
+            # payloads are compared here, JSON equality differs between dialects
+            query = select(models.Job.payload).where(
+                models.Job.name == name, models.Job.status == PENDING, models.Job.attempts == 0,
+            )
+            if payload in (await self.session.execute(query)).scalars():
+                return
+        query = insert(models.Job).values(
+            name=name,
+            payload=payload,
+            status=PENDING,
+            attempts=0,
+            run_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+            createdAt=datetime.utcnow(),
+        )
+        await self.session.execute(query)
+
+
+class SqlaJobStore(JobStore):
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession]):
+        self.session_maker = session_maker
+
+    async def claim(self, now: datetime, limit: int, lease_seconds: float, max_attempts: int) -> list[Job]:
+        # a job whose last attempt crashed or hung the process is due again without an outcome stored
+        expired = (
+            update(models.Job)
+            .where(models.Job.status == PENDING, models.Job.run_at <= now, models.Job.attempts >= max_attempts)
+            .values(status=FAILED, last_error="Lease expired on the last attempt")
+            .returning(models.Job.id, models.Job.name, models.Job.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        # SKIP LOCKED lets several processes claim from the same table on Postgres,
+        # SQLite serializes writers and renders no locking clause
+        due = (
+            select(models.Job.id)
+            .where(models.Job.status == PENDING, models.Job.run_at <= now, models.Job.attempts < max_attempts)
+            .order_by(models.Job.run_at, models.Job.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(models.Job)
+            .where(models.Job.id.in_(due))
+            .values(run_at=now + timedelta(seconds=lease_seconds), attempts=models.Job.attempts + 1)
+            .returning(models.Job.id, models.Job.name, models.Job.payload, models.Job.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        async with self.session_maker.begin() as session:
+            for job_id, name, attempts in await session.execute(expired):
+                logger.error("Job %d %s failed, its lease expired after %d attempts", job_id, name, attempts)
+            result = await session.execute(query)
+            return sorted((Job.model_validate(row) for row in result), key=lambda job: job.id)
+
+    async def complete(self, job_id: int) -> None:
+        async with self.session_maker.begin() as session:
+            await session.execute(delete(models.Job).where(models.Job.id == job_id))
+
+    async def retry(self, job_id: int, run_at: datetime, error: Optional[str]) -> None:
+        query = update(models.Job).where(models.Job.id == job_id).values(run_at=run_at, last_error=error)
+        async with self.session_maker.begin() as session:
+            await session.execute(query)
+
+    async def fail(self, job_id: int, error: str) -> None:
+        query = update(models.Job).where(models.Job.id == job_id).values(status=FAILED, last_error=error)
+        async with self.session_maker.begin() as session:
+            await session.execute(query)
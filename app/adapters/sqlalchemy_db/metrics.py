@@ -0,0 +1,36 @@
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.application.models import PoolStats
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """
+    Counts connection checkouts of an engine pool and logs every checkout.
+    """
+
+    def __init__(self, engine: AsyncEngine, name: str):
+        self.name = name
+        self._stats = PoolStats()
+        event.listen(engine.sync_engine, "checkout", self._on_checkout)
+        event.listen(engine.sync_engine, "checkin", self._on_checkin)
+
+    def stats(self) -> PoolStats:
+        return self._stats.model_copy()
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self._stats.checkouts += 1
+        self._stats.checked_out += 1
+        self._stats.peak_checked_out = max(self._stats.peak_checked_out, self._stats.checked_out)
+        logger.debug(
+            "Pool %s checkout: %d in use, peak %d, total %d",
+            self.name, self._stats.checked_out, self._stats.peak_checked_out, self._stats.checkouts,
+        )
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        self._stats.checkins += 1
+        self._stats.checked_out -= 1
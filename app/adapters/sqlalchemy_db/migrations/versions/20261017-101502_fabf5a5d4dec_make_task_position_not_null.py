@@ -0,0 +1,42 @@
+"""Make task position not null
+
+Revision ID: fabf5a5d4dec
+Revises: 60d3226e8ce8
+Create Date: 2026-10-17 10:15:02.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fabf5a5d4dec'
+down_revision: Union[str, None] = '60d3226e8ce8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tasks created before positions were assigned have NULL position,
+    # renumber every list keeping the current order before adding the constraint.
+    # Positions are POSITION_STEP (1024) apart, so moves find free positions between them.
+    op.execute(
+        """
+        UPDATE tasks SET position = (
+            SELECT ranked.rn FROM (
+                SELECT id, (ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY position, id) - 1) * 1024 AS rn
+                FROM tasks
+            ) AS ranked
+            WHERE ranked.id = tasks.id
+        )
+        """
+    )
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.alter_column('position', existing_type=sa.Integer(), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.alter_column('position', existing_type=sa.Integer(), nullable=True)
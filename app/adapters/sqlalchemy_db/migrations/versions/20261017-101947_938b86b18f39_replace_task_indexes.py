@@ -0,0 +1,30 @@
+"""Replace task indexes
+
+Revision ID: 938b86b18f39
+Revises: fabf5a5d4dec
+Create Date: 2026-10-17 10:19:47.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '938b86b18f39'
+down_revision: Union[str, None] = 'fabf5a5d4dec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_tasks_title', table_name='tasks')
+    op.drop_index('ix_tasks_id', table_name='tasks')
+    op.create_index('ix_tasks_user_id_position_id', 'tasks', ['user_id', 'position', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_user_id_position_id', table_name='tasks')
+    op.create_index('ix_tasks_id', 'tasks', ['id'], unique=False)
+    op.create_index('ix_tasks_title', 'tasks', ['title'], unique=False)
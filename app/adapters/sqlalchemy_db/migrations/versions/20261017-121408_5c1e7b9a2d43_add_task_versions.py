@@ -0,0 +1,35 @@
+"""Add task versions
+
+Revision ID: 5c1e7b9a2d43
+Revises: 938b86b18f39
+Create Date: 2026-10-17 12:14:08.331742
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7b9a2d43'
+down_revision: Union[str, None] = '938b86b18f39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('task_list_versions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute("INSERT INTO task_list_versions (user_id, version) SELECT id, 0 FROM users")
+    op.add_column('tasks', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('version')
+    op.drop_table('task_list_versions')
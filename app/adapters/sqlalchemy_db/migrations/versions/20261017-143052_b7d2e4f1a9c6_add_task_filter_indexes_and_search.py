@@ -0,0 +1,62 @@
+"""Add task filter indexes and full text search
+
+Revision ID: b7d2e4f1a9c6
+Revises: 5c1e7b9a2d43
+Create Date: 2026-10-17 14:30:52.418263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e4f1a9c6'
+down_revision: Union[str, None] = '5c1e7b9a2d43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+    "title, description, owner, content='', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts (rowid, title, description, owner) "
+    "VALUES (new.id, new.title, new.description, 'u' || new.user_id); END",
+    "CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts (tasks_fts, rowid, title, description, owner) "
+    "VALUES ('delete', old.id, old.title, old.description, 'u' || old.user_id); END",
+    "CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts (tasks_fts, rowid, title, description, owner) "
+    "VALUES ('delete', old.id, old.title, old.description, 'u' || old.user_id); "
+    "INSERT INTO tasks_fts (rowid, title, description, owner) "
+    "VALUES (new.id, new.title, new.description, 'u' || new.user_id); END",
+    "INSERT INTO tasks_fts (rowid, title, description, owner) "
+    "SELECT id, title, description, 'u' || user_id FROM tasks",
+)
+
+
+def upgrade() -> None:
+    op.create_index('ix_tasks_user_id_completed_position_id', 'tasks', ['user_id', 'completed', 'position', 'id'],
+                    unique=False)
+    op.create_index('ix_tasks_user_id_created_at_id', 'tasks', ['user_id', 'createdAt', 'id'], unique=False)
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        op.create_index('ix_tasks_search', 'tasks',
+                        [sa.text("to_tsvector('simple', title || ' ' || coalesce(description, ''))")],
+                        unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('tasks_fts_insert', 'tasks_fts_delete', 'tasks_fts_update'):
+            op.execute(f"DROP TRIGGER {trigger}")
+        op.execute("DROP TABLE tasks_fts")
+    elif dialect == 'postgresql':
+        op.drop_index('ix_tasks_search', table_name='tasks')
+    op.drop_index('ix_tasks_user_id_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_user_id_completed_position_id', table_name='tasks')
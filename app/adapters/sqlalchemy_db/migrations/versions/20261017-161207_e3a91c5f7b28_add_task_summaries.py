@@ -0,0 +1,106 @@
+"""Add task summaries
+
+Revision ID: e3a91c5f7b28
+Revises: b7d2e4f1a9c6
+Create Date: 2026-10-17 16:12:07.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a91c5f7b28'
+down_revision: Union[str, None] = 'b7d2e4f1a9c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_TRIGGERS = (
+    "CREATE TRIGGER task_summaries_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO task_summaries (user_id, total, completed) VALUES (new.user_id, 1, coalesce(new.completed, 0)) "
+    "ON CONFLICT (user_id) DO UPDATE SET total = total + 1, completed = completed + excluded.completed; "
+    "INSERT INTO task_daily_summaries (user_id, day, created) VALUES (new.user_id, date(new.\"createdAt\"), 1) "
+    "ON CONFLICT (user_id, day) DO UPDATE SET created = created + 1; END",
+    "CREATE TRIGGER task_summaries_delete AFTER DELETE ON tasks BEGIN "
+    "UPDATE task_summaries SET total = total - 1, completed = completed - coalesce(old.completed, 0) "
+    "WHERE user_id = old.user_id; "
+    "UPDATE task_daily_summaries SET created = created - 1 "
+    "WHERE user_id = old.user_id AND day = date(old.\"createdAt\"); END",
+    "CREATE TRIGGER task_summaries_update AFTER UPDATE OF completed ON tasks "
+    "WHEN coalesce(new.completed, 0) != coalesce(old.completed, 0) BEGIN "
+    "UPDATE task_summaries SET completed = completed + coalesce(new.completed, 0) - coalesce(old.completed, 0) "
+    "WHERE user_id = new.user_id; END",
+)
+
+POSTGRESQL_TRIGGERS = (
+    """
+    CREATE OR REPLACE FUNCTION update_task_summaries() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO task_summaries (user_id, total, completed)
+            VALUES (NEW.user_id, 1, coalesce(NEW.completed, false)::int)
+            ON CONFLICT (user_id) DO UPDATE
+            SET total = task_summaries.total + 1, completed = task_summaries.completed + EXCLUDED.completed;
+            INSERT INTO task_daily_summaries (user_id, day, created) VALUES (NEW.user_id, NEW."createdAt"::date, 1)
+            ON CONFLICT (user_id, day) DO UPDATE SET created = task_daily_summaries.created + 1;
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE task_summaries
+            SET total = total - 1, completed = completed - coalesce(OLD.completed, false)::int
+            WHERE user_id = OLD.user_id;
+            UPDATE task_daily_summaries SET created = created - 1
+            WHERE user_id = OLD.user_id AND day = OLD."createdAt"::date;
+        ELSIF coalesce(NEW.completed, false) IS DISTINCT FROM coalesce(OLD.completed, false) THEN
+            UPDATE task_summaries
+            SET completed = completed + coalesce(NEW.completed, false)::int - coalesce(OLD.completed, false)::int
+            WHERE user_id = NEW.user_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "CREATE TRIGGER task_summaries AFTER INSERT OR DELETE OR UPDATE OF completed ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION update_task_summaries()",
+)
+
+
+def upgrade() -> None:
+    op.create_table('task_summaries',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('task_daily_summaries',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        completed, day = "coalesce(completed, 0)", 'date("createdAt")'
+        triggers = SQLITE_TRIGGERS
+    else:
+        completed, day = "coalesce(completed, false)::int", '"createdAt"::date'
+        triggers = POSTGRESQL_TRIGGERS
+    op.execute(f"INSERT INTO task_summaries (user_id, total, completed) "
+               f"SELECT user_id, count(*), sum({completed}) FROM tasks GROUP BY user_id")
+    op.execute(f"INSERT INTO task_daily_summaries (user_id, day, created) "
+               f"SELECT user_id, {day}, count(*) FROM tasks GROUP BY user_id, {day}")
+    for statement in triggers:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('task_summaries_insert', 'task_summaries_delete', 'task_summaries_update'):
+            op.execute(f"DROP TRIGGER {trigger}")
+    else:
+        op.execute("DROP TRIGGER task_summaries ON tasks")
+        op.execute("DROP FUNCTION update_task_summaries()")
+    op.drop_table('task_daily_summaries')
+    op.drop_table('task_summaries')
@@ -0,0 +1,160 @@
+"""Add task tombstones
+
+Revision ID: c4f8a2d9e6b1
+Revises: e3a91c5f7b28
+Create Date: 2026-10-17 18:30:15.274519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f8a2d9e6b1'
+down_revision: Union[str, None] = 'e3a91c5f7b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIST_INDEXES = {
+    'ix_tasks_user_id_position_id': ['user_id', 'position', 'id'],
+    'ix_tasks_user_id_completed_position_id': ['user_id', 'completed', 'position', 'id'],
+    'ix_tasks_user_id_created_at_id': ['user_id', 'createdAt', 'id'],
+}
+
+SQLITE_COUNT_TASK = (
+    "INSERT INTO task_summaries (user_id, total, completed) VALUES (new.user_id, 1, coalesce(new.completed, 0)) "
+    "ON CONFLICT (user_id) DO UPDATE SET total = total + 1, completed = completed + excluded.completed; "
+    "INSERT INTO task_daily_summaries (user_id, day, created) VALUES (new.user_id, date(new.\"createdAt\"), 1) "
+    "ON CONFLICT (user_id, day) DO UPDATE SET created = created + 1; "
+)
+SQLITE_UNCOUNT_TASK = (
+    "UPDATE task_summaries SET total = total - 1, completed = completed - coalesce(old.completed, 0) "
+    "WHERE user_id = old.user_id; "
+    "UPDATE task_daily_summaries SET created = created - 1 "
+    "WHERE user_id = old.user_id AND day = date(old.\"createdAt\"); "
+)
+SQLITE_TRIGGERS = (
+    "CREATE TRIGGER task_summaries_delete AFTER DELETE ON tasks "
+    "WHEN old.deleted_at IS NULL BEGIN " + SQLITE_UNCOUNT_TASK + "END",
+    "CREATE TRIGGER task_summaries_soft_delete AFTER UPDATE OF deleted_at ON tasks "
+    "WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL BEGIN " + SQLITE_UNCOUNT_TASK + "END",
+    "CREATE TRIGGER task_summaries_restore AFTER UPDATE OF deleted_at ON tasks "
+    "WHEN old.deleted_at IS NOT NULL AND new.deleted_at IS NULL BEGIN " + SQLITE_COUNT_TASK + "END",
+    "CREATE TRIGGER task_summaries_update AFTER UPDATE OF completed ON tasks "
+    "WHEN new.deleted_at IS NULL AND coalesce(new.completed, 0) != coalesce(old.completed, 0) BEGIN "
+    "UPDATE task_summaries SET completed = completed + coalesce(new.completed, 0) - coalesce(old.completed, 0) "
+    "WHERE user_id = new.user_id; END",
+)
+SQLITE_PREVIOUS_TRIGGERS = (
+    "CREATE TRIGGER task_summaries_delete AFTER DELETE ON tasks BEGIN " + SQLITE_UNCOUNT_TASK + "END",
+    "CREATE TRIGGER task_summaries_update AFTER UPDATE OF completed ON tasks "
+    "WHEN coalesce(new.completed, 0) != coalesce(old.completed, 0) BEGIN "
+    "UPDATE task_summaries SET completed = completed + coalesce(new.completed, 0) - coalesce(old.completed, 0) "
+    "WHERE user_id = new.user_id; END",
+)
+
+POSTGRESQL_TRIGGERS = (
+    """
+    CREATE OR REPLACE FUNCTION update_task_summaries() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT'
+                OR (TG_OP = 'UPDATE' AND OLD.deleted_at IS NOT NULL AND NEW.deleted_at IS NULL) THEN
+            INSERT INTO task_summaries (user_id, total, completed)
+            VALUES (NEW.user_id, 1, coalesce(NEW.completed, false)::int)
+            ON CONFLICT (user_id) DO UPDATE
+            SET total = task_summaries.total + 1, completed = task_summaries.completed + EXCLUDED.completed;
+            INSERT INTO task_daily_summaries (user_id, day, created) VALUES (NEW.user_id, NEW."createdAt"::date, 1)
+            ON CONFLICT (user_id, day) DO UPDATE SET created = task_daily_summaries.created + 1;
+        ELSIF OLD.deleted_at IS NOT NULL THEN
+            -- tombstones are not counted, whatever happens to them
+            NULL;
+        ELSIF TG_OP = 'DELETE' OR NEW.deleted_at IS NOT NULL THEN
+            UPDATE task_summaries
+            SET total = total - 1, completed = completed - coalesce(OLD.completed, false)::int
+            WHERE user_id = OLD.user_id;
+            UPDATE task_daily_summaries SET created = created - 1
+            WHERE user_id = OLD.user_id AND day = OLD."createdAt"::date;
+        ELSIF coalesce(NEW.completed, false) IS DISTINCT FROM coalesce(OLD.completed, false) THEN
+            UPDATE task_summaries
+            SET completed = completed + coalesce(NEW.completed, false)::int - coalesce(OLD.completed, false)::int
+            WHERE user_id = NEW.user_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER task_summaries ON tasks",
+    "CREATE TRIGGER task_summaries AFTER INSERT OR DELETE OR UPDATE OF completed, deleted_at ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION update_task_summaries()",
+)
+
+POSTGRESQL_PREVIOUS_TRIGGERS = (
+    """
+    CREATE OR REPLACE FUNCTION update_task_summaries() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO task_summaries (user_id, total, completed)
+            VALUES (NEW.user_id, 1, coalesce(NEW.completed, false)::int)
+            ON CONFLICT (user_id) DO UPDATE
+            SET total = task_summaries.total + 1, completed = task_summaries.completed + EXCLUDED.completed;
+            INSERT INTO task_daily_summaries (user_id, day, created) VALUES (NEW.user_id, NEW."createdAt"::date, 1)
+            ON CONFLICT (user_id, day) DO UPDATE SET created = task_daily_summaries.created + 1;
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE task_summaries
+            SET total = total - 1, completed = completed - coalesce(OLD.completed, false)::int
+            WHERE user_id = OLD.user_id;
+            UPDATE task_daily_summaries SET created = created - 1
+            WHERE user_id = OLD.user_id AND day = OLD."createdAt"::date;
+        ELSIF coalesce(NEW.completed, false) IS DISTINCT FROM coalesce(OLD.completed, false) THEN
+            UPDATE task_summaries
+            SET completed = completed + coalesce(NEW.completed, false)::int - coalesce(OLD.completed, false)::int
+            WHERE user_id = NEW.user_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER task_summaries ON tasks",
+    "CREATE TRIGGER task_summaries AFTER INSERT OR DELETE OR UPDATE OF completed ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION update_task_summaries()",
+)
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    alive = sa.text('deleted_at IS NULL')
+    for name, columns in LIST_INDEXES.items():
+        op.drop_index(name, table_name='tasks')
+        op.create_index(name, 'tasks', columns, unique=False, sqlite_where=alive, postgresql_where=alive)
+    deleted = sa.text('deleted_at IS NOT NULL')
+    op.create_index('ix_tasks_deleted_at_id', 'tasks', ['deleted_at', 'id'], unique=False,
+                    sqlite_where=deleted, postgresql_where=deleted)
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER task_summaries_delete")
+        op.execute("DROP TRIGGER task_summaries_update")
+        triggers = SQLITE_TRIGGERS
+    else:
+        triggers = POSTGRESQL_TRIGGERS
+    for statement in triggers:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    # tombstones are not counted in the summaries, they go before the previous triggers are back
+    op.execute("DELETE FROM tasks WHERE deleted_at IS NOT NULL")
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('task_summaries_delete', 'task_summaries_soft_delete', 'task_summaries_restore',
+                        'task_summaries_update'):
+            op.execute(f"DROP TRIGGER {trigger}")
+        triggers = SQLITE_PREVIOUS_TRIGGERS
+    else:
+        triggers = POSTGRESQL_PREVIOUS_TRIGGERS
+    for statement in triggers:
+        op.execute(statement)
+    op.drop_index('ix_tasks_deleted_at_id', table_name='tasks')
+    for name, columns in LIST_INDEXES.items():
+        op.drop_index(name, table_name='tasks')
+        op.create_index(name, 'tasks', columns, unique=False)
+    op.drop_column('tasks', 'deleted_at')
@@ -1,9 +1,16 @@
 __all__ = (
     "Base",
+    "Job",
     "Task",
+    "TaskListVersion",
+    "TaskSummary",
+    "TaskDailySummary",
     "User",
 )
 
 from .base import Base
+from .job import Job
 from .task import Task
+from .task_list_version import TaskListVersion
+from .task_summary import TaskSummary, TaskDailySummary
 from .user import User
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import String, Integer, DateTime, JSON, Index
+from sqlalchemy.orm import mapped_column, Mapped
+
+from app.adapters.sqlalchemy_db.models import Base
+
+
+class Job(Base):
+    """
+    A queued background job. Pending jobs are due at `run_at`; claiming a job moves `run_at`
+    past its lease, so a job of a process that died is claimed again once the lease ends.
+    Finished jobs are deleted, jobs out of attempts stay with the `failed` status.
+    """
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        Index("ix_jobs_status_run_at_id", "status", "run_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    run_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    createdAt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
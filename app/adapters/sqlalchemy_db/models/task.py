@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, Index, DDL, event, func, text
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from app.adapters.sqlalchemy_db.models import Base
@@ -10,15 +10,64 @@ if TYPE_CHECKING:
     from .user import User
 
 
+# Deleted tasks stay as tombstones until they are purged. List indexes cover live tasks only,
+# queries on them must filter with exactly this condition for the planner to pick them.
+TASK_ALIVE = text("deleted_at IS NULL")
+TASK_DELETED = text("deleted_at IS NOT NULL")
+
+
 class Task(Base):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        Index("ix_tasks_user_id_position_id", "user_id", "position", "id",
+              sqlite_where=TASK_ALIVE, postgresql_where=TASK_ALIVE),
+        Index("ix_tasks_user_id_completed_position_id", "user_id", "completed", "position", "id",
+              sqlite_where=TASK_ALIVE, postgresql_where=TASK_ALIVE),
+        Index("ix_tasks_user_id_created_at_id", "user_id", "createdAt", "id",
+              sqlite_where=TASK_ALIVE, postgresql_where=TASK_ALIVE),
+        Index("ix_tasks_deleted_at_id", "deleted_at", "id",
+              sqlite_where=TASK_DELETED, postgresql_where=TASK_DELETED),
+    )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    title: Mapped[str] = mapped_column(String, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    title: Mapped[str] = mapped_column(String)
     completed: Mapped[bool] = mapped_column(Boolean, default=False)
     createdAt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    position: Mapped[int] = mapped_column(Integer, nullable=True)
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
     description: Mapped[str] = mapped_column(String, default="")
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, default=None)
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     user: Mapped["User"] = relationship("User", back_populates="tasks")
+
+
+# Postgres: the search document is an expression with literal arguments only,
+# so that the same expression in a query is served by the GIN index
+TASK_SEARCH_DOCUMENT = func.to_tsvector(
+    text("'simple'"),
+    Task.__table__.c.title.op("||")(text("' '")).op("||")(func.coalesce(Task.__table__.c.description, text("''"))),
+)
+Index("ix_tasks_search", TASK_SEARCH_DOCUMENT, postgresql_using="gin").ddl_if(dialect="postgresql")
+
+# SQLite: a contentless FTS5 table kept in sync by triggers. The owner column holds
+# "u<user_id>", so a search of one user is an intersection of FTS doclists.
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, owner, content='', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts (rowid, title, description, owner) "
+    "VALUES (new.id, new.title, new.description, 'u' || new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts (tasks_fts, rowid, title, description, owner) "
+    "VALUES ('delete', old.id, old.title, old.description, 'u' || old.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts (tasks_fts, rowid, title, description, owner) "
+    "VALUES ('delete', old.id, old.title, old.description, 'u' || old.user_id); "
+    "INSERT INTO tasks_fts (rowid, title, description, owner) "
+    "VALUES (new.id, new.title, new.description, 'u' || new.user_id); END",
+)
+
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(Task.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Task.__table__, "after_drop", DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"))
@@ -0,0 +1,11 @@
+from sqlalchemy import Integer, ForeignKey
+from sqlalchemy.orm import mapped_column, Mapped
+
+from app.adapters.sqlalchemy_db.models import Base
+
+
+class TaskListVersion(Base):
+    __tablename__ = 'task_list_versions'
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
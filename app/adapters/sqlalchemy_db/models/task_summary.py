@@ -0,0 +1,95 @@
+from datetime import date
+
+from sqlalchemy import Integer, ForeignKey, Date, DDL, event
+from sqlalchemy.orm import mapped_column, Mapped
+
+from app.adapters.sqlalchemy_db.models import Base
+from app.adapters.sqlalchemy_db.models.task import Task
+
+
+class TaskSummary(Base):
+    __tablename__ = 'task_summaries'
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class TaskDailySummary(Base):
+    __tablename__ = 'task_daily_summaries'
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    created: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# Summaries are maintained by triggers on tasks, so that every write path,
+# including bulk statements, keeps them in step within the same transaction.
+# Tombstones are not counted: deleting a task leaves the counters like a hard delete,
+# restoring it like an insert, and purging the tombstone later does not change them.
+_SQLITE_COUNT_TASK = (
+    "INSERT INTO task_summaries (user_id, total, completed) VALUES (new.user_id, 1, coalesce(new.completed, 0)) "
+    "ON CONFLICT (user_id) DO UPDATE SET total = total + 1, completed = completed + excluded.completed; "
+    "INSERT INTO task_daily_summaries (user_id, day, created) VALUES (new.user_id, date(new.\"createdAt\"), 1) "
+    "ON CONFLICT (user_id, day) DO UPDATE SET created = created + 1; "
+)
+_SQLITE_UNCOUNT_TASK = (
+    "UPDATE task_summaries SET total = total - 1, completed = completed - coalesce(old.completed, 0) "
+    "WHERE user_id = old.user_id; "
+    "UPDATE task_daily_summaries SET created = created - 1 "
+    "WHERE user_id = old.user_id AND day = date(old.\"createdAt\"); "
+)
+SQLITE_SUMMARY_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS task_summaries_insert AFTER INSERT ON tasks BEGIN "
+    + _SQLITE_COUNT_TASK + "END",
+    "CREATE TRIGGER IF NOT EXISTS task_summaries_delete AFTER DELETE ON tasks "
+    "WHEN old.deleted_at IS NULL BEGIN " + _SQLITE_UNCOUNT_TASK + "END",
+    "CREATE TRIGGER IF NOT EXISTS task_summaries_soft_delete AFTER UPDATE OF deleted_at ON tasks "
+    "WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL BEGIN " + _SQLITE_UNCOUNT_TASK + "END",
+    "CREATE TRIGGER IF NOT EXISTS task_summaries_restore AFTER UPDATE OF deleted_at ON tasks "
+    "WHEN old.deleted_at IS NOT NULL AND new.deleted_at IS NULL BEGIN " + _SQLITE_COUNT_TASK + "END",
+    "CREATE TRIGGER IF NOT EXISTS task_summaries_update AFTER UPDATE OF completed ON tasks "
+    "WHEN new.deleted_at IS NULL AND coalesce(new.completed, 0) != coalesce(old.completed, 0) BEGIN "
+    "UPDATE task_summaries SET completed = completed + coalesce(new.completed, 0) - coalesce(old.completed, 0) "
+    "WHERE user_id = new.user_id; END",
+)
+
+POSTGRESQL_SUMMARY_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION update_task_summaries() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT'
+                OR (TG_OP = 'UPDATE' AND OLD.deleted_at IS NOT NULL AND NEW.deleted_at IS NULL) THEN
+            INSERT INTO task_summaries (user_id, total, completed)
+            VALUES (NEW.user_id, 1, coalesce(NEW.completed, false)::int)
+            ON CONFLICT (user_id) DO UPDATE
+            SET total = task_summaries.total + 1, completed = task_summaries.completed + EXCLUDED.completed;
+            INSERT INTO task_daily_summaries (user_id, day, created) VALUES (NEW.user_id, NEW."createdAt"::date, 1)
+            ON CONFLICT (user_id, day) DO UPDATE SET created = task_daily_summaries.created + 1;
+        ELSIF OLD.deleted_at IS NOT NULL THEN
+            -- tombstones are not counted, whatever happens to them
+            NULL;
+        ELSIF TG_OP = 'DELETE' OR NEW.deleted_at IS NOT NULL THEN
+            UPDATE task_summaries
+            SET total = total - 1, completed = completed - coalesce(OLD.completed, false)::int
+            WHERE user_id = OLD.user_id;
+            UPDATE task_daily_summaries SET created = created - 1
+            WHERE user_id = OLD.user_id AND day = OLD."createdAt"::date;
+        ELSIF coalesce(NEW.completed, false) IS DISTINCT FROM coalesce(OLD.completed, false) THEN
+            UPDATE task_summaries
+            SET completed = completed + coalesce(NEW.completed, false)::int - coalesce(OLD.completed, false)::int
+            WHERE user_id = NEW.user_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS task_summaries ON tasks",
+    "CREATE TRIGGER task_summaries AFTER INSERT OR DELETE OR UPDATE OF completed, deleted_at ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION update_task_summaries()",
+)
+
+for _statement in SQLITE_SUMMARY_DDL:
+    event.listen(Task.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in POSTGRESQL_SUMMARY_DDL:
+    event.listen(Task.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
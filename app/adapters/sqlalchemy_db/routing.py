@@ -0,0 +1,30 @@
+import time
+
+MAX_TRACKED_USERS = 10_000
+
+
+class ReadStickiness:
+    """
+    Remembers users who wrote recently, so that their reads go to the primary
+    database until a replica has had time to catch up with the write.
+
+    The state is kept per process.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._written_at: dict[int, float] = {}
+
+    def mark(self, user_id: int) -> None:
+        now = time.monotonic()
+        if len(self._written_at) >= MAX_TRACKED_USERS:
+            self._written_at = {
+                tracked_user_id: written_at
+                for tracked_user_id, written_at in self._written_at.items()
+                if now - written_at < self.seconds
+            }
+        self._written_at[user_id] = now
+
+    def is_sticky(self, user_id: int) -> bool:
+        written_at = self._written_at.get(user_id)
+        return written_at is not None and time.monotonic() - written_at < self.seconds
@@ -0,0 +1,53 @@
+import re
+
+from sqlalchemy import ColumnElement, Integer, and_, column, func, literal_column, or_, select, table, true
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.models.task import TASK_SEARCH_DOCUMENT
+
+tasks_fts = table("tasks_fts", column("rowid", Integer), column("tasks_fts"), column("owner"))
+
+# letters and digits, as tokenized by FTS5 unicode61 and the PostgreSQL text search parser
+WORD = re.compile(r"[^\W_]+")
+
+
+def search_terms(q: str) -> list[str]:
+    """
+    Words of the search string, punctuation and operators of the search engines are dropped.
+    """
+    return WORD.findall(q.lower())
+
+
+def fts5_query(user_id: int, terms: list[str]) -> str:
+    """
+    Builds an FTS5 query matching tasks of the user with a word starting with each of the terms.
+    """
+    prefixes = " AND ".join(f'"{term}"*' for term in terms)
+    return f'owner : "u{user_id}" AND ({prefixes})'
+
+
+def tsquery(terms: list[str]) -> str:
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def task_search_condition(dialect: str, user_id: int, q: str) -> ColumnElement[bool]:
+    """
+    Condition on tasks where every word of `q` starts a word of the title or description:
+    `art` finds "Art class" and "artist", but not "start".
+    """
+    terms = search_terms(q)
+    if not terms:
+        return true()
+    if dialect == "postgresql":
+        return TASK_SEARCH_DOCUMENT.op("@@")(func.to_tsquery(literal_column("'simple'"), tsquery(terms)))
+    if dialect == "sqlite":
+        matches = select(tasks_fts.c.rowid).where(tasks_fts.c.tasks_fts.op("MATCH")(fts5_query(user_id, terms)))
+        return models.Task.id.in_(matches)
+    # other databases have no word index, words are told apart by the spaces before them
+    return and_(*(
+        or_(*(
+            or_(func.lower(text).like(f"{term}%"), func.lower(text).like(f"% {term}%"))
+            for text in (models.Task.title, models.Task.description)
+        ))
+        for term in terms
+    ))
@@ -0,0 +1,38 @@
+from typing import Any, Optional, Union
+
+from sqlalchemy import Connection, Engine
+from sqlalchemy.orm import Session
+
+
+class PinnedConnectionSession(Session):
+    """
+    Checks out a connection on first use and keeps it until the session is closed,
+    so commits in the middle of a request do not return it to the pool and check it out again.
+
+    A session that is never used does not check out a connection at all, and closing
+    the session returns the connection to the pool even if the session is used again later.
+    """
+    _pinned: Optional[Connection] = None
+
+    def get_bind(self, mapper: Any = None, **kw: Any) -> Union[Engine, Connection]:
+        bind = super().get_bind(mapper, **kw)
+        if isinstance(bind, Connection):
+            return bind
+        if self._pinned is None or self._pinned.closed:
+            self._pinned = bind.connect()
+        return self._pinned
+
+    def close(self) -> None:
+        super().close()
+        self._release()
+
+    def invalidate(self) -> None:
+        if self._pinned is not None:
+            self._pinned.invalidate()
+        super().invalidate()
+        self._release()
+
+    def _release(self) -> None:
+        if self._pinned is not None:
+            self._pinned.close()
+            self._pinned = None
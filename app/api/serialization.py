@@ -0,0 +1,54 @@
+from typing import Any, Optional, Sequence, AsyncIterator
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.application.models import Task, TaskResponse, TaskEvent, TaskRow
+
+TASK_RESPONSE_FIELDS = set(TaskResponse.model_fields)
+# events carry positions, so clients can place created tasks in their lists
+TASK_EVENT_INCLUDE = {
+    "id": True,
+    "type": True,
+    "tasks": {"__all__": TASK_RESPONSE_FIELDS | {"position"}},
+    "task_ids": True,
+    "positions": True,
+}
+HEARTBEAT_FRAME = b": ping\n\n"
+
+_task_adapter = TypeAdapter(Task)
+_task_row_list_adapter = TypeAdapter(list[TaskRow])
+_task_event_adapter = TypeAdapter(TaskEvent)
+
+
+class TaskJSONResponse(Response):
+    """
+    Renders a task, or the rows of a task list read, to JSON bytes with precompiled adapters,
+    keeping only the fields of `TaskResponse`, or the requested `fields`.
+
+    Endpoints return it directly, so FastAPI does not validate the tasks
+    against `response_model` a second time before encoding them.
+    """
+    media_type = "application/json"
+
+    def __init__(self, content: Any, *args: Any, fields: Optional[Sequence[str]] = None, **kwargs: Any):
+        self.fields = TASK_RESPONSE_FIELDS if fields is None else set(fields)
+        super().__init__(content, *args, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, list):
+            return _task_row_list_adapter.dump_json(content, include={"__all__": self.fields})
+        return _task_adapter.dump_json(content, include=self.fields)
+
+
+async def encode_task_events(events: AsyncIterator[Optional[TaskEvent]]) -> AsyncIterator[bytes]:
+    """
+    Encodes task events as server-sent events, and None as a comment that keeps the connection alive.
+    The event id is sent as the SSE id, so reconnecting clients send it back in `Last-Event-ID`.
+    """
+    async for event in events:
+        if event is None:
+            yield HEARTBEAT_FRAME
+            continue
+        data = _task_event_adapter.dump_json(event, include=TASK_EVENT_INCLUDE)
+        yield b"id: %d\nevent: %s\ndata: %s\n\n" % (event.id, event.type.value.encode(), data)
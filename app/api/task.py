@@ -1,25 +1,46 @@
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response, Query, Request, Header
+from fastapi.responses import StreamingResponse, JSONResponse
 
 from app.adapters.sqlalchemy_db.models import User
-from app.application.exceptions import MissingTasksError, DataConflictError, TaskNotFoundError
+from app.api.depends_stub import Stub
+from app.api.serialization import TaskJSONResponse, encode_task_events
+from app.application.cursor import decode_cursor, next_cursor
+from app.application.etag import task_list_etag, task_etag, etag_matches, if_match_versions
+from app.application.export import TaskFileFormat, MEDIA_TYPES
+from app.application.exceptions import MissingTasksError, DataConflictError, TaskNotFoundError, InvalidCursorError, \
+    TaskVersionConflictError, InvalidFieldsError
 from app.application.fastapi_users import fastapi_users
-from app.application.models import TaskCreate, TaskResponse, TaskTitleUpdate, TaskUpdate, ReorderRequest
-from app.application.models.task import DeleteTaskResponse, ReorderTasksResponse, Task
-from app.application.protocols.database import DatabaseGateway, UoW
+from app.application.fields import parse_fields
+from app.application.models import TaskCreate, TaskResponse, TaskTitleUpdate, TaskUpdate, ReorderRequest, \
+    MoveTaskRequest, TaskBatchCreate, TaskBatchUpdate, TaskBatchDelete, BatchItemResult, BatchResponse, \
+    ImportSummary, TaskFilter, TaskSort, TaskStats, TaskTitleQueued
+from app.application.models.batch import MAX_BATCH_SIZE
+from app.application.models.task import DeleteTaskResponse, ReorderTasksResponse
+from app.application.protocols.database import DatabaseGateway, UoW, DatabaseGatewayFactory
+from app.application.protocols.events import TaskEventBroker
+from app.application.protocols.jobs import JobQueue
 from app.application.task import add_task, delete_task_from_list, get_tasks, update_task_title_by_id, update_task_by_id, \
-    tasks_reorder
+    tasks_reorder, get_tasks_after, move_task as move_task_in_list, add_tasks, \
+    update_tasks as update_tasks_in_list, delete_tasks_from_list, export_tasks, import_tasks, get_task, \
+    get_task_list_version, get_task_stats, stream_task_events, queue_task_title_update, restore_task
+from app.application.write_behind import TitleWriteBehind
 
 task_router = APIRouter()
 
+EVENT_HEARTBEAT_SECONDS = 15
+
 
 @task_router.post("/", response_model=TaskResponse)
 async def create_task(
         database: Annotated[DatabaseGateway, Depends()],
+        uow: Annotated[UoW, Depends()],
+        events: Annotated[TaskEventBroker, Depends()],
         task: TaskCreate,
         user: User = Depends(fastapi_users.current_user(optional=True)),
-) -> Task:
+) -> TaskJSONResponse:
     """
     Creates a new task for the authenticated user.
 
@@ -52,6 +73,8 @@ async def create_task(
 
     ### Parameters:
     - `database` (DatabaseGateway): Injected database dependency.
+    - `uow` (UoW): Unit of Work dependency.
+    - `events` (TaskEventBroker): Publishes the change to event subscribers.
     - `task` (TaskCreate): Task details.
     - `user` (User): Authenticated user information.
 
@@ -60,19 +83,206 @@ async def create_task(
     """
     if user is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    new_task = await add_task(user.id, task, database)
-    return new_task
+    new_task = await add_task(user.id, task, database, uow, events)
+    return TaskJSONResponse(new_task)
+
+
+@task_router.post("/batch", response_model=BatchResponse)
+async def create_tasks(
+        batch: TaskBatchCreate,
+        database: Annotated[DatabaseGateway, Depends()],
+        uow: Annotated[UoW, Depends()],
+        events: Annotated[TaskEventBroker, Depends()],
+        user: User = Depends(fastapi_users.current_user(optional=True)),
+) -> BatchResponse:
+    """
+    Creates several tasks for the authenticated user in one transaction.
+
+    New tasks are appended to the end of the list in the order they are given.
+
+    **Endpoint**: `/tasks/batch`
+
+    ### Request:
+    - **Method**: POST
+    - **Body**: A JSON object with up to 1000 tasks to be created.
+      Example:
+      ```json
+      {
+          "tasks": [
+              {"title": "First Task"},
+              {"title": "Second Task", "completed": true, "description": "Done already"}
+          ]
+      }
+      ```
+
+    ### Response:
+    - **Status 200**: Returns the created tasks, one result per requested task.
+      Example:
+      ```json
+      {
+          "results": [
+              {"index": 0, "id": 1, "task": {"id": 1, "title": "First Task", "...": "..."}, "error": null},
+              {"index": 1, "id": 2, "task": {"id": 2, "title": "Second Task", "...": "..."}, "error": null}
+          ]
+      }
+      ```
+    - **Status 401**: If the user is not authenticated.
+
+    ### Parameters:
+    - `batch` (TaskBatchCreate): Tasks to create.
+    - `database` (DatabaseGateway): Injected database dependency.
+    - `uow` (UoW): Unit of Work dependency.
+    - `events` (TaskEventBroker): Publishes the change to event subscribers.
+    - `user` (User): Authenticated user information.
+
+    ### Returns:
+    - `BatchResponse`: Result for every requested task.
+    """
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    new_tasks = await add_tasks(user.id, batch.tasks, database, uow, events)
+    return BatchResponse(results=[
+        BatchItemResult(index=index, id=task.id, task=TaskResponse.model_validate(task))
+        for index, task in enumerate(new_tasks)
+    ])
+
+
+@task_router.patch("/batch", response_model=BatchResponse)
+async def update_tasks(
+        batch: TaskBatchUpdate,
+        database: Annotated[DatabaseGateway, Depends()],
+        uow: Annotated[UoW, Depends()],
+        events: Annotated[TaskEventBroker, Depends()],
+        user: User = Depends(fastapi_users.current_user(optional=True)),
+) -> BatchResponse:
+    """
+    Partially updates several tasks of the authenticated user in one transaction.
+
+    Only the fields present in an item are changed. Tasks that are not found
+    are reported per item and do not prevent the other updates.
+
+    **Endpoint**: `/tasks/batch`
+
+    ### Request:
+    - **Method**: PATCH
+    - **Body**: A JSON object with up to 1000 task changes.
+      Example:
+      ```json
+      {
+          "tasks": [
+              {"id": 1, "completed": true},
+              {"id": 2, "title": "Renamed Task", "description": "New description"}
+          ]
+      }
+      ```
+
+    ### Response:
+    - **Status 200**: Returns the updated task or an error for every requested change.
+      Example:
+      ```json
+      {
+          "results": [
+              {"index": 0, "id": 1, "task": {"id": 1, "completed": true, "...": "..."}, "error": null},
+              {"index": 1, "id": 2, "task": null, "error": "Task with id 2 not found"}
+          ]
+      }
+      ```
+    - **Status 401**: If the user is not authenticated.
+
+    ### Parameters:
+    - `batch` (TaskBatchUpdate): Task changes.
+    - `database` (DatabaseGateway): Injected database dependency.
+    - `uow` (UoW): Unit of Work dependency.
+    - `events` (TaskEventBroker): Publishes the change to event subscribers.
+    - `user` (User): Authenticated user information.
+
+    ### Returns:
+    - `BatchResponse`: Result for every requested change.
+    """
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    updated_tasks = await update_tasks_in_list(user.id, batch.tasks, database, uow, events)
+    return BatchResponse(results=[
+        BatchItemResult(index=index, id=patch.id, task=TaskResponse.model_validate(task))
+        if task is not None else
+        BatchItemResult(index=index, id=patch.id, error=str(TaskNotFoundError(patch.id)))
+        for index, (patch, task) in enumerate(zip(batch.tasks, updated_tasks))
+    ])
+
+
+@task_router.delete("/batch", response_model=BatchResponse)
+async def delete_tasks(
+        batch: TaskBatchDelete,
+        database: Annotated[DatabaseGateway, Depends()],
+        uow: Annotated[UoW, Depends()],
+        events: Annotated[TaskEventBroker, Depends()],
+        user: User = Depends(fastapi_users.current_user(optional=True)),
+) -> BatchResponse:
+    """
+    Deletes several tasks of the authenticated user in one transaction.
+
+    Tasks that are not found are reported per item and do not prevent the other deletions.
+
+    **Endpoint**: `/tasks/batch`
+
+    ### Request:
+    - **Method**: DELETE
+    - **Body**: A JSON object with up to 1000 task IDs.
+      Example:
+      ```json
+      {
+          "ids": [1, 2]
+      }
+      ```
+
+    ### Response:
+    - **Status 200**: Returns a result for every requested ID.
+      Example:
+      ```json
+      {
+          "results": [
+              {"index": 0, "id": 1, "task": null, "error": null},
+              {"index": 1, "id": 2, "task": null, "error": "Task with id 2 not found"}
+          ]
+      }
+      ```
+    - **Status 401**: If the user is not authenticated.
+
+    ### Parameters:
+    - `batch` (TaskBatchDelete): IDs of the tasks to delete.
+    - `database` (DatabaseGateway): Injected database dependency.
+    - `uow` (UoW): Unit of Work dependency.
+    - `events` (TaskEventBroker): Publishes the change to event subscribers.
+    - `user` (User): Authenticated user information.
+
+    ### Returns:
+    - `BatchResponse`: Result for every requested ID.
+    """
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    deleted_task_ids = await delete_tasks_from_list(user.id, batch.ids, database, uow, events)
+    return BatchResponse(results=[
+        BatchItemResult(index=index, id=task_id)
+        if deleted_task_id is not None else
+        BatchItemResult(index=index, id=task_id, error=str(TaskNotFoundError(task_id)))
+        for index, (task_id, deleted_task_id) in enumerate(zip(batch.ids, deleted_task_ids))
+    ])
 
 
 @task_router.delete("/{task_id}", response_model=DeleteTaskResponse)
 async def delete_task(
         database: Annotated[DatabaseGateway, Depends()],
+        uow: Annotated[UoW, Depends()],
+        events: Annotated[TaskEventBroker, Depends()],
         task_id: int,
         user: User = Depends(fastapi_users.current_user(optional=True)),
 ) -> DeleteTaskResponse:
     """
         Deletes a task by its ID for the authenticated user.
 
+        The task can be brought back with `POST /tasks/{task_id}/restore`
+        until deleted tasks are purged in the background.
+
         **Endpoint**: `/tasks/{task_id}`
 
         ### Request:
@@ -92,6 +302,8 @@ async def delete_task(
 
         ### Parameters:
         - `database` (DatabaseGateway): Injected database dependency.
+        - `uow` (UoW): Unit of Work dependency.
+        - `events` (TaskEventBroker): Publishes the change to event subscribers.
         - `task_id` (int): ID of the task to delete.
         - `user` (User): Authenticated user information.
 
@@ -100,22 +312,86 @@ async def delete_task(
         """
     if user is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    deleted_task_id = await delete_task_from_list(user.id, task_id, database)
+    deleted_task_id = await delete_task_from_list(user.id, task_id, database, uow, events)
     if deleted_task_id is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return DeleteTaskResponse(detail="Task deleted successfully")
 
 
+@task_router.post("/{task_id}/restore", response_model=TaskResponse)
+async def restore_deleted_task(
+        task_id: int,
+        database: Annotated[DatabaseGateway, Depends()],
+        uow: Annotated[UoW, Depends()],
+        events: Annotated[TaskEventBroker, Depends()],
+        user: User = Depends(fastapi_users.current_user(optional=True)),
+) -> TaskJSONResponse:
+    """
+    Restores a deleted task of the authenticated user.
+
+    The task returns with the position it had. Deleted tasks can be restored
+    until they are purged, `TASK_PURGE_AFTER_SECONDS` after the deletion.
+
+    **Endpoint**: `/tasks/{task_id}/restore`
+
+    ### Request:
+    - **Method**: POST
+    - **Path Parameter**: `task_id` (int) - ID of the deleted task.
+
+    ### Response:
+    - **Status 200**: Returns the restored task with its new `ETag` header.
+      Example:
+      ```json
+      {
+          "id": 1,
+          "title": "Sample Task",
+          "completed": false,
+          "createdAt": "2024-12-09T12:00:00",
+          "description": "This is a sample task"
+      }
+      ```
+    - **Status 404**: If there is no deleted task with this ID, or it was purged already.
+    - **Status 401**: If the user is not authenticated.
+
+    ### Parameters:
+    - `task_id` (int): ID of the task to restore.
+    - `database` (DatabaseGateway): Injected database dependency.
+    - `uow` (UoW): Unit of Work dependency.
+    - `events` (TaskEventBroker): Publishes the change to event subscribers.
+    - `user` (User): Authenticated user information.
+
+    ### Returns:
+    - `TaskResponse`: The restored task.
+    """
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    restored_task = await restore_task(user.id, task_id, database, uow, events)
+    if restored_task is None:
+        raise HTTPException(status_code=404, detail="Deleted task not found")
+    return TaskJSONResponse(restored_task, headers={"ETag": task_etag(restored_task)})
+
+
 @task_router.get("/", response_model=list[TaskResponse])
 async def read_tasks(
         database: Annotated[DatabaseGateway, Depends()],
         user: User = Depends(fastapi_users.current_user(optional=True)),
         skip: int = 0,
         limit: int = 10,
-) -> list[Task]:
+        after: Optional[str] = None,
+        fields: Optional[str] = None,
+        completed: Optional[bool] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        q: Optional[str] = None,
+        sort: TaskSort = TaskSort.POSITION,
+        if_none_match: Optional[str] = Header(None),
+) -> Response:
     """
     Retrieves a list of tasks for the authenticated user.
 
+    The `ETag` of the response changes whenever the task list of the user changes,
+    so a client polling with `If-None-Match` gets an empty 304 response until then.
+
     **Endpoint**: `/tasks/`
 
     ### Request:
@@ -123,9 +399,23 @@ async def read_tasks(
     - **Query Parameters**:
       - `skip` (int, optional): Number of tasks to skip. Default: 0.
       - `limit` (int, optional): Maximum number of tasks to retrieve. Default: 10.
+      - `after` (str, optional): Cursor from the `X-Next-Cursor` header of the previous page.
+        When given, `skip` is ignored and the page starts right after the cursor.
+      - `fields` (str, optional): Comma separated task fields to return, e.g. `id,title,completed`.
+        Only these columns are read from the database. Default: all fields.
+      - `completed` (bool, optional): Only completed or only open tasks.
+      - `created_after` (datetime, optional): Only tasks created after this time.
+      - `created_before` (datetime, optional): Only tasks created before this time.
+      - `q` (str, optional): Only tasks where every word of `q` starts a word of the title or description,
+        `art` finds "artist" but not "start".
+      - `sort` (str, optional): `position` (list order), `createdAt` or `-createdAt`. Default: `position`.
+        Cursors are only supported in list order.
+    - **Headers**:
+      - `If-None-Match` (str, optional): `ETag` of a previously received page.
 
     ### Response:
-    - **Status 200**: Returns a list of tasks.
+    - **Status 200**: Returns a list of tasks with the `ETag` header of the list.
+      If more tasks may follow, the `X-Next-Cursor` header holds the cursor of the next page.
       Example:
       ```json
       [
@@ -138,6 +428,9 @@ async def read_tasks(
           }
       ]
       ```
+    - **Status 304**: If the list has not changed since the `If-None-Match` ETag.
+    - **Status 400**: If the cursor is invalid, is combined with a sort other than `position`,
+      or `fields` names an unknown field.
     - **Status 401**: If the user is not authenticated.
 
     ### Parameters:
@@ -145,14 +438,329 @@ async def read_tasks(
     - `user` (User): Authenticated user information.
     - `skip` (int): Number of tasks to skip.
     - `limit` (int): Maximum number of tasks to retrieve.
+    - `after` (str): Cursor of the last task of the previous page.
+    - `fields` (str): Task fields to return.
+    - `completed` (bool): Completion state of the tasks to return.
+    - `created_after` (datetime): Lower bound of the creation time.
+    - `created_before` (datetime): Upper bound of the creation time.
+    - `q` (str): Words to search for.
+    - `sort` (TaskSort): Order of the tasks.
+    - `if_none_match` (str): ETags the client already has.
 
     ### Returns:
-    - `list[TaskResponse]`: List of tasks for the user.
+    - `list[TaskResponse]`: List of tasks for the user, with only the requested `fields` when given.
     """
     if user is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    tasks = await get_tasks(user.id, skip, limit, database)
-    return tasks
+    try:
+        projection = parse_fields(fields)
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filters = TaskFilter(
+        completed=completed, created_after=created_after, created_before=created_before, q=q, sort=sort,
+    )
+    # The version is read before the tasks: a concurrent write can only make the ETag older than the body
+    etag = task_list_etag(user.id, await get_task_list_version(user.id, database), projection)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    if after is None:
+        tasks = await get_tasks(user.id, skip, limit, database, projection, filters)
+    else:
+        if filters.sort != TaskSort.POSITION:
+            raise HTTPException(status_code=400, detail="Cursors are only supported with sort=position")
+        try:
+            cursor = decode_cursor(after)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        tasks = await get_tasks_after(user.id, cursor, limit, database, projection, filters)
+    headers = {"ETag": etag}
+    next_page = next_cursor(tasks, limit) if filters.sort == TaskSort.POSITION else None
+    if next_page is not None:
+        headers["X-Next-Cursor"] = next_page
+    return TaskJSONResponse(tasks, headers=headers, fields=projection)
+
+
+@task_router.get("/export", response_class=StreamingResponse)
+async def export_task_list(
+        uow: Annotated[UoW, Depends()],
+        gateway_factory: Annotated[DatabaseGatewayFactory, Depends()],
+        user: User = Depends(fastapi_users.current_user(optional=True)),
+        export_format: TaskFileFormat = Query(TaskFileFormat.NDJSON, alias="format"),
+) -> StreamingResponse:
+    """
+    Streams the full task list of the authenticated user as NDJSON or CSV.
+
+    Rows are read from a server-side cursor and encoded batch by batch,
+    so memory use does not depend on the size of the list.
+
+    **Endpoint**: `/tasks/export`
+
+    ### Request:
+    - **Method**: GET
+    - **Query Parameters**:
+      - `format` (str, optional): `ndjson` or `csv`. Default: `ndjson`.
+
+    ### Response:
+    - **Status 200**: Streams the tasks in list order.
+      Example (`ndjson`):
+      ```
+      {"id":1,"title":"Sample Task","completed":false,"createdAt":"2024-12-09T12:00:00","description":""}
+      {"id":2,"title":"Another Task","completed":true,"createdAt":"2024-12-09T12:05:00","description":""}
+      ```
+    - **Status 401**: If the user is not authenticated.
+
+    ### Parameters:
+    - `uow` (UoW): Unit of Work dependency, closed before streaming.
+    - `gateway_factory` (DatabaseGatewayFactory): Opens the gateway used while streaming.
+    - `user` (User): Authenticated user information.
+    - `export_format` (TaskFileFormat): Output format.
+
+    ### Returns:
+    - `StreamingResponse`: The encoded task list.
+    """
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    # a slow client keeps the stream open, it must not keep the connection used by authentication
+    await uow.close()
+    return StreamingResponse(
+        export_tasks(user.id, export_format, gateway_factory),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format.value}"'},
+    )
+
+
+@task_router.post("/import", response_model=ImportSummary)
+async def import_task_list(
+        request: Request,
+        database: Annotated[DatabaseGateway, Depends()],
+        uow: Annotated[UoW, Depends()],
+        events: Annotated[TaskEventBroker, Depends()],
+        user: User = Depends(fastapi_users.current_user(optional=True)),
+        import_format: TaskFileFormat = Query(TaskFileFormat.NDJSON, alias="format"),
+        chunk_size: int = Query(500, ge=1, le=MAX_BATCH_SIZE),
+) -> ImportSummary:
+    """
+    Imports tasks for the authenticated user from a streamed NDJSON or CSV body.
+
+    The body is parsed line by line while it is being received. Valid tasks are
+    inserted and committed in chunks of `chunk_size`, so memory use does not
+    depend on the upload size and a failed line does not discard earlier chunks.
+
+    **Endpoint**: `/tasks/import`
+
+    ### Request:
+    - **Method**: POST
+    - **Query Parameters**:
+      - `format` (str, optional): `ndjson` or `csv`. Default: `ndjson`.
+      - `chunk_size` (int, optional): Tasks inserted per transaction, 1 to 1000. Default: 500.
+    - **Body**: One task per line. CSV bodies start with a header line, quoted CSV values
+      may span lines and empty CSV values take the defaults.
+      Example (`ndjson`):
+      ```
+      {"title": "First Task"}
+      {"title": "Second Task", "completed": true, "description": "Done already"}
+      ```
+
+    ### Response:
+    - **Status 200**: Returns the import summary. At most 100 line errors are listed.
+      Example:
+      ```json
+      {
+          "imported": 2,
+          "failed": 1,
+          "chunks": 1,
+          "errors": [
+              {"line": 3, "detail": "title: Field required"}
+          ]
+      }
+      ```
+    - **Status 401**: If the user is not authenticated.
+
+    ### Parameters:
+    - `request` (Request): Request whose body is streamed.
+    - `database` (DatabaseGateway): Injected database dependency.
+    - `uow` (UoW): Unit of Work dependency.
+    - `events` (TaskEventBroker): Publishes the change to event subscribers.
+    - `user` (User): Authenticated user information.
+    - `import_format` (TaskFileFormat): Body format.
+    - `chunk_size` (int): Tasks inserted per transaction.
+
+    ### Returns:
+    - `ImportSummary`: Counts of imported and failed lines with line errors.
+    """
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return await import_tasks(user.id, request.stream(), import_format, chunk_size, database, uow, events)
+
+
+@task_router.get("/stats", response_model=TaskStats)
+async def read_task_stats(
+        database: Annotated[DatabaseGateway, Depends()],
+        user: User = Depends(fastapi_users.current_user(optional=True)),
+        days: int = Query(30, ge=1, le=366),
+) -> TaskStats:
+    """
+    Retrieves task counters of the authenticated user.
+
+    Counters are maintained on every write, so the cost of this request does not
+    depend on the number of tasks.
+
+    **Endpoint**: `/tasks/stats`
+
+    ### Request:
+    - **Method**: GET
+    - **Query Parameters**:
+      - `days` (int, optional): Number of days, up to today (UTC), covered by the histogram. Default: 30.
+
+    ### Response:
+    - **Status 200**: Returns the counters. Days without created tasks are left out of `created_per_day`.
+      Example:
+      ```json
+      {
+          "total": 12,
+          "completed": 3,
+          "created_per_day": [
+              {"day": "2024-12-08", "created": 5},
+              {"day": "2024-12-09", "created": 7}
+          ],
+          "completion_ratio": 0.25
+      }
+      ```
+    - **Status 401**: If the user is not authenticated.
+
+    ### Parameters:
+    - `database` (DatabaseGateway): Injected database dependency.
+    - `user` (User): Authenticated user information.
+    - `days` (int): Number of days covered by the histogram.
+
+    ### Returns:
+    - `TaskStats`: Task counts, completion ratio and tasks created per day.
+    """
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return await get_task_stats(user.id, days, database)
+
+
+@task_router.get("/events", response_class=StreamingResponse)
+async def stream_task_list_events(
+        uow: Annotated[UoW, Depends()],
+        gateway_factory: Annotated[DatabaseGatewayFactory, Depends()],
+        events: Annotated[TaskEventBroker, Depends()],
+        user: User = Depends(fastapi_users.current_user(optional=True)),
+        last_event_id: Optional[int] = Query(None, ge=0),
+        last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID", ge=0),
+) -> StreamingResponse:
+    """
+    Streams changes of the task list of the authenticated user as server-sent events.
+
+    Every event has the list version it produced as its id. A client that reconnects
+    with the id of the last event it received gets the events it missed, or a `reset`
+    event when they are not kept anymore. `EventSource` sends that id by itself.
+
+    **Endpoint**: `/tasks/events`
+
+    ### Request:
+    - **Method**: GET
+    - **Headers**:
+      - `Last-Event-ID` (optional): Id of the last received event.
+    - **Query Parameters**:
+      - `last_event_id` (int, optional): The same, for clients that cannot set headers.
+
+    ### Response:
+    - **Status 200**: Streams `text/event-stream`. The stream starts with the missed events
+      or with a `reset` event carrying the current list version, after which clients load the list again.
+      Events are `created` and `updated` with `tasks`, `deleted` with `task_ids`
+      and `reordered` with `positions`. A `: ping` comment is sent every 15 seconds without events.
+      Example:
+      ```
+      id: 7
+      event: created
+      data: {"id":7,"type":"created","tasks":[{"id":1,"title":"Sample Task","completed":false,"createdAt":"2024-12-09T12:00:00","position":0,"description":""}],"task_ids":[],"positions":[]}
+
+      id: 8
+      event: deleted
+      data: {"id":8,"type":"deleted","tasks":[],"task_ids":[1],"positions":[]}
+      ```
+    - **Status 401**: If the user is not authenticated.
+
+    ### Parameters:
+    - `uow` (UoW): Unit of Work dependency, closed before streaming.
+    - `gateway_factory` (DatabaseGatewayFactory): Opens the gateway that reads the list version.
+    - `events` (TaskEventBroker): Delivers the events of the user.
+    - `user` (User): Authenticated user information.
+    - `last_event_id` (int): Id of the last received event.
+    - `last_event_id_header` (int): Id of the last received event, from `Last-Event-ID`.
+
+    ### Returns:
+    - `StreamingResponse`: The event stream.
+    """
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    # the stream may stay open for hours, it must not keep the connection used by authentication
+    await uow.close()
+    if last_event_id_header is not None:
+        last_event_id = last_event_id_header
+    return StreamingResponse(
+        encode_task_events(stream_task_events(
+            user.id, last_event_id, EVENT_HEARTBEAT_SECONDS, gateway_factory, events,
+        )),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@task_router.get("/{task_id}", response_model=TaskResponse)
+async def read_task(
+        task_id: int,
+        database: Annotated[DatabaseGateway, Depends()],
+        user: User = Depends(fastapi_users.current_user(optional=True)),
+        if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """
+    Retrieves a single task of the authenticated user.
+
+    **Endpoint**: `/tasks/{task_id}`
+
+    ### Request:
+    - **Method**: GET
+    - **Path Parameter**: `task_id` (int) - ID of the task to retrieve.
+    - **Headers**:
+      - `If-None-Match` (str, optional): `ETag` of a previously received task.
+
+    ### Response:
+    - **Status 200**: Returns the task with its `ETag` header.
+      Example:
+      ```json
+      {
+          "id": 1,
+          "title": "Sample Task",
+          "completed": false,
+          "createdAt": "2024-12-09T12:00:00",
+          "description": "This is a sample task"
+      }
+      ```
+    - **Status 304**: If the task has not changed since the `If-None-Match` ETag.
+    - **Status 404**: If the task is not found.
+    - **Status 401**: If the user is not authenticated.
+
+    ### Parameters:
+    - `task_id` (int): ID of the task to retrieve.
+    - `database` (DatabaseGateway): Injected database dependency.
+    - `user` (User): Authenticated user information.
+    - `if_none_match` (str): ETags the client already has.
+
+    ### Returns:
+    - `TaskResponse`: The task details.
+    """
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    task = await get_task(user.id, task_id, database)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    etag = task_etag(task)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return TaskJSONResponse(task, headers={"ETag": etag})
 
 
 @task_router.patch("/{task_id}/title", response_model=TaskResponse)
@@ -161,16 +769,24 @@ async def update_task_title(
         task_update: TaskTitleUpdate,
         database: Annotated[DatabaseGateway, Depends()],
         uow: Annotated[UoW, Depends()],
+        events: Annotated[TaskEventBroker, Depends()],
+        write_behind: Annotated[Optional[TitleWriteBehind], Depends(Stub(TitleWriteBehind))],
         user: User = Depends(fastapi_users.current_user(optional=True)),
-) -> Task:
+        if_match: Optional[str] = Header(None),
+) -> Response:
     """
         Updates the title of a task for the authenticated user.
 
+        With write-behind enabled, titles of requests without `If-Match` are queued and written
+        in batches a moment later, and only the last title queued for a task is written.
+
         **Endpoint**: `/tasks/{task_id}/title`
 
         ### Request:
         - **Method**: PATCH
         - **Path Parameter**: `task_id` (int) - ID of the task to update.
+        - **Headers**:
+          - `If-Match` (str, optional): `ETag` the task must still have for the update to be applied.
         - **Body**: A JSON object containing the new title.
           Example:
           ```json
@@ -180,7 +796,7 @@ async def update_task_title(
           ```
 
         ### Response:
-        - **Status 200**: Returns the updated task.
+        - **Status 200**: Returns the updated task with its new `ETag` header.
           Example:
           ```json
           {
@@ -191,7 +807,16 @@ async def update_task_title(
               "description": "This is a sample task"
           }
           ```
+        - **Status 202**: With write-behind enabled, the title is queued. Unknown tasks are not reported.
+          Example:
+          ```json
+          {
+              "id": 1,
+              "title": "Updated Task Title"
+          }
+          ```
         - **Status 404**: If the task is not found.
+        - **Status 412**: If the task was changed since the `If-Match` ETag.
         - **Status 401**: If the user is not authenticated.
 
         ### Parameters:
@@ -199,17 +824,29 @@ async def update_task_title(
         - `task_update` (TaskTitleUpdate): New title of the task.
         - `database` (DatabaseGateway): Injected database dependency.
         - `uow` (UoW): Unit of Work dependency.
+        - `events` (TaskEventBroker): Publishes the change to event subscribers.
+        - `write_behind` (TitleWriteBehind): Title queue, when write-behind is enabled.
         - `user` (User): Authenticated user information.
+        - `if_match` (str): ETags the update is conditional on.
 
         ### Returns:
-        - `TaskResponse`: Updated task details.
+        - `TaskResponse`: Updated task details, or `TaskTitleQueued` when the title is queued.
         """
     if user is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    updated_task = await update_task_title_by_id(user.id, task_id, task_update, database, uow)
+    # conditional updates need the current version of the task, they are written right away
+    if write_behind is not None and if_match is None:
+        await queue_task_title_update(user.id, task_id, task_update, write_behind)
+        return JSONResponse(TaskTitleQueued(id=task_id, title=task_update.title).model_dump(), status_code=202)
+    try:
+        updated_task = await update_task_title_by_id(
+            user.id, task_id, task_update, database, uow, events, if_match_versions(if_match, task_id),
+        )
+    except TaskVersionConflictError as e:
+        raise HTTPException(status_code=412, detail=str(e))
     if updated_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return updated_task
+    return TaskJSONResponse(updated_task, headers={"ETag": task_etag(updated_task)})
 
 
 @task_router.put("/{task_id}", response_model=TaskResponse)
@@ -218,8 +855,10 @@ async def update_task(
         task_update: TaskUpdate,
         database: Annotated[DatabaseGateway, Depends()],
         uow: Annotated[UoW, Depends()],
+        events: Annotated[TaskEventBroker, Depends()],
         user: User = Depends(fastapi_users.current_user(optional=True)),
-) -> Task:
+        if_match: Optional[str] = Header(None),
+) -> TaskJSONResponse:
     """
        Updates a task's details for the authenticated user.
 
@@ -228,6 +867,8 @@ async def update_task(
        ### Request:
        - **Method**: PUT
        - **Path Parameter**: `task_id` (int) - ID of the task to update.
+       - **Headers**:
+         - `If-Match` (str, optional): `ETag` the task must still have for the update to be applied.
        - **Body**: A JSON object containing the updated details.
          Example:
          ```json
@@ -238,7 +879,7 @@ async def update_task(
          ```
 
        ### Response:
-       - **Status 200**: Returns the updated task.
+       - **Status 200**: Returns the updated task with its new `ETag` header.
          Example:
          ```json
          {
@@ -250,6 +891,7 @@ async def update_task(
          }
          ```
        - **Status 404**: If the task is not found.
+       - **Status 412**: If the task was changed since the `If-Match` ETag.
        - **Status 401**: If the user is not authenticated.
 
        ### Parameters:
@@ -257,23 +899,32 @@ async def update_task(
        - `task_update` (TaskUpdate): Updated task details.
        - `database` (DatabaseGateway): Injected database dependency.
        - `uow` (UoW): Unit of Work dependency.
+       - `events` (TaskEventBroker): Publishes the change to event subscribers.
        - `user` (User): Authenticated user information.
+       - `if_match` (str): ETags the update is conditional on.
 
        ### Returns:
        - `TaskResponse`: Updated task details.
        """
     if user is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    updated_task = await update_task_by_id(user.id, task_id, task_update, database, uow)
+    try:
+        updated_task = await update_task_by_id(
+            user.id, task_id, task_update, database, uow, events, if_match_versions(if_match, task_id),
+        )
+    except TaskVersionConflictError as e:
+        raise HTTPException(status_code=412, detail=str(e))
     if updated_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return updated_task
+    return TaskJSONResponse(updated_task, headers={"ETag": task_etag(updated_task)})
 
 
 @task_router.post("/reorder", response_model=ReorderTasksResponse)
 async def reorder_tasks(
         reorder_data: ReorderRequest,
         database: Annotated[DatabaseGateway, Depends()],
+        uow: Annotated[UoW, Depends()],
+        events: Annotated[TaskEventBroker, Depends()],
         user: User = Depends(fastapi_users.current_user(optional=True)),
 ) -> ReorderTasksResponse:
     """
@@ -310,6 +961,8 @@ async def reorder_tasks(
     ### Parameters:
     - `reorder_data` (ReorderRequest): Task IDs and their new positions.
     - `database` (DatabaseGateway): Injected database dependency.
+    - `uow` (UoW): Unit of Work dependency.
+    - `events` (TaskEventBroker): Publishes the change to event subscribers.
     - `user` (User): Authenticated user information.
 
     ### Returns:
@@ -318,7 +971,7 @@ async def reorder_tasks(
     if user is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
     try:
-        await tasks_reorder(user.id, reorder_data, database)
+        await tasks_reorder(user.id, reorder_data, database, uow, events)
     except MissingTasksError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except TaskNotFoundError as e:
@@ -326,3 +979,77 @@ async def reorder_tasks(
     except DataConflictError as e:
         raise HTTPException(status_code=409, detail=str(e))
     return ReorderTasksResponse(detail="Tasks reordered successfully")
+
+
+@task_router.post("/{task_id}/move", response_model=TaskResponse)
+async def move_task(
+        task_id: int,
+        move: MoveTaskRequest,
+        database: Annotated[DatabaseGateway, Depends()],
+        uow: Annotated[UoW, Depends()],
+        events: Annotated[TaskEventBroker, Depends()],
+        jobs: Annotated[JobQueue, Depends()],
+        user: User = Depends(fastapi_users.current_user(optional=True)),
+) -> TaskJSONResponse:
+    """
+    Moves a single task between two other tasks of the authenticated user.
+
+    Only the moved task is written. When the free space between neighbouring
+    positions runs out, a job that spreads out the positions of the list is queued.
+
+    **Endpoint**: `/tasks/{task_id}/move`
+
+    ### Request:
+    - **Method**: POST
+    - **Path Parameter**: `task_id` (int) - ID of the task to move.
+    - **Body**: A JSON object with the neighbours of the new place.
+      `after_id` is the task that should precede the moved one, `before_id` the one that should follow it.
+      Either may be omitted; omitting both moves the task to the end of the list.
+      Example:
+      ```json
+      {
+          "after_id": 3,
+          "before_id": 7
+      }
+      ```
+
+    ### Response:
+    - **Status 200**: Returns the moved task.
+      Example:
+      ```json
+      {
+          "id": 1,
+          "title": "Sample Task",
+          "completed": false,
+          "createdAt": "2024-12-09T12:00:00",
+          "description": "This is a sample task"
+      }
+      ```
+    - **Status 404**: If the task or one of the neighbours is not found.
+    - **Status 409**: If the neighbours are not in the given order,
+      or concurrent moves took the free space between them.
+    - **Status 401**: If the user is not authenticated.
+
+    ### Parameters:
+    - `task_id` (int): ID of the task to move.
+    - `move` (MoveTaskRequest): Neighbours of the new place.
+    - `database` (DatabaseGateway): Injected database dependency.
+    - `uow` (UoW): Unit of Work dependency.
+    - `events` (TaskEventBroker): Publishes the change to event subscribers.
+    - `jobs` (JobQueue): Queues position rebalancing.
+    - `user` (User): Authenticated user information.
+
+    ### Returns:
+    - `TaskResponse`: The moved task.
+    """
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        moved = await move_task_in_list(user.id, task_id, move, database, uow, events, jobs)
+    except TaskNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DataConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if moved is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return TaskJSONResponse(moved.task)
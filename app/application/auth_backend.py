@@ -1,12 +1,67 @@
+from typing import Optional, Annotated
+
+import jwt
+from fastapi import Depends
+from fastapi_users import exceptions, BaseUserManager
 from fastapi_users.authentication import CookieTransport, AuthenticationBackend, JWTStrategy
+from fastapi_users.jwt import decode_jwt
+
+from app.adapters.sqlalchemy_db.models import User
+from app.api.depends_stub import Stub
+from app.application.protocols.cache import UserCache
 
 cookie_transport = CookieTransport(cookie_max_age=7200)
 
 SECRET = "SECRET"
+LIFETIME_SECONDS = 3600
+
+
+class CachedJWTStrategy(JWTStrategy[User, int]):
+    """
+    JWT strategy that skips decoding of recently seen tokens and loading
+    of recently seen users. Cached users are dropped by `UserManager` hooks
+    when the user changes.
+    """
+
+    def __init__(self, cache: UserCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    async def read_token(self, token: Optional[str], user_manager: BaseUserManager[User, int]) -> Optional[User]:
+        if token is None:
+            return None
+
+        user_id = await self.cache.get_token_subject(token)
+        if user_id is None:
+            try:
+                data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+            except jwt.PyJWTError:
+                return None
+            user_id = data.get("sub")
+            if user_id is None:
+                return None
+            await self.cache.set_token_subject(token, user_id, data.get("exp"))
+
+        try:
+            parsed_id = user_manager.parse_id(user_id)
+        except exceptions.InvalidID:
+            return None
+        user = await self.cache.get_user(parsed_id)
+        if user is None:
+            try:
+                user = await user_manager.get(parsed_id)
+            except exceptions.UserNotExists:
+                return None
+            await self.cache.set_user(user)
+        return user
 
 
-def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=SECRET, lifetime_seconds=3600)
+def get_jwt_strategy(
+        cache: Annotated[Optional[UserCache], Depends(Stub(UserCache))],
+) -> JWTStrategy:
+    if cache is None:
+        return JWTStrategy(secret=SECRET, lifetime_seconds=LIFETIME_SECONDS)
+    return CachedJWTStrategy(cache, secret=SECRET, lifetime_seconds=LIFETIME_SECONDS)
 
 
 auth_backend = AuthenticationBackend(
@@ -0,0 +1,26 @@
+import base64
+import binascii
+from typing import Optional
+
+from app.application.exceptions import InvalidCursorError
+from app.application.models import TaskRow, TaskCursor
+
+
+def encode_cursor(task: TaskRow) -> str:
+    raw = f"{task['position']}:{task['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> TaskCursor:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        position, task_id = base64.urlsafe_b64decode(padded).decode().split(":")
+        return TaskCursor(position=int(position), id=int(task_id))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError(cursor)
+
+
+def next_cursor(tasks: list[TaskRow], limit: int) -> Optional[str]:
+    if not tasks or len(tasks) < limit:
+        return None
+    return encode_cursor(tasks[-1])
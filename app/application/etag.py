@@ -0,0 +1,50 @@
+from typing import Optional, Sequence
+
+from app.application.models import Task
+
+
+def task_list_etag(user_id: int, version: int, fields: Optional[Sequence[str]] = None) -> str:
+    # A projection of the list is a different representation and gets its own ETag,
+    # fields are joined with "+" as commas separate the ETags of a conditional header
+    if fields is not None:
+        return f'"list-{user_id}-{version}-{"+".join(fields)}"'
+    return f'"list-{user_id}-{version}"'
+
+
+def task_etag(task: Task) -> str:
+    return f'"task-{task.id}-{task.version}"'
+
+
+def _parse_etags(header: str) -> list[str]:
+    return [etag.strip() for etag in header.split(",") if etag.strip()]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluates `If-None-Match` against the current ETag using the weak comparison,
+    as required for conditional GET.
+    """
+    if if_none_match is None:
+        return False
+    etags = _parse_etags(if_none_match)
+    return "*" in etags or etag in (candidate.removeprefix("W/") for candidate in etags)
+
+
+def if_match_versions(if_match: Optional[str], task_id: int) -> Optional[list[int]]:
+    """
+    Extracts the task versions accepted by `If-Match`.
+
+    Returns None when any version is accepted, an empty list when no ETag
+    of the header can belong to the task.
+    """
+    if if_match is None:
+        return None
+    etags = _parse_etags(if_match)
+    if "*" in etags:
+        return None
+    prefix = f'"task-{task_id}-'
+    versions = []
+    for etag in etags:
+        if etag.startswith(prefix) and etag.endswith('"') and etag[len(prefix):-1].isdigit():
+            versions.append(int(etag[len(prefix):-1]))
+    return versions
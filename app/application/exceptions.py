@@ -17,3 +17,27 @@ class TaskNotFoundError(DatabaseError):
 class DataConflictError(DatabaseError):
     def __init__(self, message: str):
         super().__init__(message)
+
+
+class TaskVersionConflictError(DatabaseError):
+    def __init__(self, task_id: int):
+        self.task_id = task_id
+        super().__init__(f"Task with id {task_id} was modified")
+
+
+class InvalidCursorError(Exception):
+    def __init__(self, cursor: str):
+        self.cursor = cursor
+        super().__init__(f"Invalid cursor: {cursor}")
+
+
+class InvalidFieldsError(Exception):
+    def __init__(self, fields: list[str]):
+        self.fields = fields
+        super().__init__(f"Unknown fields: {', '.join(fields)}")
+
+
+class TaskEventsOverflowError(Exception):
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        super().__init__(f"Task events of user {user_id} were dropped for a slow subscriber")
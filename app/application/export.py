@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Any, Sequence
+
+EXPORT_FIELDS = ("id", "title", "completed", "createdAt", "description")
+
+
+class TaskFileFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def encode_ndjson(
+        batches: AsyncIterator[Sequence[tuple]],
+        fields: Sequence[str],
+) -> AsyncIterator[bytes]:
+    encoder = json.JSONEncoder(default=_json_default, ensure_ascii=False, separators=(",", ":"))
+    async for rows in batches:
+        yield "".join(encoder.encode(dict(zip(fields, row))) + "\n" for row in rows).encode()
+
+
+async def encode_csv(
+        batches: AsyncIterator[Sequence[tuple]],
+        fields: Sequence[str],
+) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for rows in batches:
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+ENCODERS = {
+    TaskFileFormat.NDJSON: encode_ndjson,
+    TaskFileFormat.CSV: encode_csv,
+}
+
+MEDIA_TYPES = {
+    TaskFileFormat.NDJSON: "application/x-ndjson",
+    TaskFileFormat.CSV: "text/csv",
+}
@@ -0,0 +1,22 @@
+from typing import Optional
+
+from app.application.exceptions import InvalidFieldsError
+from app.application.models import TaskResponse
+
+TASK_FIELDS = tuple(TaskResponse.model_fields)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """
+    Parses a comma separated `fields` query parameter into task response fields,
+    in the order of `TaskResponse`. Returns None when all fields are requested.
+    """
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = sorted(requested.difference(TASK_FIELDS))
+    if unknown:
+        raise InvalidFieldsError(unknown)
+    if not requested or requested == set(TASK_FIELDS):
+        return None
+    return tuple(field for field in TASK_FIELDS if field in requested)
@@ -0,0 +1,148 @@
+import csv
+import json
+from collections import deque
+from typing import AsyncIterator, Optional, Any
+
+from app.application.export import TaskFileFormat
+
+MAX_LINE_LENGTH = 64 * 1024
+
+ParsedLine = tuple[int, Optional[dict[str, Any]], Optional[str]]
+
+
+async def iter_lines(body: AsyncIterator[bytes]) -> AsyncIterator[Optional[bytes]]:
+    """
+    Splits a streamed body into lines keeping at most one partial line in memory.
+    A line longer than `MAX_LINE_LENGTH` is discarded and yielded as `None`.
+    """
+    buffer = b""
+    skipping = False
+    async for chunk in body:
+        lines = (buffer + chunk).split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            yield line.rstrip(b"\r")
+        if len(buffer) > MAX_LINE_LENGTH:
+            if not skipping:
+                yield None
+            skipping = True
+            buffer = b""
+    if buffer and not skipping:
+        yield buffer.rstrip(b"\r")
+
+
+async def _decoded_lines(
+        lines: AsyncIterator[Optional[bytes]],
+        skip_blank: bool = True,
+) -> AsyncIterator[tuple[int, Optional[str], Optional[str]]]:
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if line is None:
+            yield line_number, None, f"Line is longer than {MAX_LINE_LENGTH} bytes"
+            continue
+        try:
+            text = line.decode()
+        except UnicodeDecodeError:
+            yield line_number, None, "Line is not valid UTF-8"
+            continue
+        if text.strip() or not skip_blank:
+            yield line_number, text, None
+
+
+async def parse_ndjson(lines: AsyncIterator[Optional[bytes]]) -> AsyncIterator[ParsedLine]:
+    async for line_number, text, error in _decoded_lines(lines):
+        if error is not None:
+            yield line_number, None, error
+            continue
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield line_number, None, "Line must be a JSON object"
+            continue
+        yield line_number, data, None
+
+
+class _LineFeed:
+    """
+    Lines for a `csv.reader` that are added while it is being read from.
+    """
+
+    def __init__(self):
+        self.lines: deque[str] = deque()
+
+    def __iter__(self) -> "_LineFeed":
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def parse_csv(lines: AsyncIterator[Optional[bytes]]) -> AsyncIterator[ParsedLine]:
+    """
+    Quoted values may span lines. The lines of a record are collected until its quotes
+    are balanced and then read by one `csv.reader`, so no record is longer than
+    `MAX_LINE_LENGTH` in memory. Errors are reported at the first line of the record.
+    Empty values are left out, so that defaults apply to them.
+    """
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    header = None
+    record: list[str] = []
+    record_length = 0
+    record_quotes = 0
+    record_line_number = 0
+    async for line_number, text, error in _decoded_lines(lines, skip_blank=False):
+        if error is not None:
+            if record:
+                record.clear()
+                yield record_line_number, None, f"Record contains the unreadable line {line_number}"
+            yield line_number, None, error
+            continue
+        if not record:
+            if not text.strip():
+                continue
+            record_line_number = line_number
+            record_length = 0
+            record_quotes = 0
+        record.append(text)
+        record_length += len(text)
+        record_quotes += text.count('"')
+        if record_length > MAX_LINE_LENGTH:
+            record.clear()
+            yield record_line_number, None, f"Record is longer than {MAX_LINE_LENGTH} bytes"
+            continue
+        # doubled quotes inside a quoted value keep the count even, an odd count means the value goes on
+        if record_quotes % 2:
+            continue
+        feed.lines.extend(part + "\n" for part in record)
+        record.clear()
+        try:
+            values = next(reader)
+        except csv.Error as e:
+            feed.lines.clear()
+            yield record_line_number, None, f"Invalid CSV: {e}"
+            continue
+        if header is None:
+            header = values
+            continue
+        if len(values) != len(header):
+            yield record_line_number, None, f"Expected {len(header)} values, got {len(values)}"
+            continue
+        yield record_line_number, {name: value for name, value in zip(header, values) if value != ""}, None
+    if record:
+        yield record_line_number, None, "Unterminated quoted value"
+
+
+PARSERS = {
+    TaskFileFormat.NDJSON: parse_ndjson,
+    TaskFileFormat.CSV: parse_csv,
+}
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Awaitable, Any, Mapping
+
+from app.application.models import Job, JobRunnerStats
+from app.application.protocols.jobs import JobStore
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict[str, Any]], Awaitable[Any]]
+
+
+class JobRunner:
+    """
+    Runs queued jobs with the handler registered for their name, at most `concurrency` at once.
+
+    Due jobs are claimed every `poll_seconds`, and as soon as a running job finishes.
+    A failed job is retried after `retry_seconds`, doubled with every attempt, until it
+    has been tried `max_attempts` times, also when its last attempt never stored an outcome
+    because the process died or hung past the lease. `stop` stops claiming and lets running jobs finish
+    for up to `drain_seconds`; jobs still running then are cancelled and queued again.
+    """
+
+    def __init__(
+            self,
+            store: JobStore,
+            handlers: Mapping[str, JobHandler],
+            concurrency: int,
+            poll_seconds: float,
+            max_attempts: int,
+            retry_seconds: float,
+            lease_seconds: float,
+            drain_seconds: float,
+    ):
+        self.store = store
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.lease_seconds = lease_seconds
+        self.drain_seconds = drain_seconds
+        self._running: set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._stats = JobRunnerStats()
+
+    async def run(self) -> None:
+        self._stopping = False
+        while not self._stopping:
+            free = self.concurrency - len(self._running)
+            if free > 0:
+                await self._claim(free)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+        await self._drain()
+
+    async def stop(self) -> None:
+        self._stopping = True
+        self._wake.set()
+
+    def stats(self) -> JobRunnerStats:
+        return self._stats.model_copy(update={"running": len(self._running)})
+
+    async def _claim(self, limit: int) -> None:
+        try:
+            jobs = await self.store.claim(datetime.utcnow(), limit, self.lease_seconds, self.max_attempts)
+        except Exception:
+            logger.exception("Claiming jobs failed")
+            return
+        self._stats.claimed += len(jobs)
+        for job in jobs:
+            task = asyncio.create_task(self._execute(job))
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._wake.set()
+
+    async def _drain(self) -> None:
+        if not self._running:
+            return
+        _, pending = await asyncio.wait(set(self._running), timeout=self.drain_seconds)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _execute(self, job: Job) -> None:
+        handler = self.handlers.get(job.name)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job {job.name}")
+            await handler(job.payload)
+        except asyncio.CancelledError:
+            self._stats.interrupted += 1
+            await self._record(self.store.retry(job.id, datetime.utcnow(), "Interrupted by shutdown"), job)
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if handler is None or job.attempts >= self.max_attempts:
+                self._stats.failed += 1
+                logger.exception("Job %d %s failed after %d attempts", job.id, job.name, job.attempts)
+                await self._record(self.store.fail(job.id, error), job)
+            else:
+                self._stats.retried += 1
+                delay = self.retry_seconds * 2 ** (job.attempts - 1)
+                logger.warning("Job %d %s failed, retrying in %.0f seconds: %s", job.id, job.name, delay, error)
+                await self._record(self.store.retry(job.id, datetime.utcnow() + timedelta(seconds=delay), error), job)
+        else:
+            self._stats.succeeded += 1
+            await self._record(self.store.complete(job.id), job)
+
+    async def _record(self, outcome: Awaitable[None], job: Job) -> None:
+        # the job runs again once its lease ends when its outcome is not stored
+        try:
+            await outcome
+        except Exception:
+            logger.exception("Storing the outcome of job %d %s failed", job.id, job.name)
@@ -1,12 +1,50 @@
 __all__ = [
     "Task",
+    "TaskRow",
     "TaskCreate",
     "TaskUpdate",
     "TaskResponse",
     "TaskTitleUpdate",
     "ReorderRequest",
     "ReorderTask",
+    "TaskCursor",
+    "MoveTaskRequest",
+    "MovedTask",
+    "TaskPatch",
+    "TaskBatchCreate",
+    "TaskBatchUpdate",
+    "TaskBatchDelete",
+    "BatchItemResult",
+    "BatchResponse",
+    "ImportLineError",
+    "ImportSummary",
+    "CacheStats",
+    "PoolStats",
+    "TaskFilter",
+    "TaskSort",
+    "TaskStats",
+    "DailyTaskCount",
+    "TaskEvent",
+    "TaskEventType",
+    "WriteBehindStats",
+    "TaskTitleQueued",
+    "GroupCommitStats",
+    "Job",
+    "JobRunnerStats",
 ]
 
-from .task import TaskCreate, TaskUpdate, TaskResponse, TaskTitleUpdate, Task
+from .task import TaskCreate, TaskUpdate, TaskResponse, TaskTitleUpdate, TaskTitleQueued, Task, TaskRow
 from .reorder_request import ReorderRequest, ReorderTask
+from .cursor import TaskCursor
+from .move_request import MoveTaskRequest, MovedTask
+from .batch import TaskPatch, TaskBatchCreate, TaskBatchUpdate, TaskBatchDelete, BatchItemResult, BatchResponse
+from .import_summary import ImportLineError, ImportSummary
+from .cache_stats import CacheStats
+from .pool_stats import PoolStats
+from .task_filter import TaskFilter, TaskSort
+from .task_stats import TaskStats, DailyTaskCount
+from .task_event import TaskEvent, TaskEventType
+from .write_behind_stats import WriteBehindStats
+from .group_commit_stats import GroupCommitStats
+from .job import Job
+from .job_runner_stats import JobRunnerStats
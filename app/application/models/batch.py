@@ -0,0 +1,37 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from .task import TaskCreate, TaskResponse
+
+MAX_BATCH_SIZE = 1000
+
+
+class TaskPatch(BaseModel):
+    id: int
+    title: Optional[str] = None
+    completed: Optional[bool] = None
+    description: Optional[str] = None
+
+
+class TaskBatchCreate(BaseModel):
+    tasks: list[TaskCreate] = Field(max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchUpdate(BaseModel):
+    tasks: list[TaskPatch] = Field(max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchDelete(BaseModel):
+    ids: list[int] = Field(max_length=MAX_BATCH_SIZE)
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    task: Optional[TaskResponse] = None
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    results: list[BatchItemResult]
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class CacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    cached_tasks: int = 0
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class TaskCursor(BaseModel):
+    position: int
+    id: int
@@ -0,0 +1,13 @@
+from pydantic import BaseModel, computed_field
+
+
+class GroupCommitStats(BaseModel):
+    writes: int = 0
+    transactions: int = 0
+    failed_transactions: int = 0
+    reconnects: int = 0
+
+    @computed_field
+    @property
+    def writes_per_transaction(self) -> float:
+        return self.writes / self.transactions if self.transactions else 0.0
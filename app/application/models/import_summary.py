@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class ImportLineError(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportSummary(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    chunks: int = 0
+    errors: list[ImportLineError] = []
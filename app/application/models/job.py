@@ -0,0 +1,13 @@
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+
+class Job(BaseModel):
+    id: int
+    name: str
+    payload: dict[str, Any]
+    # including the current one
+    attempts: int
+
+    model_config = ConfigDict(from_attributes=True)
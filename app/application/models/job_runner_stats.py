@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class JobRunnerStats(BaseModel):
+    claimed: int = 0
+    succeeded: int = 0
+    retried: int = 0
+    failed: int = 0
+    interrupted: int = 0
+    running: int = 0
@@ -0,0 +1,15 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .task import Task
+
+
+class MoveTaskRequest(BaseModel):
+    after_id: Optional[int] = None
+    before_id: Optional[int] = None
+
+
+class MovedTask(BaseModel):
+    task: Task
+    rebalance_needed: bool
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class PoolStats(BaseModel):
+    checkouts: int = 0
+    checkins: int = 0
+    checked_out: int = 0
+    peak_checked_out: int = 0
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
 
 from pydantic import BaseModel, ConfigDict
+from typing_extensions import TypedDict
 
 
 class TaskCreate(BaseModel):
@@ -29,17 +29,37 @@ class TaskTitleUpdate(BaseModel):
     title: str
 
 
+class TaskTitleQueued(BaseModel):
+    id: int
+    title: str
+
+
 class Task(BaseModel):
     id: int
     title: str
     completed: bool = False
     createdAt: datetime
-    position: Optional[int] = None
+    position: int
     description: str
+    version: int = 1
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class TaskRow(TypedDict, total=False):
+    """
+    A task of a list read, as the columns were selected: all of them, or the requested fields.
+    Rows are encoded without building `Task` models.
+    """
+    id: int
+    title: str
+    completed: bool
+    createdAt: datetime
+    position: int
+    description: str
+    version: int
+
+
 class DeleteTaskResponse(BaseModel):
     detail: str
 
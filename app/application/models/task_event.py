@@ -0,0 +1,29 @@
+from enum import Enum
+
+from pydantic import BaseModel, ConfigDict
+
+from .reorder_request import ReorderTask
+from .task import Task
+
+
+class TaskEventType(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    REORDERED = "reordered"
+    # the list changed in a way the stream does not describe, clients load it again
+    RESET = "reset"
+
+
+class TaskEvent(BaseModel):
+    """
+    A change of the task list of a user. `id` is the list version the change produced,
+    so events of a user are ordered and a client can resume after the last one it received.
+    """
+    id: int
+    type: TaskEventType
+    tasks: list[Task] = []
+    task_ids: list[int] = []
+    positions: list[ReorderTask] = []
+
+    model_config = ConfigDict(frozen=True)
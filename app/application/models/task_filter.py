@@ -0,0 +1,22 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class TaskSort(str, Enum):
+    POSITION = "position"
+    CREATED_AT = "createdAt"
+    CREATED_AT_DESC = "-createdAt"
+
+
+class TaskFilter(BaseModel):
+    completed: Optional[bool] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    q: Optional[str] = None
+    sort: TaskSort = TaskSort.POSITION
+
+    # Hashable, task list caches use it as a part of the key
+    model_config = ConfigDict(frozen=True)
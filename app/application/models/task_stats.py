@@ -0,0 +1,19 @@
+from datetime import date
+
+from pydantic import BaseModel, computed_field
+
+
+class DailyTaskCount(BaseModel):
+    day: date
+    created: int
+
+
+class TaskStats(BaseModel):
+    total: int = 0
+    completed: int = 0
+    created_per_day: list[DailyTaskCount] = []
+
+    @computed_field
+    @property
+    def completion_ratio(self) -> float:
+        return self.completed / self.total if self.total else 0.0
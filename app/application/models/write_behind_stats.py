@@ -0,0 +1,18 @@
+from pydantic import BaseModel, computed_field
+
+
+class WriteBehindStats(BaseModel):
+    queued: int = 0
+    coalesced: int = 0
+    written: int = 0
+    failed: int = 0
+    flushes: int = 0
+    pending: int = 0
+
+    @computed_field
+    @property
+    def coalescing_ratio(self) -> float:
+        """
+        Share of queued updates replaced by a later update of the same task before a flush.
+        """
+        return self.coalesced / self.queued if self.queued else 0.0
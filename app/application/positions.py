@@ -0,0 +1,49 @@
+from typing import Optional
+
+POSITION_STEP = 1024
+
+
+def position_between(lower: Optional[int], upper: Optional[int]) -> Optional[int]:
+    """
+    Returns a position strictly between `lower` and `upper`.
+
+    `None` bounds stand for the start and the end of the list.
+    Returns `None` when there is no free position left between the bounds.
+    """
+    if lower is None and upper is None:
+        return 0
+    if lower is None:
+        return upper - POSITION_STEP
+    if upper is None:
+        return lower + POSITION_STEP
+    if upper - lower < 2:
+        return None
+    return (lower + upper) // 2
+
+
+def needs_rebalance(lower: Optional[int], position: int, upper: Optional[int]) -> bool:
+    """
+    Tells whether the next move next to `position` would find no free position.
+    """
+    return (
+            (lower is not None and position - lower < 2)
+            or (upper is not None and upper - position < 2)
+    )
+
+
+def spread_passes(count: int, lowest: int, highest: int) -> list[tuple[int, bool]]:
+    """
+    Returns the passes that spread out a list of `count` tasks between `lowest` and `highest`
+    `POSITION_STEP` apart, as the `bound` and `descending` arguments of `spread_positions`.
+
+    A pass moves the tasks past the ones it has not reached yet, so the list keeps its order
+    between the batches of a pass. The list ends up at `0, POSITION_STEP, ...` when it lies above
+    that range and right above that range otherwise, so positions stay within twice the length
+    of the list however many times it is spread out.
+    """
+    if lowest > (count - 1) * POSITION_STEP:
+        return [(-POSITION_STEP, False)]
+    if highest < (count + 1) * POSITION_STEP:
+        return [((2 * count + 1) * POSITION_STEP, True)]
+    # the list overlaps both ranges, it is moved above its end first
+    return [(highest + (count + 1) * POSITION_STEP, True), (-POSITION_STEP, False)]
@@ -0,0 +1,56 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Hashable
+
+from app.adapters.sqlalchemy_db.models import User
+from app.application.models import TaskRow, CacheStats
+
+
+class TaskListCache(ABC):
+    @abstractmethod
+    async def get(self, user_id: int, key: Hashable) -> Optional[list[TaskRow]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, user_id: int, key: Hashable, tasks: list[TaskRow]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def invalidate(self, user_id: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        raise NotImplementedError
+
+
+class UserCache(ABC):
+    """
+    Caches verified token subjects and authenticated users between requests.
+    """
+
+    @abstractmethod
+    async def get_token_subject(self, token: str) -> Optional[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_token_subject(self, token: str, subject: str, expires_at: Optional[float]) -> None:
+        """
+        `expires_at` is the unix time the token expires at, the entry never outlives it.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_user(self, user_id: int) -> Optional[User]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_user(self, user: User) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def invalidate_user(self, user_id: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        raise NotImplementedError
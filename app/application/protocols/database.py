@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from datetime import date, datetime
+from typing import Optional, AsyncContextManager, AsyncIterator, Sequence
 
-from app.application.models import TaskCreate, Task, TaskTitleUpdate, TaskUpdate, ReorderRequest
+from app.application.models import TaskCreate, Task, TaskTitleUpdate, TaskUpdate, ReorderRequest, TaskCursor, \
+    TaskPatch, TaskFilter, TaskStats, TaskRow
 
 
 class UoW(ABC):
@@ -13,34 +15,212 @@ class UoW(ABC):
     async def flush(self) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def close(self) -> None:
+        """
+        Ends the unit of work and returns its database connection to the pool.
+        Endpoints that keep the response open for long call it before streaming.
+        """
+        raise NotImplementedError
+
 
 class DatabaseGateway(ABC):
     @abstractmethod
     async def add_task(self, user_id: int, task: TaskCreate) -> Task:
         raise NotImplementedError
 
+    @abstractmethod
+    async def add_tasks(self, user_id: int, tasks: list[TaskCreate]) -> list[Task]:
+        raise NotImplementedError
+
     @abstractmethod
     async def delete_task_by_id(self, user_id: int, task_id: int) -> Optional[int]:
+        """
+        Leaves a tombstone of the task: it is gone from all reads and writes,
+        but can be restored until `purge_deleted_tasks` removes it.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_tasks(self, user_id: int, task_ids: list[int]) -> list[int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def restore_task_by_id(self, user_id: int, task_id: int) -> Optional[Task]:
+        """
+        Brings a deleted task back with the position it had. Returns None if there is no tombstone of it.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def purge_deleted_tasks(self, deleted_before: datetime, limit: int) -> list[int]:
+        """
+        Removes up to `limit` tombstones of tasks deleted before `deleted_before`, oldest first.
+        Returns the user id of every removed task.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_tasks(
+            self,
+            user_id: int,
+            skip: int,
+            limit: int,
+            fields: Optional[Sequence[str]] = None,
+            filters: Optional[TaskFilter] = None,
+    ) -> list[TaskRow]:
+        """
+        With `fields`, only these fields, `id` and `position` of the tasks are read and set.
+        With `filters`, only matching tasks are returned, in the order of `filters.sort`.
+        """
         raise NotImplementedError
 
     @abstractmethod
-    async def change_tasks_position(self,  user_id: int) -> None:
+    async def get_tasks_after(
+            self,
+            user_id: int,
+            after: Optional[TaskCursor],
+            limit: int,
+            fields: Optional[Sequence[str]] = None,
+            filters: Optional[TaskFilter] = None,
+    ) -> list[TaskRow]:
+        """
+        Tasks are always in list order, `filters.sort` is ignored.
+        """
         raise NotImplementedError
 
     @abstractmethod
-    async def get_tasks(self, user_id: int, skip: int, limit: int) -> list[Task]:
+    async def get_task(self, user_id: int, task_id: int) -> Optional[Task]:
         raise NotImplementedError
 
     @abstractmethod
-    async def update_task_title_by_id(self, user_id: int, task_id: int, task_update: TaskTitleUpdate) -> Optional[Task]:
+    def stream_tasks(self, user_id: int, fields: Sequence[str]) -> AsyncIterator[Sequence[tuple]]:
+        """
+        Streams the given columns of all user tasks in list order, in batches of rows.
+        """
         raise NotImplementedError
 
     @abstractmethod
-    async def update_task_by_id(self, user_id: int, task_id: int, task_update: TaskUpdate) -> Optional[Task]:
+    async def update_task_title_by_id(
+            self, user_id: int, task_id: int, task_update: TaskTitleUpdate,
+            expected_versions: Optional[list[int]] = None,
+    ) -> Optional[Task]:
+        """
+        Updates the task only if its version is one of `expected_versions`, when given.
+        Raises TaskVersionConflictError if the task exists with another version.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_task_by_id(
+            self, user_id: int, task_id: int, task_update: TaskUpdate,
+            expected_versions: Optional[list[int]] = None,
+    ) -> Optional[Task]:
+        """
+        Updates the task only if its version is one of `expected_versions`, when given.
+        Raises TaskVersionConflictError if the task exists with another version.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_tasks(self, user_id: int, patches: list[TaskPatch]) -> dict[int, Task]:
         raise NotImplementedError
 
     @abstractmethod
     async def reorder_tasks(self, user_id: int, reorder_data: ReorderRequest) -> None:
+        """
+        Raises `MissingTasksError` when some of the tasks are not found, the unit of work
+        must not be committed then.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_task_cursors(self, user_id: int, task_ids: list[int]) -> dict[int, TaskCursor]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_next_position(
+            self, user_id: int, after: Optional[TaskCursor], exclude_task_id: int,
+    ) -> Optional[int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_previous_position(
+            self, user_id: int, before: Optional[TaskCursor], exclude_task_id: int,
+    ) -> Optional[int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_task_position(self, user_id: int, task_id: int, position: int) -> Optional[Task]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rebalance_positions(self, user_id: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def has_crowded_positions(self, user_id: int) -> bool:
+        """
+        Tells whether there is no free position left between some two neighbouring tasks of the user.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_position_range(self, user_id: int) -> tuple[int, Optional[int], Optional[int]]:
+        """
+        Returns the number of the user's tasks, the lowest and the highest of their positions.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def spread_positions(self, user_id: int, bound: int, limit: int, descending: bool = False) -> list[int]:
+        """
+        Moves the up to `limit` tasks of the user that follow `bound`, or precede it when `descending`,
+        `POSITION_STEP` apart starting next to `bound`, keeping their order.
+        Returns the new positions in that order, the last one is the `bound` of the next batch.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_list_version(self, user_id: int) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def bump_list_version(self, user_id: int, by: int = 1) -> int:
+        """
+        Increments the version of the user's task list in the current transaction.
+        With `by`, the version is advanced for that many writes at once and the last of them is returned.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_task_stats(self, user_id: int, since: date) -> TaskStats:
+        """
+        Reads the maintained task counters of the user and the tasks created per day since `since`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_user_ids(self, after: int, limit: int) -> list[int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def reconcile_task_stats(self, user_ids: list[int]) -> list[int]:
+        """
+        Recounts the tasks of the given users and repairs their counters where they drifted.
+        Returns the ids of the repaired users.
+        """
+        raise NotImplementedError
+
+
+class DatabaseGatewayFactory(ABC):
+    """
+    Opens a gateway bound to its own session for work done outside a request.
+    The transaction is committed when the context exits without an error.
+    """
+
+    @abstractmethod
+    def __call__(self) -> AsyncContextManager[DatabaseGateway]:
         raise NotImplementedError
 
 
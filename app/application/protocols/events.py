@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+from typing import Optional, AsyncContextManager
+
+from app.application.models import TaskEvent
+
+
+class TaskEventSubscription(ABC):
+    @abstractmethod
+    async def next_event(self, timeout: float) -> Optional[TaskEvent]:
+        """
+        Waits up to `timeout` seconds for the next event and returns None if none arrived.
+        Raises `TaskEventsOverflowError` when events were dropped because the subscriber fell behind.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def replay(self, after: int) -> Optional[list[TaskEvent]]:
+        """
+        Returns the published events with ids greater than `after`,
+        or None when the broker no longer keeps all of them.
+        """
+        raise NotImplementedError
+
+
+class TaskEventBroker(ABC):
+    """
+    Delivers task events of a user to the subscribers of the user.
+
+    Implementations for several workers share events and their history between processes.
+    """
+
+    @abstractmethod
+    async def publish(self, user_id: int, event: TaskEvent) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def subscribe(self, user_id: int) -> AsyncContextManager[TaskEventSubscription]:
+        """
+        Events published after the subscription is entered are delivered to it.
+        """
+        raise NotImplementedError
@@ -0,0 +1,46 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Optional
+
+from app.application.models import Job
+
+
+class JobQueue(ABC):
+    @abstractmethod
+    async def enqueue(self, name: str, payload: dict[str, Any], delay_seconds: float = 0, unique: bool = False) -> None:
+        """
+        Queues a job in the current transaction, so it runs only if the transaction commits.
+        Jobs may run more than once and should be idempotent.
+        With `unique`, nothing is queued while a job of that name and payload waits for its first run.
+        """
+        raise NotImplementedError
+
+
+class JobStore(ABC):
+    """
+    Persistent queue of the job runner. Every method is a transaction of its own.
+    """
+
+    @abstractmethod
+    async def claim(self, now: datetime, limit: int, lease_seconds: float, max_attempts: int) -> list[Job]:
+        """
+        Takes up to `limit` jobs due at `now`, oldest first, and counts an attempt for each.
+        A claimed job is due again after `lease_seconds` unless it is completed or rescheduled.
+        Jobs due after `max_attempts` attempts are not taken but failed.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def complete(self, job_id: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def retry(self, job_id: int, run_at: datetime, error: Optional[str]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def fail(self, job_id: int, error: str) -> None:
+        """
+        Keeps the job with the failed status, it is not claimed anymore.
+        """
+        raise NotImplementedError
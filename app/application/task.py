@@ -1,71 +1,527 @@
-from typing import Optional
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, AsyncIterator, Sequence
 
-from app.application.models import TaskCreate, Task, TaskTitleUpdate, TaskUpdate, ReorderRequest
-from app.application.protocols.database import DatabaseGateway, UoW
+from pydantic import ValidationError
+
+from app.application.exceptions import TaskNotFoundError, DataConflictError, TaskEventsOverflowError
+from app.application.export import TaskFileFormat, ENCODERS, EXPORT_FIELDS
+from app.application.importing import PARSERS, iter_lines
+from app.application.jobs import JobHandler
+from app.application.models import TaskCreate, Task, TaskTitleUpdate, TaskUpdate, ReorderRequest, TaskCursor, \
+    MoveTaskRequest, MovedTask, TaskPatch, ImportSummary, ImportLineError, TaskFilter, TaskStats, TaskEvent, \
+    TaskEventType, ReorderTask, TaskRow
+from app.application.positions import position_between, needs_rebalance, spread_passes
+from app.application.protocols.database import DatabaseGateway, UoW, DatabaseGatewayFactory
+from app.application.protocols.events import TaskEventBroker
+from app.application.protocols.jobs import JobQueue
+from app.application.write_behind import TitleWriteBehind, PendingTitles
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_IMPORT_ERRORS = 100
+RECONCILE_BATCH_SIZE = 500
+PURGE_BATCH_SIZE = 1000
+REBALANCE_BATCH_SIZE = 1000
+REBALANCE_TASK_POSITIONS_JOB = "rebalance_task_positions"
+
+
+async def publish_task_event(user_id: int, event: TaskEvent, events: TaskEventBroker) -> None:
+    # the change is committed already, a failing broker must not fail the request
+    try:
+        await events.publish(user_id, event)
+    except Exception:
+        logger.exception("Publishing task event %d of user %d failed", event.id, user_id)
 
 
 async def add_task(
         user_id: int,
         task: TaskCreate,
         database: DatabaseGateway,
+        uow: UoW,
+        events: TaskEventBroker,
 ) -> Task:
     new_task = await database.add_task(user_id, task)
+    version = await database.bump_list_version(user_id)
+    await uow.commit()
+    await publish_task_event(user_id, TaskEvent(id=version, type=TaskEventType.CREATED, tasks=[new_task]), events)
     return new_task
 
 
+async def add_tasks(
+        user_id: int,
+        tasks: list[TaskCreate],
+        database: DatabaseGateway,
+        uow: UoW,
+        events: TaskEventBroker,
+) -> list[Task]:
+    new_tasks = await database.add_tasks(user_id, tasks)
+    version = await database.bump_list_version(user_id)
+    await uow.commit()
+    await publish_task_event(user_id, TaskEvent(id=version, type=TaskEventType.CREATED, tasks=new_tasks), events)
+    return new_tasks
+
+
 async def delete_task_from_list(
         user_id: int,
         task_id: int,
         database: DatabaseGateway,
+        uow: UoW,
+        events: TaskEventBroker,
 ) -> Optional[int]:
     deleted_task_id = await database.delete_task_by_id(user_id, task_id)
     if deleted_task_id is None:
         return None
-    await database.change_tasks_position(user_id)
+    version = await database.bump_list_version(user_id)
+    await uow.commit()
+    await publish_task_event(
+        user_id, TaskEvent(id=version, type=TaskEventType.DELETED, task_ids=[deleted_task_id]), events,
+    )
     return deleted_task_id
 
 
+async def delete_tasks_from_list(
+        user_id: int,
+        task_ids: list[int],
+        database: DatabaseGateway,
+        uow: UoW,
+        events: TaskEventBroker,
+) -> list[Optional[int]]:
+    deleted_task_ids = set(await database.delete_tasks(user_id, task_ids))
+    if deleted_task_ids:
+        version = await database.bump_list_version(user_id)
+    await uow.commit()
+    if deleted_task_ids:
+        event = TaskEvent(id=version, type=TaskEventType.DELETED, task_ids=[
+            task_id for task_id in task_ids if task_id in deleted_task_ids
+        ])
+        await publish_task_event(user_id, event, events)
+    return [task_id if task_id in deleted_task_ids else None for task_id in task_ids]
+
+
+async def restore_task(
+        user_id: int,
+        task_id: int,
+        database: DatabaseGateway,
+        uow: UoW,
+        events: TaskEventBroker,
+) -> Optional[Task]:
+    restored_task = await database.restore_task_by_id(user_id, task_id)
+    if restored_task is None:
+        return None
+    version = await database.bump_list_version(user_id)
+    await uow.commit()
+    await publish_task_event(user_id, TaskEvent(id=version, type=TaskEventType.CREATED, tasks=[restored_task]), events)
+    return restored_task
+
+
 async def get_tasks(
         user_id: int,
         skip: int,
         limit: int,
         database: DatabaseGateway,
-) -> list[Task]:
-    tasks = await database.get_tasks(user_id, skip, limit)
+        fields: Optional[Sequence[str]] = None,
+        filters: Optional[TaskFilter] = None,
+) -> list[TaskRow]:
+    tasks = await database.get_tasks(user_id, skip, limit, fields, filters)
     return tasks
 
 
+async def get_tasks_after(
+        user_id: int,
+        after: Optional[TaskCursor],
+        limit: int,
+        database: DatabaseGateway,
+        fields: Optional[Sequence[str]] = None,
+        filters: Optional[TaskFilter] = None,
+) -> list[TaskRow]:
+    tasks = await database.get_tasks_after(user_id, after, limit, fields, filters)
+    return tasks
+
+
+async def get_task(
+        user_id: int,
+        task_id: int,
+        database: DatabaseGateway,
+) -> Optional[Task]:
+    task = await database.get_task(user_id, task_id)
+    return task
+
+
+async def get_task_list_version(
+        user_id: int,
+        database: DatabaseGateway,
+) -> int:
+    version = await database.get_list_version(user_id)
+    return version
+
+
+async def get_task_stats(
+        user_id: int,
+        days: int,
+        database: DatabaseGateway,
+) -> TaskStats:
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    stats = await database.get_task_stats(user_id, since)
+    return stats
+
+
+async def export_tasks(
+        user_id: int,
+        export_format: TaskFileFormat,
+        gateway_factory: DatabaseGatewayFactory,
+) -> AsyncIterator[bytes]:
+    async with gateway_factory() as database:
+        batches = database.stream_tasks(user_id, EXPORT_FIELDS)
+        async for chunk in ENCODERS[export_format](batches, EXPORT_FIELDS):
+            yield chunk
+
+
+async def import_tasks(
+        user_id: int,
+        body: AsyncIterator[bytes],
+        import_format: TaskFileFormat,
+        chunk_size: int,
+        database: DatabaseGateway,
+        uow: UoW,
+        events: TaskEventBroker,
+) -> ImportSummary:
+    summary = ImportSummary()
+    chunk: list[TaskCreate] = []
+
+    def add_error(line_number: int, detail: str) -> None:
+        summary.failed += 1
+        if len(summary.errors) < MAX_REPORTED_IMPORT_ERRORS:
+            summary.errors.append(ImportLineError(line=line_number, detail=detail))
+
+    async def insert_chunk() -> None:
+        new_tasks = await database.add_tasks(user_id, chunk)
+        version = await database.bump_list_version(user_id)
+        await uow.commit()
+        await publish_task_event(user_id, TaskEvent(id=version, type=TaskEventType.CREATED, tasks=new_tasks), events)
+        summary.imported += len(chunk)
+        summary.chunks += 1
+        chunk.clear()
+        logger.info("Imported %d tasks for user %d", summary.imported, user_id)
+
+    async for line_number, data, error in PARSERS[import_format](iter_lines(body)):
+        if error is not None:
+            add_error(line_number, error)
+            continue
+        try:
+            chunk.append(TaskCreate.model_validate(data))
+        except ValidationError as e:
+            add_error(line_number, "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+            ))
+            continue
+        if len(chunk) >= chunk_size:
+            await insert_chunk()
+    if chunk:
+        await insert_chunk()
+    return summary
+
+
 async def update_task_title_by_id(
         user_id: int,
         task_id: int,
         task_update: TaskTitleUpdate,
         database: DatabaseGateway,
         uow: UoW,
+        events: TaskEventBroker,
+        expected_versions: Optional[list[int]] = None,
 ) -> Optional[Task]:
-    updated_task = await database.update_task_title_by_id(user_id, task_id, task_update)
+    updated_task = await database.update_task_title_by_id(user_id, task_id, task_update, expected_versions)
     if updated_task is None:
         return None
+    version = await database.bump_list_version(user_id)
     await uow.commit()
+    await publish_task_event(user_id, TaskEvent(id=version, type=TaskEventType.UPDATED, tasks=[updated_task]), events)
     return updated_task
 
 
+async def queue_task_title_update(
+        user_id: int,
+        task_id: int,
+        task_update: TaskTitleUpdate,
+        write_behind: TitleWriteBehind,
+) -> None:
+    await write_behind.enqueue(user_id, task_id, task_update.title)
+
+
+async def write_task_titles(
+        pending: PendingTitles,
+        gateway_factory: DatabaseGatewayFactory,
+        events: TaskEventBroker,
+) -> int:
+    """
+    Writes queued titles of all users in one transaction. Titles of tasks that do not
+    exist anymore are skipped. Returns the number of updated tasks.
+    """
+    updated_by_user: dict[int, TaskEvent] = {}
+    async with gateway_factory() as database:
+        for user_id, titles in pending.items():
+            patches = [TaskPatch(id=task_id, title=title) for task_id, title in titles.items()]
+            updated_tasks = await database.update_tasks(user_id, patches)
+            if updated_tasks:
+                version = await database.bump_list_version(user_id)
+                updated_by_user[user_id] = TaskEvent(
+                    id=version, type=TaskEventType.UPDATED, tasks=list(updated_tasks.values()),
+                )
+    for user_id, event in updated_by_user.items():
+        await publish_task_event(user_id, event, events)
+    return sum(len(event.tasks) for event in updated_by_user.values())
+
+
 async def update_task_by_id(
         user_id: int,
         task_id: int,
         task_update: TaskUpdate,
         database: DatabaseGateway,
         uow: UoW,
+        events: TaskEventBroker,
+        expected_versions: Optional[list[int]] = None,
 ) -> Optional[Task]:
-    updated_task = await database.update_task_by_id(user_id, task_id, task_update)
+    updated_task = await database.update_task_by_id(user_id, task_id, task_update, expected_versions)
     if updated_task is None:
         return None
+    version = await database.bump_list_version(user_id)
     await uow.commit()
+    await publish_task_event(user_id, TaskEvent(id=version, type=TaskEventType.UPDATED, tasks=[updated_task]), events)
     return updated_task
 
 
+async def update_tasks(
+        user_id: int,
+        patches: list[TaskPatch],
+        database: DatabaseGateway,
+        uow: UoW,
+        events: TaskEventBroker,
+) -> list[Optional[Task]]:
+    updated_tasks = await database.update_tasks(user_id, patches)
+    if updated_tasks:
+        version = await database.bump_list_version(user_id)
+    await uow.commit()
+    if updated_tasks:
+        event = TaskEvent(id=version, type=TaskEventType.UPDATED, tasks=list(updated_tasks.values()))
+        await publish_task_event(user_id, event, events)
+    return [updated_tasks.get(patch.id) for patch in patches]
+
+
 async def tasks_reorder(
         user_id: int,
         reorder_data: ReorderRequest,
         database: DatabaseGateway,
+        uow: UoW,
+        events: TaskEventBroker,
 ) -> None:
     await database.reorder_tasks(user_id, reorder_data)
+    version = await database.bump_list_version(user_id)
+    await uow.commit()
+    await publish_task_event(
+        user_id, TaskEvent(id=version, type=TaskEventType.REORDERED, positions=reorder_data.tasks), events,
+    )
+
+
+async def move_task(
+        user_id: int,
+        task_id: int,
+        move: MoveTaskRequest,
+        database: DatabaseGateway,
+        uow: UoW,
+        events: TaskEventBroker,
+        jobs: JobQueue,
+        rebalanced: bool = False,
+) -> Optional[MovedTask]:
+    """
+    When the free space next to the new position runs out, a rebalance of the list
+    is queued in the same transaction, unless one is queued already.
+    When there is no free position at all, the list is rebalanced right away.
+    """
+    anchor_ids = [anchor_id for anchor_id in (move.after_id, move.before_id) if anchor_id is not None]
+    if task_id in anchor_ids:
+        raise DataConflictError("Task cannot be moved relative to itself")
+    cursors = await database.get_task_cursors(user_id, [task_id, *anchor_ids])
+    if task_id not in cursors:
+        return None
+    for anchor_id in anchor_ids:
+        if anchor_id not in cursors:
+            raise TaskNotFoundError(anchor_id)
+
+    after = cursors.get(move.after_id)
+    before = cursors.get(move.before_id)
+    if after is not None and before is not None:
+        if (after.position, after.id) >= (before.position, before.id):
+            raise DataConflictError("Task after_id must precede task before_id")
+        lower, upper = after.position, before.position
+    elif before is not None:
+        lower = await database.get_previous_position(user_id, before, task_id)
+        upper = before.position
+    elif after is not None:
+        lower = after.position
+        upper = await database.get_next_position(user_id, after, task_id)
+    else:
+        lower = await database.get_previous_position(user_id, None, task_id)
+        upper = None
+
+    position = position_between(lower, upper)
+    if position is None:
+        if rebalanced:
+            # positions were spread out in this transaction, only a concurrent move can take the gap
+            raise DataConflictError("No free position next to the neighbours, the list is being changed")
+        await database.rebalance_positions(user_id)
+        return await move_task(user_id, task_id, move, database, uow, events, jobs, rebalanced=True)
+
+    task = await database.set_task_position(user_id, task_id, position)
+    version = await database.bump_list_version(user_id)
+    rebalance_needed = needs_rebalance(lower, position, upper)
+    if rebalance_needed and not rebalanced:
+        await jobs.enqueue(REBALANCE_TASK_POSITIONS_JOB, {"user_id": user_id}, unique=True)
+    await uow.commit()
+    if rebalanced:
+        # positions of the whole list changed, not only the one of the moved task
+        event = TaskEvent(id=version, type=TaskEventType.RESET)
+    else:
+        event = TaskEvent(id=version, type=TaskEventType.REORDERED, positions=[
+            ReorderTask(id=task.id, position=task.position),
+        ])
+    await publish_task_event(user_id, event, events)
+    return MovedTask(task=task, rebalance_needed=rebalance_needed)
+
+
+async def rebalance_task_positions(
+        user_id: int,
+        gateway_factory: DatabaseGatewayFactory,
+        events: TaskEventBroker,
+        batch_size: int = REBALANCE_BATCH_SIZE,
+) -> bool:
+    """
+    Spreads out the positions of the user's tasks if there is no free position left between
+    some of them, one transaction per batch of tasks. Every batch bumps the list version
+    and publishes a reset. Returns whether any task was moved.
+    """
+    async with gateway_factory() as database:
+        if not await database.has_crowded_positions(user_id):
+            # moves or deletes since the job was queued freed the positions already
+            return False
+        count, lowest, highest = await database.get_position_range(user_id)
+    moved = False
+    for bound, descending in spread_passes(count, lowest, highest):
+        while True:
+            async with gateway_factory() as database:
+                positions = await database.spread_positions(user_id, bound, batch_size, descending)
+                if not positions:
+                    break
+                version = await database.bump_list_version(user_id)
+            await publish_task_event(user_id, TaskEvent(id=version, type=TaskEventType.RESET), events)
+            moved = True
+            if len(positions) < batch_size:
+                break
+            bound = positions[-1]
+    return moved
+
+
+def task_job_handlers(
+        gateway_factory: DatabaseGatewayFactory,
+        events: TaskEventBroker,
+) -> dict[str, JobHandler]:
+    """
+    Handlers of the jobs queued by the task functions, by job name.
+    """
+    return {
+        REBALANCE_TASK_POSITIONS_JOB: lambda payload: rebalance_task_positions(
+            payload["user_id"], gateway_factory, events,
+        ),
+    }
+
+
+async def stream_task_events(
+        user_id: int,
+        last_event_id: Optional[int],
+        heartbeat_seconds: float,
+        gateway_factory: DatabaseGatewayFactory,
+        events: TaskEventBroker,
+) -> AsyncIterator[Optional[TaskEvent]]:
+    """
+    Yields the task events of the user as they are published, and None after
+    `heartbeat_seconds` without events. Ends when the subscriber falls behind.
+
+    The stream starts with the events published after `last_event_id`, or with a
+    `reset` event carrying the current list version when they are not available anymore
+    or no `last_event_id` is given.
+    """
+    async with events.subscribe(user_id) as subscription:
+        # subscribed before reading the version, so nothing committed after it is missed
+        async with gateway_factory() as database:
+            version = await database.get_list_version(user_id)
+        replayed: set[int] = set()
+        if last_event_id is None or last_event_id > version:
+            last_event_id = version
+            yield TaskEvent(id=version, type=TaskEventType.RESET)
+        elif last_event_id < version:
+            missed = await subscription.replay(last_event_id)
+            if missed is None:
+                last_event_id = version
+                yield TaskEvent(id=version, type=TaskEventType.RESET)
+            else:
+                for event in missed:
+                    replayed.add(event.id)
+                    yield event
+        while True:
+            try:
+                event = await subscription.next_event(heartbeat_seconds)
+            except TaskEventsOverflowError:
+                logger.warning("Task event stream of user %d fell behind", user_id)
+                return
+            # events of concurrent writes may be published out of order, only replayed ones are skipped
+            if event is None or (event.id > last_event_id and event.id not in replayed):
+                yield event
+
+
+async def reconcile_task_stats(
+        gateway_factory: DatabaseGatewayFactory,
+        batch_size: int = RECONCILE_BATCH_SIZE,
+) -> int:
+    """
+    Recounts the tasks of all users, one transaction per batch of users,
+    and repairs the task counters that drifted. Returns the number of repaired users.
+    """
+    repaired = 0
+    after = 0
+    while True:
+        async with gateway_factory() as database:
+            user_ids = await database.get_user_ids(after, batch_size)
+            if not user_ids:
+                break
+            repaired_user_ids = await database.reconcile_task_stats(user_ids)
+        if repaired_user_ids:
+            logger.warning("Repaired task stats of users %s", repaired_user_ids)
+        repaired += len(repaired_user_ids)
+        after = user_ids[-1]
+    return repaired
+
+
+async def purge_deleted_tasks(
+        gateway_factory: DatabaseGatewayFactory,
+        retention_seconds: float,
+        batch_size: int = PURGE_BATCH_SIZE,
+) -> int:
+    """
+    Removes tombstones of tasks deleted more than `retention_seconds` ago, one transaction
+    per batch of tasks. Returns the number of removed tasks.
+
+    Live tasks keep their positions, so list versions are not bumped and nothing is published.
+    """
+    deleted_before = datetime.utcnow() - timedelta(seconds=retention_seconds)
+    purged = 0
+    user_ids: set[int] = set()
+    while True:
+        async with gateway_factory() as database:
+            purged_user_ids = await database.purge_deleted_tasks(deleted_before, batch_size)
+        purged += len(purged_user_ids)
+        user_ids.update(purged_user_ids)
+        if len(purged_user_ids) < batch_size:
+            break
+    if purged:
+        logger.info("Purged %d deleted tasks of %d users", purged, len(user_ids))
+    return purged
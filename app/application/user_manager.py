@@ -1,4 +1,4 @@
-from typing import Optional, Annotated, AsyncGenerator
+from typing import Optional, Annotated, AsyncGenerator, Any
 
 from fastapi import Request, Depends
 from fastapi_users import BaseUserManager, IntegerIDMixin
@@ -6,6 +6,7 @@ from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
 
 from app.adapters.sqlalchemy_db.models import User
 from app.api.depends_stub import Stub
+from app.application.protocols.cache import UserCache
 
 SECRET = "SECRET"
 
@@ -14,12 +15,33 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     reset_password_token_secret = SECRET
     verification_token_secret = SECRET
 
+    def __init__(self, user_db: SQLAlchemyUserDatabase, user_cache: Optional[UserCache] = None):
+        super().__init__(user_db)
+        self.user_cache = user_cache
+
     async def on_after_register(self, user: User, request: Optional[Request] = None) -> None:
         print(f"User {user.id} has registered.")
 
+    async def on_after_update(self, user: User, update_dict: dict[str, Any], request: Optional[Request] = None) -> None:
+        await self._forget(user)
+
+    async def on_after_verify(self, user: User, request: Optional[Request] = None) -> None:
+        await self._forget(user)
+
+    async def on_after_reset_password(self, user: User, request: Optional[Request] = None) -> None:
+        await self._forget(user)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None) -> None:
+        await self._forget(user)
+
+    async def _forget(self, user: User) -> None:
+        if self.user_cache is not None:
+            await self.user_cache.invalidate_user(user.id)
+
 
 async def get_user_manager(
         user_db: Annotated[SQLAlchemyUserDatabase,
-                           Depends(Stub(SQLAlchemyUserDatabase))]
+                           Depends(Stub(SQLAlchemyUserDatabase))],
+        user_cache: Annotated[Optional[UserCache], Depends(Stub(UserCache))],
 ) -> AsyncGenerator[UserManager, None]:
-    yield UserManager(user_db)
+    yield UserManager(user_db, user_cache)
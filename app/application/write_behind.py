@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from typing import Callable, Awaitable
+
+from app.application.models import WriteBehindStats
+
+logger = logging.getLogger(__name__)
+
+# titles to write, by user and task
+PendingTitles = dict[int, dict[int, str]]
+
+
+class TitleWriteBehind:
+    """
+    Keeps title updates in memory and writes them in batches, one transaction per flush.
+
+    A later title of a task replaces the queued one, so a burst of edits of a task
+    costs a single row update. Queued titles are written by `flush`, which runs on a timer,
+    when `max_pending` tasks are queued, and on shutdown. Titles queued in a process
+    that dies before a flush are lost.
+    """
+
+    def __init__(self, write: Callable[[PendingTitles], Awaitable[int]], max_pending: int):
+        self.write = write
+        self.max_pending = max_pending
+        self._pending: PendingTitles = {}
+        self._pending_count = 0
+        # flushes write in queue order, so an older title never overwrites a newer one
+        self._lock = asyncio.Lock()
+        self._stats = WriteBehindStats()
+
+    async def enqueue(self, user_id: int, task_id: int, title: str) -> None:
+        titles = self._pending.setdefault(user_id, {})
+        if task_id in titles:
+            self._stats.coalesced += 1
+        else:
+            self._pending_count += 1
+        titles[task_id] = title
+        self._stats.queued += 1
+        if self._pending_count >= self.max_pending:
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            count, self._pending_count = self._pending_count, 0
+            if not pending:
+                return
+            try:
+                self._stats.written += await self.write(pending)
+            except asyncio.CancelledError:
+                # the transaction is rolled back, titles queued meanwhile are newer and are kept
+                for user_id, titles in pending.items():
+                    for task_id, title in titles.items():
+                        self._requeue(user_id, task_id, title)
+                raise
+            except Exception:
+                self._stats.failed += count
+                logger.exception("Writing %d queued task titles failed", count)
+            self._stats.flushes += 1
+
+    def _requeue(self, user_id: int, task_id: int, title: str) -> None:
+        titles = self._pending.setdefault(user_id, {})
+        if task_id in titles:
+            self._stats.coalesced += 1
+            return
+        titles[task_id] = title
+        self._pending_count += 1
+
+    def stats(self) -> WriteBehindStats:
+        return self._stats.model_copy(update={"pending": self._pending_count})
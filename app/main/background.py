@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Callable, Awaitable, Any, AsyncIterator
+
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PeriodicJob:
+    name: str
+    interval_seconds: float
+    run: Callable[[], Awaitable[Any]]
+    run_on_shutdown: bool = False
+
+
+@dataclass(frozen=True)
+class BackgroundWorker:
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    # makes `run` return once the work accepted so far is done
+    stop: Callable[[], Awaitable[Any]]
+
+
+async def run_periodically(job: PeriodicJob) -> None:
+    while True:
+        await asyncio.sleep(job.interval_seconds)
+        try:
+            await job.run()
+        except Exception:
+            logger.exception("Periodic job %s failed", job.name)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Runs the jobs of `app.state.periodic_jobs` in the background while the app is serving,
+    and the jobs marked with `run_on_shutdown` once more when it stops.
+    The workers of `app.state.background_workers` run until the jobs are done.
+    """
+    workers = {worker.name: asyncio.create_task(worker.run()) for worker in app.state.background_workers}
+    tasks = [asyncio.create_task(run_periodically(job)) for job in app.state.periodic_jobs]
+    # lets the workers start before requests are served
+    await asyncio.sleep(0)
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in app.state.periodic_jobs:
+            if job.run_on_shutdown:
+                try:
+                    await job.run()
+                except Exception:
+                    logger.exception("Periodic job %s failed on shutdown", job.name)
+        for worker in app.state.background_workers:
+            await worker.stop()
+        for name, result in zip(workers, await asyncio.gather(*workers.values(), return_exceptions=True)):
+            if isinstance(result, Exception):
+                logger.error("Background worker %s failed", name, exc_info=result)
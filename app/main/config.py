@@ -0,0 +1,135 @@
+import os
+from dataclasses import dataclass, field, replace
+from typing import Any, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+
+
+@dataclass(frozen=True)
+class SqliteConfig:
+    journal_mode: str = "wal"
+    synchronous: str = "normal"
+    mmap_size: int = 256 * 1024 * 1024
+    busy_timeout_ms: int = 5000
+
+    def pragmas(self) -> dict[str, Any]:
+        return {
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "mmap_size": self.mmap_size,
+            "busy_timeout": self.busy_timeout_ms,
+        }
+
+
+@dataclass(frozen=True)
+class DatabaseConfig:
+    uri: str
+    echo: bool = False
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+    statement_cache_size: int = 100
+    sqlite: Optional[SqliteConfig] = field(default=None)
+    read_uri: Optional[str] = None
+    read_stickiness_seconds: float = 5
+    group_commit: bool = False
+    group_commit_window_ms: float = 2
+    group_commit_max_batch: int = 256
+
+    def read_config(self) -> Optional["DatabaseConfig"]:
+        """
+        Config of the engine used for reads (a replica or a separate read-only pool), if any.
+        """
+        if not self.read_uri:
+            return None
+        return replace(self, uri=self.read_uri, read_uri=None)
+
+    @property
+    def backend(self) -> str:
+        return make_url(self.uri).get_backend_name()
+
+    def engine_options(self) -> dict[str, Any]:
+        if self.backend == "sqlite":
+            # aiosqlite passes these to sqlite3.connect()
+            connect_args = {"cached_statements": self.statement_cache_size}
+        else:
+            connect_args = {"prepared_statement_cache_size": self.statement_cache_size}
+        options = {"echo": self.echo, "pool_pre_ping": self.pool_pre_ping, "connect_args": connect_args}
+        if make_url(self.uri).database in (None, "", ":memory:"):
+            # in-memory SQLite uses a single static connection without a queue pool
+            return options
+        return {
+            **options,
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+        }
+
+
+# Defaults per backend: a local SQLite file does not drop connections,
+# a Postgres server behind a network or a proxy may.
+PROFILES: dict[str, dict[str, Any]] = {
+    "sqlite": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+    },
+    "postgresql": {
+        "pool_size": 15,
+        "max_overflow": 15,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+}
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value is not None else default
+
+
+def load_database_config() -> DatabaseConfig:
+    load_dotenv()
+    uri = os.getenv('DATABASE_URI')
+    if not uri:
+        raise ValueError("DB_URI env variable is not set")
+
+    backend = make_url(uri).get_backend_name()
+    profile = PROFILES.get(backend, PROFILES["postgresql"])
+    sqlite = None
+    if backend == "sqlite":
+        defaults = SqliteConfig()
+        sqlite = SqliteConfig(
+            journal_mode=os.getenv('SQLITE_JOURNAL_MODE', defaults.journal_mode),
+            synchronous=os.getenv('SQLITE_SYNCHRONOUS', defaults.synchronous),
+            mmap_size=_env_int('SQLITE_MMAP_SIZE', defaults.mmap_size),
+            busy_timeout_ms=_env_int('SQLITE_BUSY_TIMEOUT_MS', defaults.busy_timeout_ms),
+        )
+    return DatabaseConfig(
+        uri=uri,
+        echo=_env_bool('DATABASE_ECHO', False),
+        pool_size=_env_int('DATABASE_POOL_SIZE', profile["pool_size"]),
+        max_overflow=_env_int('DATABASE_MAX_OVERFLOW', profile["max_overflow"]),
+        pool_timeout=float(os.getenv('DATABASE_POOL_TIMEOUT', '30')),
+        pool_recycle=_env_int('DATABASE_POOL_RECYCLE', profile["pool_recycle"]),
+        pool_pre_ping=_env_bool('DATABASE_POOL_PRE_PING', profile["pool_pre_ping"]),
+        statement_cache_size=_env_int('DATABASE_STATEMENT_CACHE_SIZE', 100),
+        sqlite=sqlite,
+        read_uri=os.getenv('DATABASE_READ_URI') or None,
+        read_stickiness_seconds=float(os.getenv('DATABASE_READ_STICKINESS_SECONDS', '5')),
+        group_commit=_env_bool('DATABASE_GROUP_COMMIT', False),
+        group_commit_window_ms=float(os.getenv('DATABASE_GROUP_COMMIT_WINDOW_MS', '2')),
+        group_commit_max_batch=_env_int('DATABASE_GROUP_COMMIT_MAX_BATCH', 256),
+    )
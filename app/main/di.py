@@ -1,23 +1,56 @@
 import os
 from functools import partial
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, Depends
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 
-from app.adapters.sqlalchemy_db.gateway import SqlaGateway, UserSqlaGateway
+from app.adapters.cache.gateway import CachedGateway, CachedGatewayFactory
+from app.adapters.cache.lru import LRUTaskListCache
+from app.adapters.cache.users import LRUUserCache
+from app.adapters.events.memory import InMemoryTaskEventBroker
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway, UserSqlaGateway, SqlaGatewayFactory
+from app.adapters.sqlalchemy_db.group_commit import GroupCommitWriter, GroupCommitGateway
+from app.adapters.sqlalchemy_db.jobs import SqlaJobQueue, SqlaJobStore
+from app.adapters.sqlalchemy_db.metrics import PoolMetrics
 from app.adapters.sqlalchemy_db.models import User
+from app.adapters.sqlalchemy_db.routing import ReadStickiness
+from app.adapters.sqlalchemy_db.session import PinnedConnectionSession
 from app.api.depends_stub import Stub
-from app.application.protocols.database import UoW, DatabaseGateway, UserDataBaseGateway
+from app.application.protocols.cache import TaskListCache, UserCache
+from app.application.protocols.database import UoW, DatabaseGateway, UserDataBaseGateway, DatabaseGatewayFactory
+from app.application.protocols.events import TaskEventBroker
+from app.application.protocols.jobs import JobQueue
+from app.application.jobs import JobRunner, JobHandler
+from app.application.task import reconcile_task_stats, write_task_titles, purge_deleted_tasks, task_job_handlers
 from app.application.user_manager import get_user_manager, UserManager
+from app.application.write_behind import TitleWriteBehind
+from app.main.background import PeriodicJob, BackgroundWorker
+from app.main.config import DatabaseConfig, SqliteConfig, load_database_config
 
 
 async def new_gateway(
-        session: AsyncSession = Depends(Stub(AsyncSession))
-) -> AsyncGenerator[SqlaGateway, None]:
-    yield SqlaGateway(session)
+        stickiness: Optional[ReadStickiness],
+        writer: Optional[GroupCommitWriter],
+        session: AsyncSession = Depends(Stub(AsyncSession)),
+        read_session: AsyncSession = Depends(Stub(AsyncSession, role="read")),
+) -> AsyncGenerator[DatabaseGateway, None]:
+    gateway = SqlaGateway(session, read_session, stickiness)
+    yield gateway if writer is None else GroupCommitGateway(gateway, writer)
+
+
+async def new_cached_gateway(
+        cache: TaskListCache,
+        stickiness: Optional[ReadStickiness],
+        writer: Optional[GroupCommitWriter],
+        session: AsyncSession = Depends(Stub(AsyncSession)),
+        read_session: AsyncSession = Depends(Stub(AsyncSession, role="read")),
+) -> AsyncGenerator[CachedGateway, None]:
+    gateway = SqlaGateway(session, read_session, stickiness)
+    yield CachedGateway(gateway if writer is None else GroupCommitGateway(gateway, writer), cache)
 
 
 async def new_uow(
@@ -26,48 +59,220 @@ async def new_uow(
     return session
 
 
-def create_session_maker() -> async_sessionmaker[AsyncSession]:
+def set_sqlite_pragmas(engine: AsyncEngine, config: SqliteConfig) -> None:
+    pragmas = config.pragmas()
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_engine(config: DatabaseConfig) -> AsyncEngine:
+    engine = create_async_engine(config.uri, **config.engine_options())
+    if config.sqlite is not None:
+        set_sqlite_pragmas(engine, config.sqlite)
+    return engine
+
+
+def create_session_maker(config: Optional[DatabaseConfig] = None) -> async_sessionmaker[AsyncSession]:
+    engine = create_engine(config or load_database_config())
+    return async_sessionmaker(
+        engine, autoflush=False, expire_on_commit=False, sync_session_class=PinnedConnectionSession,
+    )
+
+
+def create_task_list_cache() -> Optional[TaskListCache]:
     load_dotenv()
-    db_uri = os.getenv('DATABASE_URI')
-    if not db_uri:
-        raise ValueError("DB_URI env variable is not set")
-
-    engine = create_async_engine(
-        db_uri,
-        echo=True,
-        # pool_size=15,
-        # max_overflow=15,
-        # connect_args={
-        #     "connect_timeout": 5,
-        # },
+    if os.getenv('TASK_CACHE_ENABLED', 'false').lower() not in ('1', 'true', 'yes'):
+        return None
+    return LRUTaskListCache(
+        max_entries=int(os.getenv('TASK_CACHE_MAX_ENTRIES', '10000')),
+        max_tasks=int(os.getenv('TASK_CACHE_MAX_TASKS', '1000000')),
+        ttl_seconds=float(os.getenv('TASK_CACHE_TTL_SECONDS', '30')),
+    )
+
+
+def create_user_cache() -> Optional[UserCache]:
+    load_dotenv()
+    if os.getenv('AUTH_CACHE_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        return None
+    return LRUUserCache(
+        max_entries=int(os.getenv('AUTH_CACHE_MAX_ENTRIES', '10000')),
+        ttl_seconds=float(os.getenv('AUTH_CACHE_TTL_SECONDS', '60')),
+    )
+
+
+def create_group_commit_writer(
+        config: DatabaseConfig,
+        engine: AsyncEngine,
+        stickiness: Optional[ReadStickiness],
+) -> Optional[GroupCommitWriter]:
+    if not config.group_commit:
+        return None
+    return GroupCommitWriter(
+        engine,
+        window_seconds=config.group_commit_window_ms / 1000,
+        max_batch=config.group_commit_max_batch,
+        stickiness=stickiness,
+    )
+
+
+def create_task_event_broker() -> TaskEventBroker:
+    load_dotenv()
+    return InMemoryTaskEventBroker(
+        queue_size=int(os.getenv('TASK_EVENTS_QUEUE_SIZE', '256')),
+        history_size=int(os.getenv('TASK_EVENTS_HISTORY_SIZE', '100')),
+        max_users=int(os.getenv('TASK_EVENTS_MAX_USERS', '10000')),
     )
-    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
 
 async def new_session(session_maker: async_sessionmaker[AsyncSession]) -> AsyncGenerator[AsyncSession, None]:
+    # The session of a request keeps the connection it checked out until the request ends,
+    # or until `UoW.close`, so commits in the middle of a request do not check it out again
     async with session_maker() as session:
         yield session
 
 
+async def new_read_session(session_maker: async_sessionmaker[AsyncSession]) -> AsyncGenerator[AsyncSession, None]:
+    async with session_maker() as session:
+        yield session
+
+
+async def same_session(
+        session: AsyncSession = Depends(Stub(AsyncSession))
+) -> AsyncSession:
+    return session
+
+
 async def new_user_gateway(
         session: AsyncSession = Depends(Stub(AsyncSession))
 ) -> AsyncGenerator[UserSqlaGateway, None]:
     yield UserSqlaGateway(session)
 
 
+async def new_job_queue(
+        session: AsyncSession = Depends(Stub(AsyncSession))
+) -> AsyncGenerator[SqlaJobQueue, None]:
+    yield SqlaJobQueue(session)
+
+
 async def get_new_user_db(
         session: AsyncSession = Depends(Stub(AsyncSession))
 ) -> AsyncGenerator[SQLAlchemyUserDatabase, None]:
     yield SQLAlchemyUserDatabase(session, User)
 
 
-def init_dependencies(app: FastAPI) -> None:
-    session_maker = create_session_maker()
+def create_title_write_behind(
+        gateway_factory: DatabaseGatewayFactory,
+        events: TaskEventBroker,
+) -> Optional[TitleWriteBehind]:
+    load_dotenv()
+    if os.getenv('TASK_TITLE_WRITE_BEHIND_ENABLED', 'false').lower() not in ('1', 'true', 'yes'):
+        return None
+    return TitleWriteBehind(
+        partial(write_task_titles, gateway_factory=gateway_factory, events=events),
+        max_pending=int(os.getenv('TASK_TITLE_WRITE_BEHIND_MAX_PENDING', '1000')),
+    )
+
+
+def create_job_runner(
+        session_maker: async_sessionmaker[AsyncSession],
+        handlers: dict[str, JobHandler],
+) -> JobRunner:
+    load_dotenv()
+    return JobRunner(
+        SqlaJobStore(session_maker),
+        handlers,
+        concurrency=int(os.getenv('JOB_CONCURRENCY', '4')),
+        poll_seconds=float(os.getenv('JOB_POLL_SECONDS', '1')),
+        max_attempts=int(os.getenv('JOB_MAX_ATTEMPTS', '5')),
+        retry_seconds=float(os.getenv('JOB_RETRY_SECONDS', '10')),
+        lease_seconds=float(os.getenv('JOB_LEASE_SECONDS', '300')),
+        drain_seconds=float(os.getenv('JOB_DRAIN_SECONDS', '10')),
+    )
+
+
+def create_periodic_jobs(
+        gateway_factory: DatabaseGatewayFactory,
+        write_behind: Optional[TitleWriteBehind],
+) -> list[PeriodicJob]:
+    load_dotenv()
+    jobs = []
+    if write_behind is not None:
+        jobs.append(PeriodicJob(
+            "flush_task_titles",
+            float(os.getenv('TASK_TITLE_WRITE_BEHIND_SECONDS', '0.5')),
+            write_behind.flush,
+            run_on_shutdown=True,
+        ))
+    reconcile_seconds = float(os.getenv('TASK_STATS_RECONCILE_SECONDS', '3600'))
+    if reconcile_seconds > 0:
+        jobs.append(PeriodicJob(
+            "reconcile_task_stats", reconcile_seconds, partial(reconcile_task_stats, gateway_factory),
+        ))
+    purge_seconds = float(os.getenv('TASK_PURGE_INTERVAL_SECONDS', '300'))
+    if purge_seconds > 0:
+        jobs.append(PeriodicJob("purge_deleted_tasks", purge_seconds, partial(
+            purge_deleted_tasks,
+            gateway_factory,
+            retention_seconds=float(os.getenv('TASK_PURGE_AFTER_SECONDS', '86400')),
+            batch_size=int(os.getenv('TASK_PURGE_BATCH_SIZE', '1000')),
+        )))
+    return jobs
+
+
+def init_dependencies(app: FastAPI, database_config: Optional[DatabaseConfig] = None) -> None:
+    database_config = database_config or load_database_config()
+    session_maker = create_session_maker(database_config)
+    read_config = database_config.read_config()
+    app.state.pool_metrics = {"primary": PoolMetrics(session_maker.kw["bind"], "primary")}
+    cache = create_task_list_cache()
+    app.state.task_list_cache = cache
 
     app.dependency_overrides[AsyncSession] = partial(new_session, session_maker)
-    app.dependency_overrides[DatabaseGateway] = new_gateway
+    if read_config is None:
+        stickiness = None
+        gateway_factory = SqlaGatewayFactory(session_maker)
+        app.dependency_overrides[Stub(AsyncSession, role="read")] = same_session
+    else:
+        read_session_maker = create_session_maker(read_config)
+        app.state.pool_metrics["read"] = PoolMetrics(read_session_maker.kw["bind"], "read")
+        stickiness = ReadStickiness(database_config.read_stickiness_seconds)
+        gateway_factory = SqlaGatewayFactory(session_maker, read_session_maker, stickiness)
+        app.dependency_overrides[Stub(AsyncSession, role="read")] = partial(new_read_session, read_session_maker)
+    writer = create_group_commit_writer(database_config, session_maker.kw["bind"], stickiness)
+    app.state.group_commit_writer = writer
+    if cache is None:
+        app.dependency_overrides[DatabaseGateway] = partial(new_gateway, stickiness, writer)
+    else:
+        app.dependency_overrides[DatabaseGateway] = partial(new_cached_gateway, cache, stickiness, writer)
+        gateway_factory = CachedGatewayFactory(gateway_factory, cache)
+    app.dependency_overrides[DatabaseGatewayFactory] = lambda: gateway_factory
     app.dependency_overrides[UoW] = new_uow
 
+    task_events = create_task_event_broker()
+    app.state.task_events = task_events
+    app.dependency_overrides[TaskEventBroker] = lambda: task_events
+
+    write_behind = create_title_write_behind(gateway_factory, task_events)
+    app.state.title_write_behind = write_behind
+    app.dependency_overrides[TitleWriteBehind] = lambda: write_behind
+    app.state.periodic_jobs = create_periodic_jobs(gateway_factory, write_behind)
+
+    job_runner = create_job_runner(session_maker, task_job_handlers(gateway_factory, task_events))
+    app.state.job_runner = job_runner
+    app.dependency_overrides[JobQueue] = new_job_queue
+    app.state.background_workers = [BackgroundWorker("jobs", job_runner.run, job_runner.stop)]
+    if writer is not None:
+        app.state.background_workers.append(BackgroundWorker("group_commit", writer.run, writer.stop))
+
     app.dependency_overrides[UserDataBaseGateway] = new_user_gateway
     app.dependency_overrides[SQLAlchemyUserDatabase] = get_new_user_db
     app.dependency_overrides[UserManager] = get_user_manager
+
+    user_cache = create_user_cache()
+    app.state.user_cache = user_cache
+    app.dependency_overrides[UserCache] = lambda: user_cache
@@ -1,19 +1,24 @@
+from typing import Optional
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
+from .background import lifespan
+from .config import DatabaseConfig
 from .di import init_dependencies
 from .routers import init_routers
 
 
-def create_app() -> FastAPI:
-    app = FastAPI()
+def create_app(database_config: Optional[DatabaseConfig] = None) -> FastAPI:
+    app = FastAPI(lifespan=lifespan)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["http://localhost:3000"],
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],
     )
     init_routers(app)
-    init_dependencies(app)
+    init_dependencies(app, database_config)
     return app
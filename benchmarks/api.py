@@ -0,0 +1,340 @@
+"""
+Measures latency percentiles and throughput of the task API per scenario and list size.
+
+For every size in `--sizes`, a fresh SQLite database is seeded with `--users` users of that many
+tasks each (see `benchmarks.seed`), and every scenario sends `--requests` requests from
+`--concurrency` clients, each logged in as its own user:
+
+- `create`: `POST /tasks/`
+- `list_shallow`: the first page of `GET /tasks/`
+- `list_deep_offset`: the last page of `GET /tasks/` by `skip`
+- `list_deep_cursor`: the last page of `GET /tasks/` by `after`
+- `update`: `PUT /tasks/{id}`
+- `reorder`: `POST /tasks/reorder` swapping the positions of two tasks
+- `move`: `POST /tasks/{id}/move`
+- `delete`: `DELETE /tasks/{id}`, every request deletes another task
+
+Transports:
+- `asgi`: the app runs in this process and is called through httpx `ASGITransport`.
+- `uvicorn`: the app runs in `--workers` uvicorn worker processes and is called over TCP.
+
+The report is JSON with the current git commit, written to stdout or `--output`.
+With `--compare` and the report of another run, the ratios of throughput and p95 latency
+to that run are added, and scenarios slower than `--tolerance` are listed as regressions.
+
+Run with `python -m benchmarks.api [--sizes 100 1000 10000] [--users N] [--concurrency N] [--requests N]
+[--transports asgi uvicorn] [--workers N] [--output FILE] [--compare FILE]`.
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import httpx
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.adapters.sqlalchemy_db import models
+from app.application.positions import POSITION_STEP
+from app.main import create_app
+from benchmarks.seed import PASSWORD, seed_database, user_email
+
+PAGE_SIZE = 20
+SERVER_START_TIMEOUT = 30
+
+
+@dataclass
+class Client:
+    http: httpx.AsyncClient
+    user_id: int
+    first_task_id: int
+    size: int
+    deep_cursor: Optional[str] = None
+    deleted: int = 0
+
+    def task_id(self, index: int) -> int:
+        return self.first_task_id + index % self.size
+
+
+@dataclass
+class ScenarioResult:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+
+Scenario = Callable[[Client, int], Awaitable[httpx.Response]]
+
+
+async def create(client: Client, step: int) -> httpx.Response:
+    return await client.http.post("/tasks/", json={"title": f"Benchmark task {step}"})
+
+
+async def list_shallow(client: Client, step: int) -> httpx.Response:
+    return await client.http.get("/tasks/", params={"limit": PAGE_SIZE})
+
+
+async def list_deep_offset(client: Client, step: int) -> httpx.Response:
+    return await client.http.get("/tasks/", params={"skip": max(client.size - PAGE_SIZE, 0), "limit": PAGE_SIZE})
+
+
+async def list_deep_cursor(client: Client, step: int) -> httpx.Response:
+    params = {"limit": PAGE_SIZE}
+    if client.deep_cursor is not None:
+        params["after"] = client.deep_cursor
+    return await client.http.get("/tasks/", params=params)
+
+
+async def update(client: Client, step: int) -> httpx.Response:
+    return await client.http.put(
+        f"/tasks/{client.task_id(step)}", json={"title": f"Updated {step}", "completed": step % 2 == 0},
+    )
+
+
+async def reorder(client: Client, step: int) -> httpx.Response:
+    # seeded tasks are at index * POSITION_STEP, every other request swaps two of them back
+    first, second = (step // 2) % client.size, (step // 2 + 1) % client.size
+    if step % 2 == 0:
+        first, second = second, first
+    return await client.http.post("/tasks/reorder", json={"tasks": [
+        {"id": client.task_id(first), "position": second * POSITION_STEP},
+        {"id": client.task_id(second), "position": first * POSITION_STEP},
+    ]})
+
+
+async def move(client: Client, step: int) -> httpx.Response:
+    return await client.http.post(
+        f"/tasks/{client.task_id(step + 2)}/move", json={"after_id": client.task_id(step)},
+    )
+
+
+async def delete(client: Client, step: int) -> httpx.Response:
+    # from the end of the list, so the other scenarios keep their tasks
+    client.deleted += 1
+    return await client.http.delete(f"/tasks/{client.first_task_id + client.size - client.deleted}")
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "list_shallow": list_shallow,
+    "list_deep_offset": list_deep_offset,
+    "list_deep_cursor": list_deep_cursor,
+    "create": create,
+    "update": update,
+    "reorder": reorder,
+    "move": move,
+    "delete": delete,
+}
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of sorted values.
+    """
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+def summarize(result: ScenarioResult, elapsed: float) -> dict:
+    latencies = sorted(result.latencies)
+    return {
+        "requests": len(latencies),
+        "errors": result.errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def asgi_transport(uri: str, workers: int) -> AsyncIterator[tuple[httpx.AsyncBaseTransport, str]]:
+    os.environ["DATABASE_URI"] = uri
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        yield httpx.ASGITransport(app=app), "https://benchmark"
+
+
+@contextlib.asynccontextmanager
+async def uvicorn_transport(uri: str, workers: int) -> AsyncIterator[tuple[httpx.AsyncBaseTransport, str]]:
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:create_app", "--factory",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+        ],
+        env={**os.environ, "DATABASE_URI": uri},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.perf_counter() + SERVER_START_TIMEOUT
+        async with httpx.AsyncClient(base_url=base_url) as probe:
+            while True:
+                try:
+                    await probe.get("/tasks/")
+                    break
+                except httpx.TransportError:
+                    if server.poll() is not None or time.perf_counter() > deadline:
+                        raise RuntimeError("uvicorn did not start")
+                    await asyncio.sleep(0.2)
+        yield httpx.AsyncHTTPTransport(), base_url
+    finally:
+        server.terminate()
+        server.wait()
+
+
+TRANSPORTS = {"asgi": asgi_transport, "uvicorn": uvicorn_transport}
+
+
+async def first_task_ids(uri: str) -> dict[int, int]:
+    engine = create_async_engine(uri)
+    async with engine.connect() as conn:
+        query = select(models.Task.user_id, func.min(models.Task.id)).group_by(models.Task.user_id)
+        result = {user_id: task_id for user_id, task_id in await conn.execute(query)}
+    await engine.dispose()
+    return result
+
+
+async def login(transport: httpx.AsyncBaseTransport, base_url: str, user_id: int, first_task_id: int,
+                size: int) -> Client:
+    http = httpx.AsyncClient(transport=transport, base_url=base_url)
+    response = await http.post("/auth/jwt/login", data={"username": user_email(user_id), "password": PASSWORD})
+    response.raise_for_status()
+    # the auth cookie is Secure, it is sent explicitly so that plain HTTP to uvicorn works as well
+    http.headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in response.cookies.items())
+    http.cookies.clear()
+    client = Client(http, user_id, first_task_id, size)
+    if size > PAGE_SIZE:
+        response = await http.get("/tasks/", params={"skip": size - 2 * PAGE_SIZE, "limit": PAGE_SIZE})
+        client.deep_cursor = response.headers.get("X-Next-Cursor")
+    return client
+
+
+async def run_scenario(clients: list[Client], scenario: Scenario, requests: int, warmup: int) -> dict:
+    result = ScenarioResult()
+
+    async def drive(client: Client, count: int, record: bool) -> None:
+        for _ in range(count):
+            step = client_steps[client.user_id]
+            client_steps[client.user_id] += 1
+            started = time.perf_counter()
+            response = await scenario(client, step)
+            if not record:
+                continue
+            result.latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                result.errors += 1
+
+    client_steps = {client.user_id: 0 for client in clients}
+    await asyncio.gather(*(drive(client, max(warmup // len(clients), 1), False) for client in clients))
+    per_client = [requests // len(clients) + (index < requests % len(clients)) for index in range(len(clients))]
+    started = time.perf_counter()
+    await asyncio.gather(*(drive(client, count, True) for client, count in zip(clients, per_client)))
+    return summarize(result, time.perf_counter() - started)
+
+
+async def run_size(transport_name: str, size: int, args: argparse.Namespace) -> dict:
+    uri = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'api.db')}"
+    users = max(args.users, args.concurrency)
+    await seed_database(uri, users, size)
+    task_ids = await first_task_ids(uri)
+    report = {}
+    async with TRANSPORTS[transport_name](uri, args.workers) as (transport, base_url):
+        clients = [
+            await login(transport, base_url, user_id, task_ids[user_id], size)
+            for user_id in range(1, args.concurrency + 1)
+        ]
+        for name in args.scenarios:
+            report[name] = await run_scenario(clients, SCENARIOS[name], args.requests, args.warmup)
+        for client in clients:
+            await client.http.aclose()
+    return report
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> dict:
+    """
+    Ratios of throughput and p95 latency to the baseline, for scenarios present in both reports.
+    """
+    ratios = {}
+    regressions = []
+    for transport, sizes in results.items():
+        for size, scenarios in sizes.items():
+            for name, current in scenarios.items():
+                previous = baseline.get("results", {}).get(transport, {}).get(size, {}).get(name)
+                if not isinstance(previous, dict) or "p95_ms" not in previous or "p95_ms" not in current:
+                    continue
+                entry = {
+                    "throughput": round(current["throughput_rps"] / previous["throughput_rps"], 3),
+                    "p95": round(current["p95_ms"] / previous["p95_ms"], 3),
+                }
+                ratios.setdefault(transport, {}).setdefault(size, {})[name] = entry
+                if entry["throughput"] < 1 - tolerance or entry["p95"] > 1 + tolerance:
+                    regressions.append(f"{transport}/{size}/{name}")
+    return {"baseline_commit": baseline.get("commit"), "ratios": ratios, "regressions": regressions}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--transports", nargs="+", choices=list(TRANSPORTS), default=["asgi"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = {}
+    for transport_name in args.transports:
+        if transport_name == "uvicorn" and importlib.util.find_spec("uvicorn") is None:
+            results[transport_name] = {"error": "uvicorn is not installed"}
+            continue
+        results[transport_name] = {
+            str(size): asyncio.run(run_size(transport_name, size, args)) for size in args.sizes
+        }
+    report = {
+        "commit": git_commit(),
+        "users": max(args.users, args.concurrency),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "workers": args.workers if "uvicorn" in args.transports else None,
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare) as baseline:
+            report["comparison"] = compare(results, json.load(baseline), args.tolerance)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
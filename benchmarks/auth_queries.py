@@ -0,0 +1,80 @@
+"""
+Counts SQL statements and pool checkouts per authenticated request with and without the user cache.
+
+Run with `python -m benchmarks.auth_queries [--requests N]`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+from collections import Counter
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from app.main import create_app
+from app.main.config import DatabaseConfig, SqliteConfig
+from benchmarks.load_test import create_schema
+
+PASSWORD = "auth-queries"
+
+counters = Counter()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    if not statement.lstrip().upper().startswith("PRAGMA"):
+        counters["statements"] += 1
+
+
+@event.listens_for(Pool, "checkout")
+def count_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    counters["checkouts"] += 1
+
+
+async def measure(cache_enabled: bool, requests: int) -> dict:
+    os.environ["AUTH_CACHE_ENABLED"] = "true" if cache_enabled else "false"
+    config = DatabaseConfig(uri=f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'auth.db')}",
+                            sqlite=SqliteConfig())
+    await create_schema(config.uri)
+    app = create_app(config)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://auth-queries") as client:
+        await client.post("/auth/register", json={"email": "a@example.com", "password": PASSWORD, "username": "a"})
+        await client.post("/auth/jwt/login", data={"username": "a@example.com", "password": PASSWORD})
+        task_id = (await client.post("/tasks/", json={"title": "Task"})).json()["id"]
+        etag = (await client.get("/tasks/")).headers["etag"]
+
+        report = {}
+        for name, call in {
+            "GET /tasks/{id}": lambda: client.get(f"/tasks/{task_id}"),
+            "GET /tasks/ (304)": lambda: client.get("/tasks/", headers={"If-None-Match": etag}),
+            "GET /tasks/": lambda: client.get("/tasks/"),
+        }.items():
+            await call()
+            counters.clear()
+            for _ in range(requests):
+                response = await call()
+                assert response.status_code in (200, 304), response.text
+            report[name] = {
+                "statements_per_request": counters["statements"] / requests,
+                "checkouts_per_request": counters["checkouts"] / requests,
+            }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "without_user_cache": asyncio.run(measure(False, args.requests)),
+        "with_user_cache": asyncio.run(measure(True, args.requests)),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
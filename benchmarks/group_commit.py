@@ -0,0 +1,83 @@
+"""
+Measures task creations per second with and without the group commit writer
+at 1, 10 and 100 concurrent clients on SQLite.
+
+Every client sends `POST /tasks/` in a loop for `--duration` seconds. `--synchronous full`
+(the default here) makes every commit wait for fsync, as SQLite does without WAL tuning.
+
+Run with `python -m benchmarks.group_commit [--clients 1 10 100] [--duration SECONDS] [--synchronous full|normal]`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import httpx
+
+from app.main import create_app
+from app.main.config import DatabaseConfig, SqliteConfig
+from benchmarks.load_test import create_schema
+
+PASSWORD = "group-commit"
+
+
+async def writer(client: httpx.AsyncClient, deadline: float, counters: dict[str, int]) -> None:
+    while time.perf_counter() < deadline:
+        response = await client.post("/tasks/", json={"title": f"Task {counters['writes']}"})
+        counters["writes"] += 1
+        if response.status_code != 200:
+            counters["errors"] += 1
+
+
+async def measure(group_commit: bool, clients: int, duration: float, synchronous: str) -> dict:
+    config = DatabaseConfig(
+        uri=f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'group_commit.db')}",
+        sqlite=SqliteConfig(synchronous=synchronous),
+        group_commit=group_commit,
+    )
+    await create_schema(config.uri)
+    app = create_app(config)
+    async with app.router.lifespan_context(app):
+        login = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://group-commit")
+        await login.post("/auth/register", json={"email": "g@example.com", "password": PASSWORD, "username": "g"})
+        await login.post("/auth/jwt/login", data={"username": "g@example.com", "password": PASSWORD})
+        sessions = [
+            httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://group-commit",
+                              cookies=login.cookies)
+            for _ in range(clients)
+        ]
+        counters = {"writes": 0, "errors": 0}
+        started = time.perf_counter()
+        await asyncio.gather(*(writer(client, started + duration, counters) for client in sessions))
+        elapsed = time.perf_counter() - started
+        for client in [login, *sessions]:
+            await client.aclose()
+        report = {
+            "writes_per_sec": round(counters["writes"] / elapsed, 1),
+            "errors": counters["errors"],
+        }
+        if app.state.group_commit_writer is not None:
+            report["writes_per_transaction"] = round(app.state.group_commit_writer.stats().writes_per_transaction, 2)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--synchronous", default="full", choices=["full", "normal"])
+    args = parser.parse_args()
+
+    report = {"synchronous": args.synchronous}
+    for clients in args.clients:
+        report[clients] = {
+            "direct": asyncio.run(measure(False, clients, args.duration, args.synchronous)),
+            "group_commit": asyncio.run(measure(True, clients, args.duration, args.synchronous)),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
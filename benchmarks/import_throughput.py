@@ -0,0 +1,82 @@
+"""
+Compares task insert throughput of the streaming import with one `add_task` call per task.
+
+Run with `python -m benchmarks.import_throughput [--tasks N] [--chunk-size N]`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway
+from app.application.export import TaskFileFormat
+from app.application.models import TaskCreate
+from app.application.task import add_task, import_tasks
+from app.main.di import create_task_event_broker
+from benchmarks.seed import seed_database
+
+USER_ID = 1
+BODY_CHUNK_SIZE = 64 * 1024
+
+
+async def create_database():
+    uri = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    await seed_database(uri, 1, 0)
+    engine = create_async_engine(uri)
+    return engine, async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+async def per_request(tasks: int) -> float:
+    engine, session_maker = await create_database()
+    events = create_task_event_broker()
+    started = time.perf_counter()
+    for index in range(tasks):
+        async with session_maker() as session:
+            await add_task(USER_ID, TaskCreate(title=f"Task {index}"), SqlaGateway(session), session, events)
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return elapsed
+
+
+async def streamed_import(tasks: int, chunk_size: int) -> float:
+    engine, session_maker = await create_database()
+    payload = "".join(json.dumps({"title": f"Task {index}"}) + "\n" for index in range(tasks)).encode()
+
+    async def body():
+        for start in range(0, len(payload), BODY_CHUNK_SIZE):
+            yield payload[start:start + BODY_CHUNK_SIZE]
+
+    started = time.perf_counter()
+    async with session_maker() as session:
+        summary = await import_tasks(
+            USER_ID, body(), TaskFileFormat.NDJSON, chunk_size, SqlaGateway(session), session,
+            create_task_event_broker(),
+        )
+    elapsed = time.perf_counter() - started
+    assert summary.imported == tasks, summary
+    await engine.dispose()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    add_task_seconds = asyncio.run(per_request(args.tasks))
+    import_seconds = asyncio.run(streamed_import(args.tasks, args.chunk_size))
+    print(json.dumps({
+        "tasks": args.tasks,
+        "chunk_size": args.chunk_size,
+        "add_task_rows_per_sec": round(args.tasks / add_task_seconds),
+        "import_rows_per_sec": round(args.tasks / import_seconds),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
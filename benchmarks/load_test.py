@@ -0,0 +1,124 @@
+"""
+Measures requests per second of a mixed task API workload for each database engine profile.
+
+Profiles:
+- `sqlite-legacy`: SQL echo on and SQLite defaults, as the engine was configured before.
+- `sqlite-tuned`: the defaults of `load_database_config` for SQLite (WAL, synchronous=NORMAL, mmap).
+- `postgres`: the Postgres profile, only when `--postgres-uri` is given (requires asyncpg).
+
+Run with `python -m benchmarks.load_test [--concurrency N] [--duration SECONDS] [--postgres-uri URI]`.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+import time
+import uuid
+
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.adapters.sqlalchemy_db import models
+from app.main import create_app
+from app.main.config import DatabaseConfig, SqliteConfig, PROFILES
+
+SEED_TASKS = 100
+PASSWORD = "load-test"
+
+
+async def create_schema(uri: str) -> None:
+    engine = create_async_engine(uri)
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    await engine.dispose()
+
+
+async def login(app, index: int) -> httpx.AsyncClient:
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://load-test")
+    email = f"load-{uuid.uuid4().hex[:8]}-{index}@example.com"
+    response = await client.post("/auth/register", json={"email": email, "password": PASSWORD, "username": email})
+    response.raise_for_status()
+    response = await client.post("/auth/jwt/login", data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    response = await client.post("/tasks/batch", json={"tasks": [{"title": f"Task {i}"} for i in range(SEED_TASKS)]})
+    response.raise_for_status()
+    return client
+
+
+async def worker(client: httpx.AsyncClient, deadline: float, counters: dict[str, int]) -> None:
+    task_ids = [item["id"] for item in (await client.get("/tasks/", params={"limit": SEED_TASKS})).json()]
+    step = 0
+    while time.perf_counter() < deadline:
+        # 70% list reads, 20% creates, 10% title updates
+        kind = step % 10
+        if kind < 7:
+            response = await client.get("/tasks/", params={"limit": 20})
+        elif kind < 9:
+            response = await client.post("/tasks/", json={"title": f"Load {step}"})
+        else:
+            task_id = task_ids[step % len(task_ids)]
+            response = await client.patch(f"/tasks/{task_id}/title", json={"title": f"Renamed {step}"})
+        counters["requests"] += 1
+        if response.status_code >= 400:
+            counters["errors"] += 1
+        step += 1
+
+
+async def run_profile(config: DatabaseConfig, concurrency: int, duration: float) -> dict:
+    await create_schema(config.uri)
+    # echo handlers bind to stdout when the engine is created, keep the report readable
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        app = create_app(config)
+        clients = [await login(app, index) for index in range(concurrency)]
+        counters = {"requests": 0, "errors": 0}
+        pool_before = app.state.pool_metrics["primary"].stats()
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client, started + duration, counters) for client in clients))
+        elapsed = time.perf_counter() - started
+        pool_after = app.state.pool_metrics["primary"].stats()
+        for client in clients:
+            await client.aclose()
+    return {
+        "requests": counters["requests"],
+        "errors": counters["errors"],
+        "requests_per_sec": round(counters["requests"] / elapsed, 1),
+        "checkouts_per_request": round((pool_after.checkouts - pool_before.checkouts) / counters["requests"], 2),
+        "peak_checked_out": pool_after.peak_checked_out,
+    }
+
+
+def profiles(postgres_uri: str) -> dict[str, DatabaseConfig]:
+    directory = tempfile.mkdtemp()
+    result = {
+        "sqlite-legacy": DatabaseConfig(
+            uri=f"sqlite+aiosqlite:///{os.path.join(directory, 'legacy.db')}",
+            echo=True,
+        ),
+        "sqlite-tuned": DatabaseConfig(
+            uri=f"sqlite+aiosqlite:///{os.path.join(directory, 'tuned.db')}",
+            sqlite=SqliteConfig(),
+            **PROFILES["sqlite"],
+        ),
+    }
+    if postgres_uri:
+        result["postgres"] = DatabaseConfig(uri=postgres_uri, **PROFILES["postgresql"])
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--postgres-uri", default="")
+    args = parser.parse_args()
+
+    report = {"concurrency": args.concurrency, "duration": args.duration}
+    for name, config in profiles(args.postgres_uri).items():
+        report[name] = asyncio.run(run_profile(config, args.concurrency, args.duration))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compares OFFSET and keyset (cursor) pagination latency across page depth.
+
+Run with `python -m benchmarks.pagination [--tasks N] [--limit N]`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway
+from app.application.models import TaskCursor
+from app.application.positions import POSITION_STEP
+from benchmarks.seed import seed_database
+
+USER_ID = 1
+REPEATS = 20
+
+
+async def measure(call) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        await call()
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+async def run(tasks: int, limit: int) -> list[dict]:
+    uri = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    await seed_database(uri, 1, tasks)
+    engine = create_async_engine(uri)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    results = []
+    pages = tasks // limit
+    for page in sorted({1, 10, 100, pages // 2, pages - 1}):
+        if not 0 < page < pages:
+            continue
+        skip = page * limit
+        async with session_maker() as session:
+            gateway = SqlaGateway(session)
+            offset_ms = await measure(lambda: gateway.get_tasks(USER_ID, skip, limit))
+            # the last task of the previous page, ids follow the list order of the seeded user
+            cursor = TaskCursor(position=(skip - 1) * POSITION_STEP, id=skip)
+            keyset_ms = await measure(lambda: gateway.get_tasks_after(USER_ID, cursor, limit))
+        results.append({"page": page, "offset_ms": round(offset_ms, 3), "keyset_ms": round(keyset_ms, 3)})
+
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    results = asyncio.run(run(args.tasks, args.limit))
+    print(json.dumps({"tasks": args.tasks, "limit": args.limit, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
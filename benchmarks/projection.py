@@ -0,0 +1,86 @@
+"""
+Compares latency and peak memory of task list reads with ORM hydration
+against the column-projected reads of SqlaGateway.
+
+- `orm`: `select(models.Task)` with entities loaded into the session, then `Task.model_validate`.
+- `columns`: `SqlaGateway.get_tasks`, Core rows of all task columns.
+- `fields`: `SqlaGateway.get_tasks` with `fields=("id", "title", "completed")`.
+
+Run with `python -m benchmarks.projection [--sizes 100 1000 10000] [--repeat N]`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway
+from app.application.models import Task
+from benchmarks.seed import seed_database
+
+USER_ID = 1
+FIELDS = ("id", "title", "completed")
+# long descriptions make reading columns that are not needed show in time and memory
+DESCRIPTION = "Some description of the task " * 8
+
+
+async def orm_tasks(session: AsyncSession, limit: int) -> list[Task]:
+    query = (
+        select(models.Task)
+        .where(models.Task.user_id == USER_ID)
+        .order_by(models.Task.position, models.Task.id)
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return [Task.model_validate(task) for task in result.scalars().all()]
+
+
+async def measure(size: int, repeat: int) -> dict:
+    uri = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'projection.db')}"
+    await seed_database(uri, 1, size, lambda user_id, index: {"description": DESCRIPTION})
+    engine = create_async_engine(uri)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    paths = {
+        "orm": lambda session: orm_tasks(session, size),
+        "columns": lambda session: SqlaGateway(session).get_tasks(USER_ID, 0, size),
+        "fields": lambda session: SqlaGateway(session).get_tasks(USER_ID, 0, size, FIELDS),
+    }
+    result = {}
+    for name, read in paths.items():
+        async with session_maker() as session:
+            assert len(await read(session)) == size
+        started = time.perf_counter()
+        for _ in range(repeat):
+            async with session_maker() as session:
+                await read(session)
+        elapsed = time.perf_counter() - started
+        async with session_maker() as session:
+            tracemalloc.start()
+            await read(session)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        result[name] = {
+            "ms_per_read": round(elapsed / repeat * 1000, 2),
+            "peak_kib": round(peak / 1024, 1),
+        }
+    await engine.dispose()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(json.dumps({size: asyncio.run(measure(size, args.repeat)) for size in args.sizes}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Measures task list reads with filters and full text search on a large SQLite database.
+
+Tasks are spread over `--users` users, titles and descriptions are drawn from a
+fixed vocabulary, so the search terms range from rare to common. Each read goes
+through SqlaGateway.get_tasks and returns the first page of 20 tasks of one user.
+The `like_scan` row runs the same search as a LIKE scan over the tasks of the user
+for comparison.
+
+Run with `python -m benchmarks.search [--tasks 1000000] [--users 10] [--repeat 20]`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway
+from app.adapters.sqlalchemy_db.search import task_search_condition
+from app.application.models import TaskFilter, TaskSort
+from benchmarks.seed import seed_database, TaskValues
+
+USER_ID = 1
+PAGE_SIZE = 20
+WORDS = [f"word{i}" for i in range(2000)]
+STARTED_AT = datetime(2026, 1, 1)
+
+
+def task_values(users: int) -> TaskValues:
+    generator = random.Random(42)
+
+    def values(user_id: int, index: int) -> dict:
+        # Zipf-like word frequencies: low word numbers are common
+        words = [WORDS[min(int(generator.paretovariate(1.0)) - 1, len(WORDS) - 1)] for _ in range(6)]
+        # creation times interleave the users, as if they added their tasks at the same time
+        created = index * users + user_id - 1
+        return {
+            "title": " ".join(words[:3]),
+            "completed": created % 4 == 0,
+            "createdAt": STARTED_AT + timedelta(seconds=created),
+            "description": " ".join(words[3:]),
+        }
+
+    return values
+
+
+def percentile(samples: list[float], share: float) -> float:
+    return round(sorted(samples)[min(int(len(samples) * share), len(samples) - 1)], 2)
+
+
+async def run(tasks: int, users: int, repeat: int) -> dict:
+    uri = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'search.db')}"
+    started = time.perf_counter()
+    await seed_database(uri, users, tasks // users, task_values(users))
+    seeded_in = time.perf_counter() - started
+    engine = create_async_engine(uri)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def like_scan(session, q):
+        return await session.execute(
+            models.Task.__table__.select()
+            .where(models.Task.user_id == USER_ID, task_search_condition("default", USER_ID, q))
+            .order_by(models.Task.position, models.Task.id)
+            .limit(PAGE_SIZE)
+        )
+
+    middle = STARTED_AT + timedelta(seconds=tasks // 2)
+    cases = {
+        "q_rare": TaskFilter(q="word300"),
+        "q_medium": TaskFilter(q="word20"),
+        "q_common": TaskFilter(q="word0"),
+        "q_two_terms": TaskFilter(q="word20 word3"),
+        "completed": TaskFilter(completed=True),
+        "created_range_desc": TaskFilter(
+            created_after=middle, created_before=middle + timedelta(hours=1), sort=TaskSort.CREATED_AT_DESC,
+        ),
+    }
+    report = {"tasks": tasks, "users": users, "seed_seconds": round(seeded_in, 1)}
+    for name, filters in cases.items():
+        samples = []
+        for _ in range(repeat):
+            async with session_maker() as session:
+                started = time.perf_counter()
+                result = await SqlaGateway(session).get_tasks(USER_ID, 0, PAGE_SIZE, filters=filters)
+                samples.append((time.perf_counter() - started) * 1000)
+        report[name] = {"matches": len(result), "p50_ms": percentile(samples, 0.5), "p95_ms": percentile(samples, 0.95)}
+    for name, q in {"like_scan_rare": "word300", "like_scan_common": "word0"}.items():
+        samples = []
+        for _ in range(max(repeat // 4, 1)):
+            async with session_maker() as session:
+                started = time.perf_counter()
+                await like_scan(session, q)
+                samples.append((time.perf_counter() - started) * 1000)
+        report[name] = {"p50_ms": percentile(samples, 0.5), "p95_ms": percentile(samples, 0.95)}
+    await engine.dispose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.tasks, args.users, args.repeat)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
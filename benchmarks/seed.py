@@ -0,0 +1,117 @@
+"""
+Seeds a SQLite database with `--users` users of `--tasks` tasks each, as fast as SQLite allows.
+
+Triggers on tasks are dropped while the tasks are inserted, the full text index and the task
+summaries they maintain are then built with one statement each and the triggers are created again.
+All users have the password `PASSWORD`, their emails are `user<id>@example.com`.
+Tasks are `POSITION_STEP` apart in list order, as the application places them; benchmarks that need
+other titles, descriptions or creation times pass `task_values`.
+
+Run with `python -m benchmarks.seed --uri sqlite+aiosqlite:///bench.db [--users N] [--tasks N]`.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from fastapi_users.password import PasswordHelper
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.models.task import SQLITE_SEARCH_DDL
+from app.adapters.sqlalchemy_db.models.task_summary import SQLITE_SUMMARY_DDL
+from app.application.positions import POSITION_STEP
+
+PASSWORD = "benchmark"
+CHUNK_SIZE = 10000
+# tasks are spread over this many days, so per-day statistics have some rows to read
+CREATED_DAYS = 30
+
+
+# column values of the task at an index of the list of a user, replacing the default ones
+TaskValues = Callable[[int, int], dict[str, Any]]
+
+
+def user_email(user_id: int) -> str:
+    return f"user{user_id}@example.com"
+
+
+async def seed_database(
+        uri: str,
+        users: int,
+        tasks_per_user: int,
+        task_values: Optional[TaskValues] = None,
+) -> None:
+    engine = create_async_engine(uri)
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        triggers = (await conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'tasks'"
+        )).scalars().all()
+        for trigger in triggers:
+            await conn.exec_driver_sql(f"DROP TRIGGER {trigger}")
+
+        hashed_password = PasswordHelper().hash(PASSWORD)
+        await conn.execute(insert(models.User), [
+            {"id": user_id, "email": user_email(user_id), "username": f"user{user_id}",
+             "hashed_password": hashed_password, "is_active": True, "is_superuser": False, "is_verified": True}
+            for user_id in range(1, users + 1)
+        ])
+        await conn.execute(insert(models.TaskListVersion), [
+            {"user_id": user_id, "version": 0} for user_id in range(1, users + 1)
+        ])
+        started = datetime.utcnow() - timedelta(days=CREATED_DAYS)
+        step = timedelta(days=CREATED_DAYS) / max(tasks_per_user, 1)
+        for user_id in range(1, users + 1):
+            for start in range(0, tasks_per_user, CHUNK_SIZE):
+                await conn.execute(insert(models.Task), [
+                    {
+                        "title": f"Task {index} of user {user_id}",
+                        "completed": index % 3 == 0,
+                        "createdAt": started + step * index,
+                        "description": f"Description of task {index}",
+                        **(task_values(user_id, index) if task_values is not None else {}),
+                        "position": index * POSITION_STEP,
+                        "user_id": user_id,
+                    }
+                    for index in range(start, min(start + CHUNK_SIZE, tasks_per_user))
+                ])
+
+        await conn.execute(text(
+            "INSERT INTO tasks_fts (rowid, title, description, owner) "
+            "SELECT id, title, description, 'u' || user_id FROM tasks"
+        ))
+        await conn.execute(text(
+            "INSERT INTO task_summaries (user_id, total, completed) "
+            "SELECT user_id, count(*), sum(completed) FROM tasks GROUP BY user_id"
+        ))
+        await conn.execute(text(
+            "INSERT INTO task_daily_summaries (user_id, day, created) "
+            "SELECT user_id, date(\"createdAt\"), count(*) FROM tasks GROUP BY user_id, date(\"createdAt\")"
+        ))
+        for statement in SQLITE_SEARCH_DDL + SQLITE_SUMMARY_DDL:
+            await conn.execute(text(statement))
+        await conn.exec_driver_sql("ANALYZE")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uri", required=True)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=1000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    asyncio.run(seed_database(args.uri, args.users, args.tasks))
+    elapsed = time.perf_counter() - started
+    print(f"Seeded {args.users} users x {args.tasks} tasks in {elapsed:.1f}s "
+          f"({args.users * args.tasks / elapsed:.0f} tasks/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compares the per-task cost of turning fetched rows into a JSON response body.
+
+- `response_model`: `Task.model_validate` per row, then FastAPI's `response_model`
+  handling as in FastAPI 0.115 (validation against `list[TaskResponse]`,
+  conversion to Python objects and `JSONResponse` rendering).
+- `response_model_dump_json`: the same, with the `dump_json` fast path of newer FastAPI
+  versions, when available.
+- `task_json_response`: the rows as `TaskRow` dicts, as the gateway returns them, encoded by
+  `TaskJSONResponse` without building `Task` models.
+
+Run with `python -m benchmarks.serialization [--sizes 10 100 1000 10000] [--repeat N]`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.adapters.sqlalchemy_db import models
+from app.api.serialization import TaskJSONResponse
+from app.application.models import Task, TaskResponse, TaskRow
+from benchmarks.seed import seed_database
+
+
+async def fetch_rows(size: int) -> list:
+    uri = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'serialization.db')}"
+    # titles with non-ASCII characters, which the JSON encoders escape differently
+    await seed_database(uri, 1, size, lambda user_id, index: {"title": f"Task {index} — ünïcode"})
+    engine = create_async_engine(uri)
+    async with engine.connect() as conn:
+        columns = [models.Task.__table__.c[name] for name in TaskRow.__annotations__]
+        rows = (await conn.execute(select(*columns).order_by(models.Task.position))).all()
+    await engine.dispose()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    field = create_model_field(name="Response", type_=list[TaskResponse], mode="serialization")
+
+    def response_model(rows) -> bytes:
+        tasks = [Task.model_validate(row) for row in rows]
+        value, errors = field.validate(tasks, {}, loc=("response",))
+        assert not errors
+        return JSONResponse(field.serialize(value)).body
+
+    def response_model_dump_json(rows) -> bytes:
+        tasks = [Task.model_validate(row) for row in rows]
+        value, errors = field.validate(tasks, {}, loc=("response",))
+        assert not errors
+        return field.serialize_json(value)
+
+    def task_json_response(rows) -> bytes:
+        return TaskJSONResponse([TaskRow(**row._mapping) for row in rows]).body
+
+    paths = {"response_model": response_model, "task_json_response": task_json_response}
+    if hasattr(field, "serialize_json"):
+        paths["response_model_dump_json"] = response_model_dump_json
+
+    report = {}
+    for size in args.sizes:
+        rows = asyncio.run(fetch_rows(size))
+        bodies = {name: encode(rows) for name, encode in paths.items()}
+        assert len({body for body in bodies.values()}) == 1, "paths render different bodies"
+        result = {}
+        for name, encode in paths.items():
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                encode(rows)
+            elapsed = time.perf_counter() - started
+            result[f"{name}_us_per_task"] = round(elapsed / args.repeat / size * 1e6, 3)
+        result["speedup"] = round(result["response_model_us_per_task"] / result["task_json_response_us_per_task"], 2)
+        report[size] = result
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
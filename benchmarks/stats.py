@@ -0,0 +1,70 @@
+"""
+Compares GET /tasks/stats reads from the maintained summaries with counting the tasks of the user.
+
+Run with `python -m benchmarks.stats [--sizes 1000 10000 100000] [--repeat N]`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway
+from benchmarks.seed import seed_database, CREATED_DAYS
+
+USER_ID = 1
+# the seeded tasks were created over the last CREATED_DAYS days, the stats cover all of them
+SINCE = date.today() - timedelta(days=CREATED_DAYS)
+
+
+async def count_tasks(session) -> tuple:
+    query = select(func.count(), func.sum(case((models.Task.completed, 1), else_=0))).where(
+        models.Task.user_id == USER_ID,
+    )
+    totals = (await session.execute(query)).one()
+    day = func.date(models.Task.createdAt)
+    query = (
+        select(day, func.count())
+        .where(models.Task.user_id == USER_ID, models.Task.createdAt >= SINCE)
+        .group_by(day)
+    )
+    return totals, (await session.execute(query)).all()
+
+
+async def measure(size: int, repeat: int) -> dict:
+    uri = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'stats.db')}"
+    await seed_database(uri, 1, size)
+    engine = create_async_engine(uri)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    result = {}
+    for name, read in {
+        "summaries": lambda session: SqlaGateway(session).get_task_stats(USER_ID, SINCE),
+        "count_tasks": count_tasks,
+    }.items():
+        async with session_maker() as session:
+            await read(session)
+            started = time.perf_counter()
+            for _ in range(repeat):
+                await read(session)
+            result[f"{name}_ms"] = round((time.perf_counter() - started) / repeat * 1000, 2)
+    await engine.dispose()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps({size: asyncio.run(measure(size, args.repeat)) for size in args.sizes}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Measures title edit bursts with and without the title write-behind queue.
+
+Every client renames its tasks `--edits` times in a row, as inline editing does while typing.
+Reports requests per second, SQL statements and commits per request and the write-behind stats.
+
+Run with `python -m benchmarks.write_behind [--clients N] [--tasks N] [--edits N]`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.main import create_app
+from app.main.config import DatabaseConfig, SqliteConfig
+from benchmarks.load_test import create_schema
+
+PASSWORD = "write-behind"
+
+counters = Counter()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    if not statement.lstrip().upper().startswith("PRAGMA"):
+        counters["statements"] += 1
+
+
+@event.listens_for(Engine, "commit")
+def count_commit(conn) -> None:
+    counters["commits"] += 1
+
+
+async def client_session(app, index: int, tasks: int) -> tuple[httpx.AsyncClient, list[int]]:
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://write-behind")
+    email = f"editor-{index}@example.com"
+    await client.post("/auth/register", json={"email": email, "password": PASSWORD, "username": email})
+    await client.post("/auth/jwt/login", data={"username": email, "password": PASSWORD})
+    response = await client.post("/tasks/batch", json={"tasks": [{"title": f"Task {i}"} for i in range(tasks)]})
+    return client, [item["id"] for item in response.json()["results"]]
+
+
+async def edit(client: httpx.AsyncClient, task_ids: list[int], edits: int) -> None:
+    for task_id in task_ids:
+        for step in range(edits):
+            response = await client.patch(f"/tasks/{task_id}/title", json={"title": f"Task {task_id}"[:step + 1]})
+            assert response.status_code in (200, 202), response.text
+
+
+async def measure(enabled: bool, clients: int, tasks: int, edits: int) -> dict:
+    os.environ["TASK_TITLE_WRITE_BEHIND_ENABLED"] = "true" if enabled else "false"
+    config = DatabaseConfig(uri=f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'titles.db')}",
+                            sqlite=SqliteConfig())
+    await create_schema(config.uri)
+    app = create_app(config)
+    async with app.router.lifespan_context(app):
+        sessions = [await client_session(app, index, tasks) for index in range(clients)]
+        counters.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(edit(client, task_ids, edits) for client, task_ids in sessions))
+        elapsed = time.perf_counter() - started
+        if app.state.title_write_behind is not None:
+            await app.state.title_write_behind.flush()
+        requests = clients * tasks * edits
+        report = {
+            "requests_per_sec": round(requests / elapsed, 1),
+            "statements_per_request": round(counters["statements"] / requests, 3),
+            "commits_per_request": round(counters["commits"] / requests, 3),
+        }
+        if app.state.title_write_behind is not None:
+            report["write_behind"] = app.state.title_write_behind.stats().model_dump()
+        for client, _ in sessions:
+            await client.aclose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--tasks", type=int, default=5)
+    parser.add_argument("--edits", type=int, default=10)
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "write_through": asyncio.run(measure(False, args.clients, args.tasks, args.edits)),
+        "write_behind": asyncio.run(measure(True, args.clients, args.tasks, args.edits)),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
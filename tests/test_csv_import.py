@@ -0,0 +1,64 @@
+from typing import AsyncIterator
+
+from sqlalchemy import select
+
+from app.adapters.events.memory import InMemoryTaskEventBroker
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway, SqlaGatewayFactory
+from app.application.export import TaskFileFormat
+from app.application.models import TaskCreate
+from app.application.task import export_tasks, import_tasks
+
+
+async def chunked(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def import_csv(session_maker, user_id: int, data: bytes):
+    broker = InMemoryTaskEventBroker(queue_size=10, history_size=10, max_users=10)
+    async with session_maker() as session:
+        return await import_tasks(
+            user_id, chunked(data, 7), TaskFileFormat.CSV, 100, SqlaGateway(session), session, broker,
+        )
+
+
+async def read_tasks(session_maker, user_id: int) -> list[tuple[str, bool, str]]:
+    async with session_maker() as session:
+        query = (
+            select(models.Task.title, models.Task.completed, models.Task.description)
+            .where(models.Task.user_id == user_id)
+            .order_by(models.Task.position)
+        )
+        return [tuple(row) for row in await session.execute(query)]
+
+
+async def test_exported_csv_imports_back(session_maker) -> None:
+    tasks = [
+        TaskCreate(title="Plain", completed=True),
+        TaskCreate(title='Quoted "title"', description="First line\nsecond, with a comma\n\nand a blank line"),
+    ]
+    async with session_maker.begin() as session:
+        await SqlaGateway(session).add_tasks(1, tasks)
+    exported = b"".join([
+        chunk async for chunk in export_tasks(1, TaskFileFormat.CSV, SqlaGatewayFactory(session_maker))
+    ])
+
+    summary = await import_csv(session_maker, 2, exported)
+
+    assert (summary.imported, summary.failed) == (2, 0)
+    assert await read_tasks(session_maker, 2) == [(task.title, task.completed, task.description) for task in tasks]
+
+
+async def test_empty_csv_values_take_defaults(session_maker) -> None:
+    summary = await import_csv(session_maker, 1, b"title,completed,description\nFirst,,\nSecond,true,\n")
+
+    assert (summary.imported, summary.failed) == (2, 0)
+    assert await read_tasks(session_maker, 1) == [("First", False, ""), ("Second", True, "")]
+
+
+async def test_unterminated_quote_is_reported_at_record_start(session_maker) -> None:
+    summary = await import_csv(session_maker, 1, b'title,description\nFirst,"open\nstill open\n')
+
+    assert summary.imported == 0
+    assert [(error.line, error.detail) for error in summary.errors] == [(2, "Unterminated quoted value")]
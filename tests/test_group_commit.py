@@ -0,0 +1,143 @@
+import asyncio
+from typing import AsyncIterator
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway
+from app.adapters.sqlalchemy_db.group_commit import GroupCommitWriter, GroupCommitGateway
+from app.application.exceptions import TaskNotFoundError
+from app.application.models import TaskCreate
+
+USER_ID = 1
+OTHER_USER_ID = 2
+
+
+@pytest.fixture
+async def writer(engine) -> AsyncIterator[GroupCommitWriter]:
+    writer = GroupCommitWriter(engine, window_seconds=0.002, max_batch=256)
+    running = asyncio.create_task(writer.run())
+    await asyncio.sleep(0)
+    yield writer
+    await writer.stop()
+    await running
+
+
+async def read_titles(session_maker, user_id: int) -> list[str]:
+    async with session_maker() as session:
+        return [task["title"] for task in await SqlaGateway(session).get_tasks(user_id, 0, 100)]
+
+
+async def test_concurrent_writes_share_a_transaction_with_a_version_each(session_maker, writer) -> None:
+    writes = [(user_id, f"Task {index}") for index in range(5) for user_id in (USER_ID, OTHER_USER_ID)]
+
+    results = await asyncio.gather(*(
+        writer.add_task(user_id, TaskCreate(title=title)) for user_id, title in writes
+    ))
+
+    assert [new_task.title for new_task, _ in results] == [title for _, title in writes]
+    assert len({new_task.id for new_task, _ in results}) == len(writes)
+    for user_id in (USER_ID, OTHER_USER_ID):
+        versions = [version for (write_user_id, _), (_, version) in zip(writes, results) if write_user_id == user_id]
+        assert versions == [1, 2, 3, 4, 5]
+    assert writer.stats().transactions == 1
+    assert writer.stats().writes == len(writes)
+
+    # the next transaction continues the versions
+    _, version = await writer.add_task(USER_ID, TaskCreate(title="Later"))
+    assert version == 6
+    async with session_maker() as session:
+        assert await SqlaGateway(session).get_list_version(USER_ID) == 6
+        assert await SqlaGateway(session).get_list_version(OTHER_USER_ID) == 5
+
+
+async def test_failing_write_is_retried_alone_and_fails_only_itself(session_maker, writer) -> None:
+    async def failing(database: SqlaGateway) -> None:
+        await database.add_task(USER_ID, TaskCreate(title="Rolled back"))
+        raise RuntimeError("Write failed")
+
+    results = await asyncio.gather(
+        writer.add_task(USER_ID, TaskCreate(title="First")),
+        writer.submit(USER_ID, failing),
+        writer.add_task(OTHER_USER_ID, TaskCreate(title="Second")),
+        return_exceptions=True,
+    )
+
+    first, failed, second = results
+    assert isinstance(failed, RuntimeError)
+    assert (first[0].title, first[1]) == ("First", 1)
+    assert (second[0].title, second[1]) == ("Second", 1)
+    # the shared transaction failed, then every write got a transaction of its own
+    assert writer.stats().failed_transactions == 2
+    assert writer.stats().transactions == 2
+    assert await read_titles(session_maker, USER_ID) == ["First"]
+    assert await read_titles(session_maker, OTHER_USER_ID) == ["Second"]
+
+
+async def test_database_error_fails_its_write_without_a_retry(session_maker, writer) -> None:
+    async def missing(database: SqlaGateway) -> None:
+        raise TaskNotFoundError(100)
+
+    results = await asyncio.gather(
+        writer.add_task(USER_ID, TaskCreate(title="First")),
+        writer.submit(USER_ID, missing),
+        writer.add_task(USER_ID, TaskCreate(title="Second")),
+        return_exceptions=True,
+    )
+
+    first, failed, second = results
+    assert isinstance(failed, TaskNotFoundError)
+    assert [(new_task.title, version) for new_task, version in (first, second)] == [("First", 1), ("Second", 2)]
+    assert writer.stats().transactions == 1
+    assert writer.stats().failed_transactions == 0
+    assert await read_titles(session_maker, USER_ID) == ["First", "Second"]
+
+
+async def test_reads_after_a_grouped_write_go_to_the_primary(tmp_path, session_maker, writer) -> None:
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    async with replica.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    try:
+        async with session_maker() as session, async_sessionmaker(replica)() as read_session:
+            gateway = GroupCommitGateway(SqlaGateway(session, read_session), writer)
+            new_task = await gateway.add_task(USER_ID, TaskCreate(title="New"))
+
+            assert [task["id"] for task in await gateway.get_tasks(USER_ID, 0, 10)] == [new_task.id]
+    finally:
+        await replica.dispose()
+
+
+async def test_writer_reconnects_and_gateway_falls_back_meanwhile(tmp_path, session_maker) -> None:
+    # the database of the writer cannot be opened until its directory exists
+    path = tmp_path / "later" / "writer.db"
+    writer_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    writer = GroupCommitWriter(writer_engine, window_seconds=0.002, max_batch=256, reconnect_seconds=0.01)
+    running = asyncio.create_task(writer.run())
+    try:
+        await asyncio.sleep(0.05)
+        assert not writer.available
+        assert writer.stats().reconnects > 0
+
+        async with session_maker() as session:
+            gateway = GroupCommitGateway(SqlaGateway(session), writer)
+            fallback_task = await gateway.add_task(USER_ID, TaskCreate(title="Direct"))
+            assert await gateway.bump_list_version(USER_ID) == 1
+            await session.commit()
+        assert fallback_task.title == "Direct"
+
+        queued = asyncio.create_task(writer.add_task(USER_ID, TaskCreate(title="Queued")))
+        prepared = tmp_path / "prepared"
+        prepared.mkdir()
+        prepared_engine = create_async_engine(f"sqlite+aiosqlite:///{prepared / path.name}")
+        async with prepared_engine.begin() as conn:
+            await conn.run_sync(models.Base.metadata.create_all)
+        await prepared_engine.dispose()
+        prepared.rename(path.parent)
+        queued_task, version = await asyncio.wait_for(queued, 1)
+        assert (queued_task.title, version) == ("Queued", 1)
+        assert writer.available
+    finally:
+        await writer.stop()
+        await running
+        await writer_engine.dispose()
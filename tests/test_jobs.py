@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.jobs import SqlaJobQueue, SqlaJobStore, FAILED
+
+MAX_ATTEMPTS = 3
+LEASE_SECONDS = 60
+
+
+async def test_job_whose_lease_expires_on_the_last_attempt_fails(session_maker) -> None:
+    async with session_maker.begin() as session:
+        await SqlaJobQueue(session).enqueue("hangs", {})
+    store = SqlaJobStore(session_maker)
+
+    now = datetime.utcnow()
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        # the worker dies without storing an outcome, the job is due again once its lease ends
+        jobs = await store.claim(now, 10, LEASE_SECONDS, MAX_ATTEMPTS)
+        assert [job.attempts for job in jobs] == [attempt]
+        now += timedelta(seconds=LEASE_SECONDS + 1)
+
+    assert await store.claim(now, 10, LEASE_SECONDS, MAX_ATTEMPTS) == []
+    async with session_maker() as session:
+        status, attempts, error = (await session.execute(
+            select(models.Job.status, models.Job.attempts, models.Job.last_error)
+        )).one()
+    assert (status, attempts) == (FAILED, MAX_ATTEMPTS)
+    assert "lease expired" in error.lower()
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import insert, select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters.events.memory import InMemoryTaskEventBroker
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway
+from app.adapters.sqlalchemy_db.jobs import SqlaJobQueue
+from app.application.models import MoveTaskRequest, TaskEventType
+from app.application.task import move_task
+
+USER_ID = 1
+
+
+async def add_tasks(session_maker: async_sessionmaker[AsyncSession], positions: list[int]) -> list[int]:
+    async with session_maker.begin() as session:
+        result = await session.execute(insert(models.Task).returning(models.Task.id), [
+            {"title": f"Task {position}", "completed": False, "position": position, "description": "",
+             "user_id": USER_ID}
+            for position in positions
+        ])
+        return sorted(result.scalars())
+
+
+async def move(session_maker: async_sessionmaker[AsyncSession], broker: InMemoryTaskEventBroker, task_id: int,
+               after_id: int) -> None:
+    async with session_maker() as session:
+        await move_task(
+            USER_ID, task_id, MoveTaskRequest(after_id=after_id), SqlaGateway(session), session, broker,
+            SqlaJobQueue(session),
+        )
+
+
+async def queued_jobs(session_maker: async_sessionmaker[AsyncSession]) -> int:
+    async with session_maker() as session:
+        return (await session.execute(select(func.count()).select_from(models.Job))).scalar()
+
+
+@pytest.fixture
+def broker() -> InMemoryTaskEventBroker:
+    return InMemoryTaskEventBroker(queue_size=10, history_size=10, max_users=10)
+
+
+async def test_tight_moves_queue_one_rebalance(session_maker, broker) -> None:
+    first, second, third, fourth, fifth = await add_tasks(session_maker, [0, 3, 6, 9, 12])
+
+    await move(session_maker, broker, fourth, after_id=first)
+    await move(session_maker, broker, fifth, after_id=second)
+
+    assert await queued_jobs(session_maker) == 1
+
+
+async def test_move_without_gap_rebalances_inline(session_maker, broker) -> None:
+    first, second, third = await add_tasks(session_maker, [0, 1, 2])
+
+    async with broker.subscribe(USER_ID) as subscription:
+        await move(session_maker, broker, third, after_id=first)
+        event = await subscription.next_event(1)
+
+    async with session_maker() as session:
+        query = select(models.Task.id).order_by(models.Task.position)
+        assert list((await session.execute(query)).scalars()) == [first, third, second]
+    assert event.type == TaskEventType.RESET
+    assert await queued_jobs(session_maker) == 0
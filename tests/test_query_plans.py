@@ -0,0 +1,153 @@
+"""
+Every SqlaGateway query is served by an index on SQLite and no gateway method emits
+more statements than it should.
+
+Each gateway method is called against a seeded database, the emitted statements are
+captured and re-run under `EXPLAIN QUERY PLAN`. A full table scan or a temporary B-tree
+for ordering fails the check, as does a method emitting more statements than listed
+in `MAX_STATEMENTS`.
+"""
+from datetime import datetime, date
+from typing import Callable, Awaitable, Any
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway
+from app.application.models import TaskCreate, TaskCursor, TaskTitleUpdate, TaskUpdate, ReorderRequest, ReorderTask, \
+    TaskPatch, TaskFilter, TaskSort
+
+USER_ID = 1
+TASKS = 1000
+BAD_PLAN_MARKERS = ("USE TEMP B-TREE",)
+# Mutations are single statements with RETURNING, add_tasks also reads the last position
+MAX_STATEMENTS = {
+    "add_tasks": 2, "get_task_stats": 2, "reconcile_task_stats": 8, "spread_positions": 2,
+    "spread_positions_descending": 2,
+}
+# Temporary B-trees bounded by a small set of rows: search matches are ordered after the full text lookup,
+# reconciliation groups the tasks of a batch of users by day
+TEMP_BTREE_ALLOWED = {
+    "get_tasks_search": "USE TEMP B-TREE FOR ORDER BY",
+    "reconcile_task_stats": "USE TEMP B-TREE FOR GROUP BY",
+}
+# Users with a single task each, so that per-user tables are not small enough for SQLite to prefer scans
+EXTRA_USERS = 200
+
+SCENARIOS: dict[str, Callable[[SqlaGateway], Awaitable[Any]]] = {
+    "add_task": lambda gateway: gateway.add_task(USER_ID, TaskCreate(title="New task")),
+    "add_tasks": lambda gateway: gateway.add_tasks(USER_ID, [TaskCreate(title="First"), TaskCreate(title="Second")]),
+    "get_tasks": lambda gateway: gateway.get_tasks(USER_ID, 10, 10),
+    "get_tasks_after": lambda gateway: gateway.get_tasks_after(USER_ID, TaskCursor(position=10, id=11), 10),
+    "get_tasks_after_fields": lambda gateway: gateway.get_tasks_after(
+        USER_ID, TaskCursor(position=10, id=11), 10, ("id", "title", "completed"),
+    ),
+    "get_tasks_completed": lambda gateway: gateway.get_tasks(USER_ID, 0, 10, filters=TaskFilter(completed=True)),
+    "get_tasks_created_range": lambda gateway: gateway.get_tasks(USER_ID, 0, 10, filters=TaskFilter(
+        created_after=datetime(2024, 1, 1), created_before=datetime(2030, 1, 1), sort=TaskSort.CREATED_AT_DESC,
+    )),
+    "get_tasks_search": lambda gateway: gateway.get_tasks(USER_ID, 0, 10, filters=TaskFilter(q="task 42")),
+    "get_task": lambda gateway: gateway.get_task(USER_ID, 11),
+    "update_task_title_by_id": lambda gateway: gateway.update_task_title_by_id(
+        USER_ID, 3, TaskTitleUpdate(title="Renamed"),
+    ),
+    "update_task_by_id": lambda gateway: gateway.update_task_by_id(
+        USER_ID, 5, TaskUpdate(title="Updated", completed=True),
+    ),
+    "update_tasks": lambda gateway: gateway.update_tasks(
+        USER_ID, [TaskPatch(id=15, completed=True), TaskPatch(id=17, title="Patched")],
+    ),
+    "reorder_tasks": lambda gateway: gateway.reorder_tasks(
+        USER_ID, ReorderRequest(tasks=[ReorderTask(id=7, position=4), ReorderTask(id=9, position=3)]),
+    ),
+    "get_task_cursors": lambda gateway: gateway.get_task_cursors(USER_ID, [11, 13]),
+    "get_next_position": lambda gateway: gateway.get_next_position(USER_ID, TaskCursor(position=5, id=11), 13),
+    "get_previous_position": lambda gateway: gateway.get_previous_position(
+        USER_ID, TaskCursor(position=5, id=11), 13,
+    ),
+    "set_task_position": lambda gateway: gateway.set_task_position(USER_ID, 13, 7),
+    "rebalance_positions": lambda gateway: gateway.rebalance_positions(USER_ID),
+    "has_crowded_positions": lambda gateway: gateway.has_crowded_positions(USER_ID),
+    "get_position_range": lambda gateway: gateway.get_position_range(USER_ID),
+    "spread_positions": lambda gateway: gateway.spread_positions(USER_ID, 100, 100),
+    "spread_positions_descending": lambda gateway: gateway.spread_positions(USER_ID, 400, 100, descending=True),
+    "get_list_version": lambda gateway: gateway.get_list_version(USER_ID),
+    "bump_list_version": lambda gateway: gateway.bump_list_version(USER_ID),
+    "get_task_stats": lambda gateway: gateway.get_task_stats(USER_ID, date(2024, 1, 1)),
+    "get_user_ids": lambda gateway: gateway.get_user_ids(0, 100),
+    "reconcile_task_stats": lambda gateway: gateway.reconcile_task_stats([USER_ID, USER_ID + 1]),
+    "delete_task_by_id": lambda gateway: gateway.delete_task_by_id(USER_ID, 1),
+    "delete_tasks": lambda gateway: gateway.delete_tasks(USER_ID, [19, 21]),
+    "restore_task_by_id": lambda gateway: gateway.restore_task_by_id(USER_ID, 1),
+    "purge_deleted_tasks": lambda gateway: gateway.purge_deleted_tasks(datetime.utcnow(), 100),
+}
+
+
+def is_bad_plan(name: str, detail: str) -> bool:
+    words = detail.split()
+    if words[0] == "SCAN" and words[1] in models.Base.metadata.tables and "USING" not in words:
+        return True
+    if TEMP_BTREE_ALLOWED.get(name) == detail:
+        return False
+    return any(marker in detail for marker in BAD_PLAN_MARKERS)
+
+
+@pytest.fixture
+async def seeded(engine: AsyncEngine) -> AsyncEngine:
+    async with engine.begin() as conn:
+        await conn.execute(insert(models.User), [
+            {"id": user_id, "email": f"user{user_id}@example.com", "username": f"user{user_id}", "hashed_password": ""}
+            for user_id in range(USER_ID, USER_ID + 2 + EXTRA_USERS)
+        ])
+        now = datetime.utcnow()
+        await conn.execute(insert(models.Task), [
+            {
+                "title": f"Task {i}",
+                "completed": False,
+                "createdAt": now,
+                "position": i // 2,
+                "description": "",
+                "user_id": USER_ID + i % 2,
+            }
+            for i in range(TASKS)
+        ])
+        await conn.execute(insert(models.Task), [
+            {
+                "title": f"Task of user {user_id}",
+                "completed": False,
+                "createdAt": now,
+                "position": 0,
+                "description": "",
+                "user_id": user_id,
+            }
+            for user_id in range(USER_ID + 2, USER_ID + 2 + EXTRA_USERS)
+        ])
+        await conn.execute(insert(models.TaskListVersion), [{"user_id": USER_ID, "version": 0}])
+        await conn.exec_driver_sql("ANALYZE")
+    return engine
+
+
+@pytest.mark.parametrize("name", SCENARIOS)
+async def test_query_plan(
+        name: str,
+        seeded: AsyncEngine,
+        session_maker: async_sessionmaker[AsyncSession],
+        statements: list[tuple[str, object]],
+) -> None:
+    statements.clear()
+    async with session_maker() as session:
+        await SCENARIOS[name](SqlaGateway(session))
+        await session.commit()
+        executed = list(statements)
+        assert len(executed) <= MAX_STATEMENTS.get(name, 1), [" ".join(statement.split()) for statement, _ in executed]
+
+        connection = await session.connection()
+        for statement, parameters in executed:
+            if isinstance(parameters, list):
+                parameters = parameters[0]
+            plan = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            details = [row[-1] for row in plan]
+            bad = [detail for detail in details if is_bad_plan(name, detail)]
+            assert not bad, f"{' '.join(statement.split())}: {bad}"
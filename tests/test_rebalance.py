@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters.events.memory import InMemoryTaskEventBroker
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import SqlaGatewayFactory
+from app.application.models import TaskEventType
+from app.application.positions import POSITION_STEP, spread_passes
+from app.application.task import rebalance_task_positions, purge_deleted_tasks
+
+USER_ID = 1
+
+
+@pytest.fixture
+def broker() -> InMemoryTaskEventBroker:
+    return InMemoryTaskEventBroker(queue_size=10, history_size=10, max_users=10)
+
+
+async def add_tasks(session_maker: async_sessionmaker[AsyncSession], positions: list[int]) -> list[int]:
+    async with session_maker.begin() as session:
+        result = await session.execute(insert(models.Task).returning(models.Task.id), [
+            {"title": f"Task {index}", "completed": False, "position": position, "description": "",
+             "user_id": USER_ID}
+            for index, position in enumerate(positions)
+        ])
+        await session.execute(insert(models.TaskListVersion).values(user_id=USER_ID, version=0))
+        return sorted(result.scalars())
+
+
+async def read_list(session_maker: async_sessionmaker[AsyncSession]) -> tuple[list[tuple[int, int]], int]:
+    async with session_maker() as session:
+        query = (
+            select(models.Task.id, models.Task.position)
+            .where(models.Task.user_id == USER_ID, models.Task.deleted_at.is_(None))
+            .order_by(models.Task.position, models.Task.id)
+        )
+        tasks = [tuple(row) for row in await session.execute(query)]
+        version = (await session.execute(select(models.TaskListVersion.version))).scalar_one()
+    return tasks, version
+
+
+async def test_crowded_list_is_spread_out_in_batches(session_maker, broker) -> None:
+    task_ids = await add_tasks(session_maker, [0, 1, 1, 2, POSITION_STEP, 5 * POSITION_STEP])
+
+    assert await rebalance_task_positions(USER_ID, SqlaGatewayFactory(session_maker), broker, batch_size=4)
+
+    tasks, version = await read_list(session_maker)
+    assert [task_id for task_id, _ in tasks] == task_ids
+    positions = [position for _, position in tasks]
+    assert [upper - lower for lower, upper in zip(positions, positions[1:])] == [POSITION_STEP] * 5
+    assert version == 2
+    assert [event.type for event in broker.replay(USER_ID, 0)] == [TaskEventType.RESET] * 2
+
+
+@pytest.mark.parametrize("positions", [
+    [-3, 0, 1, 1, 2, 3, 7],
+    [10 * POSITION_STEP, 10 * POSITION_STEP + 1, 11 * POSITION_STEP, 12 * POSITION_STEP],
+    [0, 1, 20 * POSITION_STEP],
+], ids=["above the end", "down to the start", "above the end, then down to the start"])
+async def test_list_keeps_its_order_between_batches(session_maker, positions) -> None:
+    task_ids = await add_tasks(session_maker, positions)
+    gateway_factory = SqlaGatewayFactory(session_maker)
+
+    async with gateway_factory() as database:
+        passes = spread_passes(*await database.get_position_range(USER_ID))
+    for bound, descending in passes:
+        while True:
+            async with gateway_factory() as database:
+                moved = await database.spread_positions(USER_ID, bound, 2, descending)
+            tasks, _ = await read_list(session_maker)
+            assert [task_id for task_id, _ in tasks] == task_ids
+            if len(moved) < 2:
+                break
+            bound = moved[-1]
+
+    async with gateway_factory() as database:
+        assert not await database.has_crowded_positions(USER_ID)
+
+
+async def test_positions_stay_bounded_over_many_rebalances(session_maker, broker) -> None:
+    count = 40
+    order = await add_tasks(session_maker, [POSITION_STEP * index for index in range(count)])
+    gateway_factory = SqlaGatewayFactory(session_maker)
+
+    for round_ in range(60):
+        tasks, _ = await read_list(session_maker)
+        positions = dict(tasks)
+        async with session_maker.begin() as session:
+            # moves to the start of the list push the lowest position down, one step each
+            for _ in range(round_ % 3):
+                lowest = positions[order[0]]
+                order.insert(0, order.pop())
+                positions[order[0]] = lowest - POSITION_STEP
+            # a move right after a neighbour takes the last free position next to it
+            crowded = order[1 + round_ % (count - 2)]
+            positions[crowded] = positions[order[order.index(crowded) - 1]] + 1
+            await session.execute(
+                models.Task.__table__.update()
+                .where(models.Task.id == bindparam("task_id"))
+                .values(position=bindparam("position")),
+                [{"task_id": task_id, "position": position} for task_id, position in positions.items()],
+            )
+
+        assert await rebalance_task_positions(USER_ID, gateway_factory, broker, batch_size=7)
+
+        tasks, _ = await read_list(session_maker)
+        assert [task_id for task_id, _ in tasks] == order
+        positions = [position for _, position in tasks]
+        assert {upper - lower for lower, upper in zip(positions, positions[1:])} == {POSITION_STEP}
+        assert 0 <= positions[0] and positions[-1] <= 2 * count * POSITION_STEP
+
+
+async def test_list_with_free_positions_is_not_touched(session_maker, broker) -> None:
+    await add_tasks(session_maker, [0, 2, POSITION_STEP])
+    before = await read_list(session_maker)
+
+    assert not await rebalance_task_positions(USER_ID, SqlaGatewayFactory(session_maker), broker)
+
+    assert await read_list(session_maker) == before
+    assert broker.replay(USER_ID, 0) is None
+
+
+async def test_purge_leaves_live_tasks_and_the_version_alone(session_maker) -> None:
+    first, deleted, last = await add_tasks(session_maker, [0, 1, 2])
+    async with session_maker.begin() as session:
+        await session.execute(
+            models.Task.__table__.update()
+            .where(models.Task.id == deleted)
+            .values(deleted_at=datetime.utcnow() - timedelta(days=2))
+        )
+
+    assert await purge_deleted_tasks(SqlaGatewayFactory(session_maker), retention_seconds=86400) == 1
+
+    assert await read_list(session_maker) == ([(first, 0), (last, 2)], 0)
+    async with session_maker() as session:
+        assert (await session.get(models.Task, deleted)) is None
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import insert, update, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway
+
+USER_ID = 1
+
+
+@pytest.fixture
+async def drifted(session_maker) -> None:
+    async with session_maker.begin() as session:
+        await session.execute(insert(models.Task), [
+            {"title": f"Task {index}", "completed": index == 0, "position": index, "description": "",
+             "user_id": USER_ID}
+            for index in range(3)
+        ])
+        await session.execute(
+            update(models.TaskSummary).where(models.TaskSummary.user_id == USER_ID).values(total=10, completed=5),
+        )
+
+
+async def test_drifted_counters_are_repaired(session_maker, drifted) -> None:
+    async with session_maker.begin() as session:
+        assert await SqlaGateway(session).reconcile_task_stats([USER_ID]) == [USER_ID]
+
+    async with session_maker() as session:
+        query = select(models.TaskSummary.total, models.TaskSummary.completed)
+        assert (await session.execute(query)).one() == (3, 1)
+
+
+async def test_task_writes_wait_for_the_recount(engine, session_maker, statements) -> None:
+    async with session_maker.begin() as session:
+        await session.execute(insert(models.Task).values(
+            title="Task", completed=False, position=0, description="", user_id=USER_ID,
+        ))
+    # no wait on the lock, a concurrent write fails right away while the recount is not committed
+    other = create_async_engine(engine.url, connect_args={"timeout": 0})
+    try:
+        async with session_maker() as session:
+            statements.clear()
+            # nothing drifted, the lock is still taken before the tasks are counted
+            assert await SqlaGateway(session).reconcile_task_stats([USER_ID]) == []
+            assert statements[0][0].split()[:2] == ["UPDATE", "task_summaries"]
+            async with other.begin() as conn:
+                with pytest.raises(OperationalError, match="database is locked"):
+                    await conn.execute(insert(models.Task).values(
+                        title="Concurrent", completed=False, position=1, description="", user_id=USER_ID,
+                    ))
+    finally:
+        await other.dispose()
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import insert, select
+
+from app.adapters.events.memory import InMemoryTaskEventBroker
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway
+from app.application.exceptions import MissingTasksError
+from app.application.models import ReorderRequest, ReorderTask
+from app.application.task import tasks_reorder
+
+USER_ID = 1
+
+
+@pytest.fixture
+def broker() -> InMemoryTaskEventBroker:
+    return InMemoryTaskEventBroker(queue_size=10, history_size=10, max_users=10)
+
+
+@pytest.fixture
+async def task_ids(session_maker) -> list[int]:
+    async with session_maker.begin() as session:
+        result = await session.execute(insert(models.Task).returning(models.Task.id), [
+            {"title": f"Task {index}", "completed": False, "position": index, "description": "", "user_id": USER_ID}
+            for index in range(3)
+        ])
+        await session.execute(insert(models.TaskListVersion).values(user_id=USER_ID, version=0))
+        return sorted(result.scalars())
+
+
+async def read_positions(session_maker) -> tuple[dict[int, int], int]:
+    async with session_maker() as session:
+        positions = dict((await session.execute(select(models.Task.id, models.Task.position))).all())
+        version = await SqlaGateway(session).get_list_version(USER_ID)
+    return positions, version
+
+
+async def test_reorder_is_one_statement_and_a_version_bump(session_maker, statements, broker, task_ids) -> None:
+    first, second, third = task_ids
+    reorder = ReorderRequest(tasks=[ReorderTask(id=first, position=2), ReorderTask(id=third, position=0)])
+
+    statements.clear()
+    async with session_maker() as session:
+        await tasks_reorder(USER_ID, reorder, SqlaGateway(session), session, broker)
+
+    tables = [statement.split()[1].strip('"') for statement, _ in statements]
+    assert tables == ["tasks", "task_list_versions"]
+    assert await read_positions(session_maker) == ({first: 2, second: 1, third: 0}, 1)
+
+
+async def test_reorder_with_missing_task_writes_nothing(session_maker, broker, task_ids) -> None:
+    first, second, third = task_ids
+    reorder = ReorderRequest(tasks=[ReorderTask(id=first, position=5), ReorderTask(id=third + 100, position=0)])
+
+    async with session_maker() as session:
+        with pytest.raises(MissingTasksError):
+            await tasks_reorder(USER_ID, reorder, SqlaGateway(session), session, broker)
+
+    assert await read_positions(session_maker) == ({first: 0, second: 1, third: 2}, 0)
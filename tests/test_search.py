@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import insert, select
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.search import task_search_condition
+
+USER_ID = 1
+
+
+@pytest.fixture
+async def tasks(session_maker) -> None:
+    async with session_maker.begin() as session:
+        await session.execute(insert(models.Task), [
+            {"title": title, "completed": False, "position": index, "description": description, "user_id": USER_ID}
+            for index, (title, description) in enumerate([
+                ("Art class", ""),
+                ("Call the artist", "about the mural"),
+                ("Start", "the engine"),
+                ("Groceries", "milk, (bread) and eggs"),
+            ])
+        ])
+
+
+@pytest.mark.parametrize("dialect", ["sqlite", "default"], ids=["fts5", "fallback"])
+@pytest.mark.parametrize(("q", "titles"), [
+    ("art", ["Art class", "Call the artist"]),
+    ("ART cl", ["Art class"]),
+    ("tar", []),
+    ("mural", ["Call the artist"]),
+    ("milk eg", ["Groceries"]),
+    ('"art" OR', []),
+    ("art*", ["Art class", "Call the artist"]),
+])
+async def test_words_of_q_match_starts_of_words(session_maker, tasks, dialect, q, titles) -> None:
+    async with session_maker() as session:
+        query = (
+            select(models.Task.title)
+            .where(models.Task.user_id == USER_ID, task_search_condition(dialect, USER_ID, q))
+            .order_by(models.Task.position)
+        )
+        assert list((await session.execute(query)).scalars()) == titles
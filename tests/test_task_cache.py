@@ -0,0 +1,40 @@
+from sqlalchemy import insert
+
+from app.adapters.cache.gateway import CachedGateway
+from app.adapters.cache.lru import LRUTaskListCache
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import SqlaGateway
+from app.application.models import TaskTitleUpdate
+
+USER_ID = 1
+
+
+async def read_titles(session_maker, cache: LRUTaskListCache) -> tuple[int, list[str]]:
+    # the order of the list endpoint: the version for the ETag first, then the page
+    async with session_maker() as session:
+        gateway = CachedGateway(SqlaGateway(session), cache)
+        version = await gateway.get_list_version(USER_ID)
+        tasks = await gateway.get_tasks(USER_ID, 0, 10)
+    return version, [task["title"] for task in tasks]
+
+
+async def test_list_read_during_uncommitted_write_is_not_served_after_commit(session_maker) -> None:
+    cache = LRUTaskListCache(max_entries=100, max_tasks=1000, ttl_seconds=60)
+    async with session_maker.begin() as session:
+        result = await session.execute(
+            insert(models.Task)
+            .values(title="Old", completed=False, position=0, description="", user_id=USER_ID)
+            .returning(models.Task.id)
+        )
+        task_id = result.scalar_one()
+
+    async with session_maker() as write_session:
+        writer = CachedGateway(SqlaGateway(write_session), cache)
+        await writer.update_task_title_by_id(USER_ID, task_id, TaskTitleUpdate(title="New"))
+        # a concurrent request reads the committed list after the invalidation and caches it
+        assert await read_titles(session_maker, cache) == (0, ["Old"])
+        await writer.bump_list_version(USER_ID)
+        await write_session.commit()
+
+    assert await read_titles(session_maker, cache) == (1, ["New"])
+    assert cache.stats().hits == 0